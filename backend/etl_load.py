@@ -16,6 +16,8 @@ from typing import Any, Dict, Optional
 
 from sqlalchemy.orm import Session
 
+from parsers.jsonl_io import DEFAULT_READ_WORKERS, iter_records, jsonl_exists
+
 from .db import SessionLocal, init_db, get_engine
 from .models import Message, Contact, Call, File
 
@@ -252,7 +254,7 @@ def parse_datetime(dt_str: str) -> Optional[datetime]:
         logger.warning(f"Failed to parse datetime '{dt_str}': {e}")
         return None
 
-def load_messages(session: Session, jsonl_path: Path, case_id: str) -> Dict[str, int]:
+def load_messages(session: Session, jsonl_path: Path, case_id: str, read_workers: int = 1) -> Dict[str, int]:
     """
     Load messages from JSONL file into database.
     
@@ -260,11 +262,12 @@ def load_messages(session: Session, jsonl_path: Path, case_id: str) -> Dict[str,
         session: Database session
         jsonl_path: Path to messages.jsonl file
         case_id: Case identifier
+        read_workers: Processes decoding shards in parallel (see parsers/jsonl_io.py)
         
     Returns:
         Dictionary with 'inserted' and 'updated' counts
     """
-    if not jsonl_path.exists():
+    if not jsonl_exists(jsonl_path):
         logger.warning(f"Messages file not found: {jsonl_path}")
         return {"inserted": 0, "updated": 0}
     
@@ -273,52 +276,47 @@ def load_messages(session: Session, jsonl_path: Path, case_id: str) -> Dict[str,
     
     logger.info(f"Loading messages from {jsonl_path}")
     
-    with jsonl_path.open('r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            try:
-                data = json.loads(line.strip())
-                
-                # Check if message already exists
-                existing = session.query(Message).filter_by(id=data['id']).first()
+    for record_num, data in enumerate(iter_records(jsonl_path, workers=read_workers), 1):
+        try:
+            # Check if message already exists
+            existing = session.query(Message).filter_by(id=data['id']).first()
+            
+            if existing:
+                # Update existing message
+                existing.case_id = data.get('case_id', case_id)
+                existing.timestamp_utc = parse_datetime(data.get('timestamp_utc'))
+                existing.sender = data.get('sender')
+                existing.recipient = data.get('recipient')
+                existing.body = data.get('body')
+                existing.entities = data.get('entities')
+                existing.attachments = data.get('attachments')
+                existing.raw_source = data.get('raw_source')
+                existing.hash = data.get('hash')
+                updated += 1
+            else:
+                # Insert new message
+                message = Message(
+                    id=data['id'],
+                    case_id=data.get('case_id', case_id),
+                    timestamp_utc=parse_datetime(data.get('timestamp_utc')),
+                    sender=data.get('sender'),
+                    recipient=data.get('recipient'),
+                    body=data.get('body'),
+                    entities=data.get('entities'),
+                    attachments=data.get('attachments'),
+                    raw_source=data.get('raw_source'),
+                    hash=data.get('hash')
+                )
+                session.add(message)
+                inserted += 1
                 
-                if existing:
-                    # Update existing message
-                    existing.case_id = data.get('case_id', case_id)
-                    existing.timestamp_utc = parse_datetime(data.get('timestamp_utc'))
-                    existing.sender = data.get('sender')
-                    existing.recipient = data.get('recipient')
-                    existing.body = data.get('body')
-                    existing.entities = data.get('entities')
-                    existing.attachments = data.get('attachments')
-                    existing.raw_source = data.get('raw_source')
-                    existing.hash = data.get('hash')
-                    updated += 1
-                else:
-                    # Insert new message
-                    message = Message(
-                        id=data['id'],
-                        case_id=data.get('case_id', case_id),
-                        timestamp_utc=parse_datetime(data.get('timestamp_utc')),
-                        sender=data.get('sender'),
-                        recipient=data.get('recipient'),
-                        body=data.get('body'),
-                        entities=data.get('entities'),
-                        attachments=data.get('attachments'),
-                        raw_source=data.get('raw_source'),
-                        hash=data.get('hash')
-                    )
-                    session.add(message)
-                    inserted += 1
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON at line {line_num}: {e}")
-            except Exception as e:
-                logger.error(f"Error processing message at line {line_num}: {e}")
-    
+        except Exception as e:
+            logger.error(f"Error processing message at record {record_num}: {e}")
+
     logger.info(f"Messages: {inserted} inserted, {updated} updated")
     return {"inserted": inserted, "updated": updated}
 
-def load_contacts(session: Session, jsonl_path: Path, case_id: str) -> Dict[str, int]:
+def load_contacts(session: Session, jsonl_path: Path, case_id: str, read_workers: int = 1) -> Dict[str, int]:
     """
     Load contacts from JSONL file into database.
     
@@ -326,11 +324,12 @@ def load_contacts(session: Session, jsonl_path: Path, case_id: str) -> Dict[str,
         session: Database session
         jsonl_path: Path to contacts.jsonl file
         case_id: Case identifier
+        read_workers: Processes decoding shards in parallel (see parsers/jsonl_io.py)
         
     Returns:
         Dictionary with 'inserted' and 'updated' counts
     """
-    if not jsonl_path.exists():
+    if not jsonl_exists(jsonl_path):
         logger.warning(f"Contacts file not found: {jsonl_path}")
         return {"inserted": 0, "updated": 0}
     
@@ -339,42 +338,37 @@ def load_contacts(session: Session, jsonl_path: Path, case_id: str) -> Dict[str,
     
     logger.info(f"Loading contacts from {jsonl_path}")
     
-    with jsonl_path.open('r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            try:
-                data = json.loads(line.strip())
-                
-                # Check if contact already exists
-                existing = session.query(Contact).filter_by(id=data['id']).first()
+    for record_num, data in enumerate(iter_records(jsonl_path, workers=read_workers), 1):
+        try:
+            # Check if contact already exists
+            existing = session.query(Contact).filter_by(id=data['id']).first()
+            
+            if existing:
+                # Update existing contact
+                existing.case_id = data.get('case_id', case_id)
+                existing.name = data.get('name')
+                existing.phones = [data.get('phone')] if data.get('phone') else None
+                existing.raw = data
+                updated += 1
+            else:
+                # Insert new contact
+                contact = Contact(
+                    id=data['id'],
+                    case_id=data.get('case_id', case_id),
+                    name=data.get('name'),
+                    phones=[data.get('phone')] if data.get('phone') else None,
+                    raw=data
+                )
+                session.add(contact)
+                inserted += 1
                 
-                if existing:
-                    # Update existing contact
-                    existing.case_id = data.get('case_id', case_id)
-                    existing.name = data.get('name')
-                    existing.phones = [data.get('phone')] if data.get('phone') else None
-                    existing.raw = data
-                    updated += 1
-                else:
-                    # Insert new contact
-                    contact = Contact(
-                        id=data['id'],
-                        case_id=data.get('case_id', case_id),
-                        name=data.get('name'),
-                        phones=[data.get('phone')] if data.get('phone') else None,
-                        raw=data
-                    )
-                    session.add(contact)
-                    inserted += 1
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON at line {line_num}: {e}")
-            except Exception as e:
-                logger.error(f"Error processing contact at line {line_num}: {e}")
-    
+        except Exception as e:
+            logger.error(f"Error processing contact at record {record_num}: {e}")
+
     logger.info(f"Contacts: {inserted} inserted, {updated} updated")
     return {"inserted": inserted, "updated": updated}
 
-def load_calls(session: Session, jsonl_path: Path, case_id: str) -> Dict[str, int]:
+def load_calls(session: Session, jsonl_path: Path, case_id: str, read_workers: int = 1) -> Dict[str, int]:
     """
     Load calls from JSONL file into database.
     
@@ -382,11 +376,12 @@ def load_calls(session: Session, jsonl_path: Path, case_id: str) -> Dict[str, in
         session: Database session
         jsonl_path: Path to calls.jsonl file
         case_id: Case identifier
+        read_workers: Processes decoding shards in parallel (see parsers/jsonl_io.py)
         
     Returns:
         Dictionary with 'inserted' and 'updated' counts
     """
-    if not jsonl_path.exists():
+    if not jsonl_exists(jsonl_path):
         logger.warning(f"Calls file not found: {jsonl_path}")
         return {"inserted": 0, "updated": 0}
     
@@ -395,46 +390,42 @@ def load_calls(session: Session, jsonl_path: Path, case_id: str) -> Dict[str, in
     
     logger.info(f"Loading calls from {jsonl_path}")
     
-    with jsonl_path.open('r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            try:
-                data = json.loads(line.strip())
-                
-                # Check if call already exists
-                existing = session.query(Call).filter_by(id=data['id']).first()
+    for record_num, data in enumerate(iter_records(jsonl_path, workers=read_workers), 1):
+        try:
+            # Check if call already exists
+            existing = session.query(Call).filter_by(id=data['id']).first()
+            
+            if existing:
+                # Update existing call
+                existing.case_id = data.get('case_id', case_id)
+                existing.timestamp_utc = parse_datetime(data.get('timestamp_utc'))
+                existing.caller = data.get('caller')
+                existing.callee = data.get('callee')
+                existing.duration = int(data.get('duration', 0)) if data.get('duration') else None
+                existing.raw = data
+                updated += 1
+            else:
+                # Insert new call
+                call = Call(
+                    id=data['id'],
+                    case_id=data.get('case_id', case_id),
+                    timestamp_utc=parse_datetime(data.get('timestamp_utc')),
+                    caller=data.get('caller'),
+                    callee=data.get('callee'),
+                    duration=int(data.get('duration', 0)) if data.get('duration') else None,
+                    raw=data
+                )
+                session.add(call)
+                inserted += 1
                 
-                if existing:
-                    # Update existing call
-                    existing.case_id = data.get('case_id', case_id)
-                    existing.timestamp_utc = parse_datetime(data.get('timestamp_utc'))
-                    existing.caller = data.get('caller')
-                    existing.callee = data.get('callee')
-                    existing.duration = int(data.get('duration', 0)) if data.get('duration') else None
-                    existing.raw = data
-                    updated += 1
-                else:
-                    # Insert new call
-                    call = Call(
-                        id=data['id'],
-                        case_id=data.get('case_id', case_id),
-                        timestamp_utc=parse_datetime(data.get('timestamp_utc')),
-                        caller=data.get('caller'),
-                        callee=data.get('callee'),
-                        duration=int(data.get('duration', 0)) if data.get('duration') else None,
-                        raw=data
-                    )
-                    session.add(call)
-                    inserted += 1
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON at line {line_num}: {e}")
-            except Exception as e:
-                logger.error(f"Error processing call at line {line_num}: {e}")
-    
+        except Exception as e:
+            logger.error(f"Error processing call at record {record_num}: {e}")
+
     logger.info(f"Calls: {inserted} inserted, {updated} updated")
     return {"inserted": inserted, "updated": updated}
 
-def load_files(session: Session, jsonl_path: Path, case_id: str) -> Dict[str, int]:
+def load_files(session: Session, jsonl_path: Path, case_id: str, read_workers: int = 1,
+               skip_known: bool = False) -> Dict[str, int]:
     """
     Load file metadata from blobs_manifest.jsonl into database.
     
@@ -442,62 +433,63 @@ def load_files(session: Session, jsonl_path: Path, case_id: str) -> Dict[str, in
         session: Database session
         jsonl_path: Path to blobs_manifest.jsonl file
         case_id: Case identifier
+        read_workers: Processes decoding shards in parallel (see parsers/jsonl_io.py)
+        skip_known: Skip files the parser tagged as known (OS/app boilerplate)
         
     Returns:
         Dictionary with 'inserted' and 'updated' counts
     """
-    if not jsonl_path.exists():
+    if not jsonl_exists(jsonl_path):
         logger.warning(f"Blobs manifest file not found: {jsonl_path}")
         return {"inserted": 0, "updated": 0}
     
     inserted = 0
     updated = 0
+    known_skipped = 0
     
     logger.info(f"Loading file metadata from {jsonl_path}")
     
-    with jsonl_path.open('r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            try:
-                data = json.loads(line.strip())
-                
-                # Check if file already exists
-                existing = session.query(File).filter_by(blob_id=data['blob_id']).first()
-                
-                # Get related message ID if exists
-                related_msg_ids = data.get('related_message_ids', [])
-                related_msg_id = related_msg_ids[0] if related_msg_ids else None
+    for record_num, data in enumerate(iter_records(jsonl_path, workers=read_workers), 1):
+        if skip_known and data.get('known'):
+            known_skipped += 1
+            continue
+        try:
+            # Check if file already exists
+            existing = session.query(File).filter_by(blob_id=data['blob_id']).first()
+            
+            # Get related message ID if exists
+            related_msg_ids = data.get('related_message_ids', [])
+            related_msg_id = related_msg_ids[0] if related_msg_ids else None
+            
+            if existing:
+                # Update existing file
+                existing.case_id = data.get('case_id', case_id)
+                existing.blob_path = data.get('blob_path')
+                existing.sha256 = data.get('sha256')
+                existing.size_bytes = data.get('size_bytes')
+                existing.mtime_utc = parse_datetime(data.get('mtime_utc'))
+                existing.related_message_id = related_msg_id
+                existing.orig_path = data.get('orig_path')
+                updated += 1
+            else:
+                # Insert new file
+                file_obj = File(
+                    blob_id=data['blob_id'],
+                    case_id=data.get('case_id', case_id),
+                    blob_path=data.get('blob_path'),
+                    sha256=data.get('sha256'),
+                    size_bytes=data.get('size_bytes'),
+                    mtime_utc=parse_datetime(data.get('mtime_utc')),
+                    related_message_id=related_msg_id,
+                    orig_path=data.get('orig_path')
+                )
+                session.add(file_obj)
+                inserted += 1
                 
-                if existing:
-                    # Update existing file
-                    existing.case_id = data.get('case_id', case_id)
-                    existing.blob_path = data.get('blob_path')
-                    existing.sha256 = data.get('sha256')
-                    existing.size_bytes = data.get('size_bytes')
-                    existing.mtime_utc = parse_datetime(data.get('mtime_utc'))
-                    existing.related_message_id = related_msg_id
-                    existing.orig_path = data.get('orig_path')
-                    updated += 1
-                else:
-                    # Insert new file
-                    file_obj = File(
-                        blob_id=data['blob_id'],
-                        case_id=data.get('case_id', case_id),
-                        blob_path=data.get('blob_path'),
-                        sha256=data.get('sha256'),
-                        size_bytes=data.get('size_bytes'),
-                        mtime_utc=parse_datetime(data.get('mtime_utc')),
-                        related_message_id=related_msg_id,
-                        orig_path=data.get('orig_path')
-                    )
-                    session.add(file_obj)
-                    inserted += 1
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON at line {line_num}: {e}")
-            except Exception as e:
-                logger.error(f"Error processing file at line {line_num}: {e}")
-    
-    logger.info(f"Files: {inserted} inserted, {updated} updated")
+        except Exception as e:
+            logger.error(f"Error processing file at record {record_num}: {e}")
+
+    logger.info(f"Files: {inserted} inserted, {updated} updated, {known_skipped} known skipped")
     return {"inserted": inserted, "updated": updated}
 
 
@@ -526,7 +518,7 @@ def parse_datetime(dt_str: str) -> Optional[datetime]:
         logger.warning(f"Failed to parse datetime '{dt_str}': {e}")
         return None
 
-def load_messages(session: Session, jsonl_path: Path, case_id: str) -> Dict[str, int]:
+def load_messages(session: Session, jsonl_path: Path, case_id: str, read_workers: int = 1) -> Dict[str, int]:
     """
     Load messages from JSONL file into database.
     
@@ -534,11 +526,12 @@ def load_messages(session: Session, jsonl_path: Path, case_id: str) -> Dict[str,
         session: Database session
         jsonl_path: Path to messages.jsonl file
         case_id: Case identifier
+        read_workers: Processes decoding shards in parallel (see parsers/jsonl_io.py)
         
     Returns:
         Dictionary with 'inserted' and 'updated' counts
     """
-    if not jsonl_path.exists():
+    if not jsonl_exists(jsonl_path):
         logger.warning(f"Messages file not found: {jsonl_path}")
         return {"inserted": 0, "updated": 0}
     
@@ -547,52 +540,47 @@ def load_messages(session: Session, jsonl_path: Path, case_id: str) -> Dict[str,
     
     logger.info(f"Loading messages from {jsonl_path}")
     
-    with jsonl_path.open('r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            try:
-                data = json.loads(line.strip())
-                
-                # Check if message already exists
-                existing = session.query(Message).filter_by(id=data['id']).first()
+    for record_num, data in enumerate(iter_records(jsonl_path, workers=read_workers), 1):
+        try:
+            # Check if message already exists
+            existing = session.query(Message).filter_by(id=data['id']).first()
+            
+            if existing:
+                # Update existing message
+                existing.case_id = data.get('case_id', case_id)
+                existing.timestamp_utc = parse_datetime(data.get('timestamp_utc'))
+                existing.sender = data.get('sender')
+                existing.recipient = data.get('recipient')
+                existing.body = data.get('body')
+                existing.entities = data.get('entities')
+                existing.attachments = data.get('attachments')
+                existing.raw_source = data.get('raw_source')
+                existing.hash = data.get('hash')
+                updated += 1
+            else:
+                # Insert new message
+                message = Message(
+                    id=data['id'],
+                    case_id=data.get('case_id', case_id),
+                    timestamp_utc=parse_datetime(data.get('timestamp_utc')),
+                    sender=data.get('sender'),
+                    recipient=data.get('recipient'),
+                    body=data.get('body'),
+                    entities=data.get('entities'),
+                    attachments=data.get('attachments'),
+                    raw_source=data.get('raw_source'),
+                    hash=data.get('hash')
+                )
+                session.add(message)
+                inserted += 1
                 
-                if existing:
-                    # Update existing message
-                    existing.case_id = data.get('case_id', case_id)
-                    existing.timestamp_utc = parse_datetime(data.get('timestamp_utc'))
-                    existing.sender = data.get('sender')
-                    existing.recipient = data.get('recipient')
-                    existing.body = data.get('body')
-                    existing.entities = data.get('entities')
-                    existing.attachments = data.get('attachments')
-                    existing.raw_source = data.get('raw_source')
-                    existing.hash = data.get('hash')
-                    updated += 1
-                else:
-                    # Insert new message
-                    message = Message(
-                        id=data['id'],
-                        case_id=data.get('case_id', case_id),
-                        timestamp_utc=parse_datetime(data.get('timestamp_utc')),
-                        sender=data.get('sender'),
-                        recipient=data.get('recipient'),
-                        body=data.get('body'),
-                        entities=data.get('entities'),
-                        attachments=data.get('attachments'),
-                        raw_source=data.get('raw_source'),
-                        hash=data.get('hash')
-                    )
-                    session.add(message)
-                    inserted += 1
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON at line {line_num}: {e}")
-            except Exception as e:
-                logger.error(f"Error processing message at line {line_num}: {e}")
-    
+        except Exception as e:
+            logger.error(f"Error processing message at record {record_num}: {e}")
+
     logger.info(f"Messages: {inserted} inserted, {updated} updated")
     return {"inserted": inserted, "updated": updated}
 
-def load_contacts(session: Session, jsonl_path: Path, case_id: str) -> Dict[str, int]:
+def load_contacts(session: Session, jsonl_path: Path, case_id: str, read_workers: int = 1) -> Dict[str, int]:
     """
     Load contacts from JSONL file into database.
     
@@ -600,11 +588,12 @@ def load_contacts(session: Session, jsonl_path: Path, case_id: str) -> Dict[str,
         session: Database session
         jsonl_path: Path to contacts.jsonl file
         case_id: Case identifier
+        read_workers: Processes decoding shards in parallel (see parsers/jsonl_io.py)
         
     Returns:
         Dictionary with 'inserted' and 'updated' counts
     """
-    if not jsonl_path.exists():
+    if not jsonl_exists(jsonl_path):
         logger.warning(f"Contacts file not found: {jsonl_path}")
         return {"inserted": 0, "updated": 0}
     
@@ -613,42 +602,37 @@ def load_contacts(session: Session, jsonl_path: Path, case_id: str) -> Dict[str,
     
     logger.info(f"Loading contacts from {jsonl_path}")
     
-    with jsonl_path.open('r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            try:
-                data = json.loads(line.strip())
-                
-                # Check if contact already exists
-                existing = session.query(Contact).filter_by(id=data['id']).first()
+    for record_num, data in enumerate(iter_records(jsonl_path, workers=read_workers), 1):
+        try:
+            # Check if contact already exists
+            existing = session.query(Contact).filter_by(id=data['id']).first()
+            
+            if existing:
+                # Update existing contact
+                existing.case_id = data.get('case_id', case_id)
+                existing.name = data.get('name')
+                existing.phones = [data.get('phone')] if data.get('phone') else None
+                existing.raw = data
+                updated += 1
+            else:
+                # Insert new contact
+                contact = Contact(
+                    id=data['id'],
+                    case_id=data.get('case_id', case_id),
+                    name=data.get('name'),
+                    phones=[data.get('phone')] if data.get('phone') else None,
+                    raw=data
+                )
+                session.add(contact)
+                inserted += 1
                 
-                if existing:
-                    # Update existing contact
-                    existing.case_id = data.get('case_id', case_id)
-                    existing.name = data.get('name')
-                    existing.phones = [data.get('phone')] if data.get('phone') else None
-                    existing.raw = data
-                    updated += 1
-                else:
-                    # Insert new contact
-                    contact = Contact(
-                        id=data['id'],
-                        case_id=data.get('case_id', case_id),
-                        name=data.get('name'),
-                        phones=[data.get('phone')] if data.get('phone') else None,
-                        raw=data
-                    )
-                    session.add(contact)
-                    inserted += 1
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON at line {line_num}: {e}")
-            except Exception as e:
-                logger.error(f"Error processing contact at line {line_num}: {e}")
-    
+        except Exception as e:
+            logger.error(f"Error processing contact at record {record_num}: {e}")
+
     logger.info(f"Contacts: {inserted} inserted, {updated} updated")
     return {"inserted": inserted, "updated": updated}
 
-def load_calls(session: Session, jsonl_path: Path, case_id: str) -> Dict[str, int]:
+def load_calls(session: Session, jsonl_path: Path, case_id: str, read_workers: int = 1) -> Dict[str, int]:
     """
     Load calls from JSONL file into database.
     
@@ -656,11 +640,12 @@ def load_calls(session: Session, jsonl_path: Path, case_id: str) -> Dict[str, in
         session: Database session
         jsonl_path: Path to calls.jsonl file
         case_id: Case identifier
+        read_workers: Processes decoding shards in parallel (see parsers/jsonl_io.py)
         
     Returns:
         Dictionary with 'inserted' and 'updated' counts
     """
-    if not jsonl_path.exists():
+    if not jsonl_exists(jsonl_path):
         logger.warning(f"Calls file not found: {jsonl_path}")
         return {"inserted": 0, "updated": 0}
     
@@ -669,46 +654,42 @@ def load_calls(session: Session, jsonl_path: Path, case_id: str) -> Dict[str, in
     
     logger.info(f"Loading calls from {jsonl_path}")
     
-    with jsonl_path.open('r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            try:
-                data = json.loads(line.strip())
-                
-                # Check if call already exists
-                existing = session.query(Call).filter_by(id=data['id']).first()
+    for record_num, data in enumerate(iter_records(jsonl_path, workers=read_workers), 1):
+        try:
+            # Check if call already exists
+            existing = session.query(Call).filter_by(id=data['id']).first()
+            
+            if existing:
+                # Update existing call
+                existing.case_id = data.get('case_id', case_id)
+                existing.timestamp_utc = parse_datetime(data.get('timestamp_utc'))
+                existing.caller = data.get('caller')
+                existing.callee = data.get('callee')
+                existing.duration = int(data.get('duration', 0)) if data.get('duration') else None
+                existing.raw = data
+                updated += 1
+            else:
+                # Insert new call
+                call = Call(
+                    id=data['id'],
+                    case_id=data.get('case_id', case_id),
+                    timestamp_utc=parse_datetime(data.get('timestamp_utc')),
+                    caller=data.get('caller'),
+                    callee=data.get('callee'),
+                    duration=int(data.get('duration', 0)) if data.get('duration') else None,
+                    raw=data
+                )
+                session.add(call)
+                inserted += 1
                 
-                if existing:
-                    # Update existing call
-                    existing.case_id = data.get('case_id', case_id)
-                    existing.timestamp_utc = parse_datetime(data.get('timestamp_utc'))
-                    existing.caller = data.get('caller')
-                    existing.callee = data.get('callee')
-                    existing.duration = int(data.get('duration', 0)) if data.get('duration') else None
-                    existing.raw = data
-                    updated += 1
-                else:
-                    # Insert new call
-                    call = Call(
-                        id=data['id'],
-                        case_id=data.get('case_id', case_id),
-                        timestamp_utc=parse_datetime(data.get('timestamp_utc')),
-                        caller=data.get('caller'),
-                        callee=data.get('callee'),
-                        duration=int(data.get('duration', 0)) if data.get('duration') else None,
-                        raw=data
-                    )
-                    session.add(call)
-                    inserted += 1
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON at line {line_num}: {e}")
-            except Exception as e:
-                logger.error(f"Error processing call at line {line_num}: {e}")
-    
+        except Exception as e:
+            logger.error(f"Error processing call at record {record_num}: {e}")
+
     logger.info(f"Calls: {inserted} inserted, {updated} updated")
     return {"inserted": inserted, "updated": updated}
 
-def load_files(session: Session, jsonl_path: Path, case_id: str) -> Dict[str, int]:
+def load_files(session: Session, jsonl_path: Path, case_id: str, read_workers: int = 1,
+               skip_known: bool = False) -> Dict[str, int]:
     """
     Load file metadata from blobs_manifest.jsonl into database.
     
@@ -716,62 +697,63 @@ def load_files(session: Session, jsonl_path: Path, case_id: str) -> Dict[str, in
         session: Database session
         jsonl_path: Path to blobs_manifest.jsonl file
         case_id: Case identifier
+        read_workers: Processes decoding shards in parallel (see parsers/jsonl_io.py)
+        skip_known: Skip files the parser tagged as known (OS/app boilerplate)
         
     Returns:
         Dictionary with 'inserted' and 'updated' counts
     """
-    if not jsonl_path.exists():
+    if not jsonl_exists(jsonl_path):
         logger.warning(f"Blobs manifest file not found: {jsonl_path}")
         return {"inserted": 0, "updated": 0}
     
     inserted = 0
     updated = 0
+    known_skipped = 0
     
     logger.info(f"Loading file metadata from {jsonl_path}")
     
-    with jsonl_path.open('r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            try:
-                data = json.loads(line.strip())
-                
-                # Check if file already exists
-                existing = session.query(File).filter_by(blob_id=data['blob_id']).first()
-                
-                # Get related message ID if exists
-                related_msg_ids = data.get('related_message_ids', [])
-                related_msg_id = related_msg_ids[0] if related_msg_ids else None
+    for record_num, data in enumerate(iter_records(jsonl_path, workers=read_workers), 1):
+        if skip_known and data.get('known'):
+            known_skipped += 1
+            continue
+        try:
+            # Check if file already exists
+            existing = session.query(File).filter_by(blob_id=data['blob_id']).first()
+            
+            # Get related message ID if exists
+            related_msg_ids = data.get('related_message_ids', [])
+            related_msg_id = related_msg_ids[0] if related_msg_ids else None
+            
+            if existing:
+                # Update existing file
+                existing.case_id = data.get('case_id', case_id)
+                existing.blob_path = data.get('blob_path')
+                existing.sha256 = data.get('sha256')
+                existing.size_bytes = data.get('size_bytes')
+                existing.mtime_utc = parse_datetime(data.get('mtime_utc'))
+                existing.related_message_id = related_msg_id
+                existing.orig_path = data.get('orig_path')
+                updated += 1
+            else:
+                # Insert new file
+                file_obj = File(
+                    blob_id=data['blob_id'],
+                    case_id=data.get('case_id', case_id),
+                    blob_path=data.get('blob_path'),
+                    sha256=data.get('sha256'),
+                    size_bytes=data.get('size_bytes'),
+                    mtime_utc=parse_datetime(data.get('mtime_utc')),
+                    related_message_id=related_msg_id,
+                    orig_path=data.get('orig_path')
+                )
+                session.add(file_obj)
+                inserted += 1
                 
-                if existing:
-                    # Update existing file
-                    existing.case_id = data.get('case_id', case_id)
-                    existing.blob_path = data.get('blob_path')
-                    existing.sha256 = data.get('sha256')
-                    existing.size_bytes = data.get('size_bytes')
-                    existing.mtime_utc = parse_datetime(data.get('mtime_utc'))
-                    existing.related_message_id = related_msg_id
-                    existing.orig_path = data.get('orig_path')
-                    updated += 1
-                else:
-                    # Insert new file
-                    file_obj = File(
-                        blob_id=data['blob_id'],
-                        case_id=data.get('case_id', case_id),
-                        blob_path=data.get('blob_path'),
-                        sha256=data.get('sha256'),
-                        size_bytes=data.get('size_bytes'),
-                        mtime_utc=parse_datetime(data.get('mtime_utc')),
-                        related_message_id=related_msg_id,
-                        orig_path=data.get('orig_path')
-                    )
-                    session.add(file_obj)
-                    inserted += 1
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON at line {line_num}: {e}")
-            except Exception as e:
-                logger.error(f"Error processing file at line {line_num}: {e}")
-    
-    logger.info(f"Files: {inserted} inserted, {updated} updated")
+        except Exception as e:
+            logger.error(f"Error processing file at record {record_num}: {e}")
+
+    logger.info(f"Files: {inserted} inserted, {updated} updated, {known_skipped} known skipped")
     return {"inserted": inserted, "updated": updated}
 
 def main():
@@ -793,6 +775,17 @@ def main():
         "--db-url",
         help="Database URL (overrides DATABASE_URL env var)"
     )
+    parser.add_argument(
+        "--read-workers",
+        type=int,
+        default=DEFAULT_READ_WORKERS,
+        help=f"Processes decoding sharded JSONL in parallel (default: {DEFAULT_READ_WORKERS})"
+    )
+    parser.add_argument(
+        "--skip-known",
+        action="store_true",
+        help="Do not load files tagged as known by the parser's --known-files set"
+    )
     
     args = parser.parse_args()
     
@@ -816,10 +809,10 @@ def main():
             }
             
             # Load each data type
-            total_stats["messages"] = load_messages(session, input_dir / "messages.jsonl", args.case)
-            total_stats["contacts"] = load_contacts(session, input_dir / "contacts.jsonl", args.case)
-            total_stats["calls"] = load_calls(session, input_dir / "calls.jsonl", args.case)
-            total_stats["files"] = load_files(session, input_dir / "blobs_manifest.jsonl", args.case)
+            total_stats["messages"] = load_messages(session, input_dir / "messages.jsonl", args.case, args.read_workers)
+            total_stats["contacts"] = load_contacts(session, input_dir / "contacts.jsonl", args.case, args.read_workers)
+            total_stats["calls"] = load_calls(session, input_dir / "calls.jsonl", args.case, args.read_workers)
+            total_stats["files"] = load_files(session, input_dir / "blobs_manifest.jsonl", args.case, args.read_workers, args.skip_known)
             
             # Print summary
             logger.info("ETL Load Summary:")
@@ -10,11 +10,18 @@ Usage:
 import argparse
 import json
 import logging
+import sys
 from pathlib import Path
 from typing import Dict, Any, Generator, List
 
 from opensearchpy import OpenSearch, helpers
 
+try:
+    from parsers.jsonl_io import DEFAULT_READ_WORKERS, iter_records, jsonl_exists
+except ImportError:  # run as a script: python backend/opensearch_index.py
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from parsers.jsonl_io import DEFAULT_READ_WORKERS, iter_records, jsonl_exists
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("opensearch_index")
 
@@ -51,18 +58,9 @@ def create_index_if_missing(client: OpenSearch, index_name: str) -> None:
     logger.info("Created index '%s' with mapping", index_name)
 
 
-def read_messages_jsonl(path: Path) -> Generator[Dict[str, Any], None, None]:
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                doc = json.loads(line)
-                yield doc
-            except Exception as e:
-                logger.error("Failed to parse line: %s", e)
-                continue
+def read_messages_jsonl(path: Path, read_workers: int = 1) -> Generator[Dict[str, Any], None, None]:
+    # Plain, compressed or sharded output; invalid lines are logged and skipped
+    yield from iter_records(path, workers=read_workers)
 
 
 def docs_to_bulk_actions(docs: List[Dict[str, Any]], index_name: str) -> List[Dict[str, Any]]:
@@ -112,7 +110,7 @@ def main():
     args = parser.parse_args()
 
     path = Path(args.input)
-    if not path.exists():
+    if not jsonl_exists(path):
         logger.error("Input file not found: %s", path)
         raise SystemExit(1)
 
@@ -303,51 +301,47 @@ def parse_datetime_for_es(dt_str: str) -> str:
         logger.warning(f"Failed to parse datetime '{dt_str}', using as-is")
         return dt_str
 
-def generate_message_docs(jsonl_path: Path) -> Generator[Dict[str, Any], None, None]:
+def generate_message_docs(jsonl_path: Path, read_workers: int = 1) -> Generator[Dict[str, Any], None, None]:
     """
     Generator that yields message documents for bulk indexing.
     
     Args:
-        jsonl_path: Path to messages.jsonl file
+        jsonl_path: Path to messages.jsonl file (plain, compressed or sharded)
+        read_workers: Processes decoding shards in parallel
         
     Yields:
         Document dictionaries for OpenSearch indexing
     """
     logger.info(f"Reading messages from {jsonl_path}")
     
-    with jsonl_path.open('r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            try:
-                data = json.loads(line.strip())
-                
-                # Prepare document for indexing
-                doc = {
-                    "_index": "messages",  # Will be overridden by caller
-                    "_id": data.get('id'),
-                    "_source": {
-                        "id": data.get('id'),
-                        "case_id": data.get('case_id'),
-                        "timestamp_utc": parse_datetime_for_es(data.get('timestamp_utc', '')),
-                        "sender": data.get('sender'),
-                        "recipient": data.get('recipient'),
-                        "body": data.get('body', ''),
-                        "entities": data.get('entities', {}),
-                        "attachments": data.get('attachments', []),
-                        "direction": data.get('direction'),
-                        "participants": data.get('participants', []),
-                        "raw_source": data.get('raw_source'),
-                        "hash": data.get('hash')
-                    }
+    for record_num, data in enumerate(iter_records(jsonl_path, workers=read_workers), 1):
+        try:
+            # Prepare document for indexing
+            doc = {
+                "_index": "messages",  # Will be overridden by caller
+                "_id": data.get('id'),
+                "_source": {
+                    "id": data.get('id'),
+                    "case_id": data.get('case_id'),
+                    "timestamp_utc": parse_datetime_for_es(data.get('timestamp_utc', '')),
+                    "sender": data.get('sender'),
+                    "recipient": data.get('recipient'),
+                    "body": data.get('body', ''),
+                    "entities": data.get('entities', {}),
+                    "attachments": data.get('attachments', []),
+                    "direction": data.get('direction'),
+                    "participants": data.get('participants', []),
+                    "raw_source": data.get('raw_source'),
+                    "hash": data.get('hash')
                 }
-                
-                yield doc
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON at line {line_num}: {e}")
-            except Exception as e:
-                logger.error(f"Error processing message at line {line_num}: {e}")
+            }
+            
+            yield doc
+            
+        except Exception as e:
+            logger.error(f"Error processing message at record {record_num}: {e}")
 
-def bulk_index_messages(client: OpenSearch, jsonl_path: Path, index_name: str) -> Dict[str, int]:
+def bulk_index_messages(client: OpenSearch, jsonl_path: Path, index_name: str, read_workers: int = 1) -> Dict[str, int]:
     """
     Bulk index messages from JSONL file into OpenSearch.
     
@@ -355,11 +349,12 @@ def bulk_index_messages(client: OpenSearch, jsonl_path: Path, index_name: str) -
         client: OpenSearch client
         jsonl_path: Path to messages.jsonl file
         index_name: Name of the index
+        read_workers: Processes decoding shards in parallel
         
     Returns:
         Dictionary with indexing statistics
     """
-    if not jsonl_path.exists():
+    if not jsonl_exists(jsonl_path):
         logger.warning(f"Messages file not found: {jsonl_path}")
         return {"indexed": 0, "errors": 0}
     
@@ -368,7 +363,7 @@ def bulk_index_messages(client: OpenSearch, jsonl_path: Path, index_name: str) -
     
     try:
         # Generate documents and perform bulk indexing
-        docs = generate_message_docs(jsonl_path)
+        docs = generate_message_docs(jsonl_path, read_workers)
         
         # Update index name in documents
         def update_index(doc_gen):
@@ -426,6 +421,12 @@ def main():
         action="store_true",
         help="Delete and recreate the index"
     )
+    parser.add_argument(
+        "--read-workers",
+        type=int,
+        default=DEFAULT_READ_WORKERS,
+        help=f"Processes decoding sharded JSONL in parallel (default: {DEFAULT_READ_WORKERS})"
+    )
     
     args = parser.parse_args()
     
@@ -434,7 +435,7 @@ def main():
     
     # Validate input file
     jsonl_path = Path(args.input)
-    if not jsonl_path.exists():
+    if not jsonl_exists(jsonl_path):
         logger.error(f"Input file does not exist: {jsonl_path}")
         sys.exit(1)
     
@@ -458,7 +459,7 @@ def main():
             sys.exit(1)
         
         # Index messages
-        stats = bulk_index_messages(client, jsonl_path, args.index)
+        stats = bulk_index_messages(client, jsonl_path, args.index, args.read_workers)
         
         # Print summary
         logger.info("Indexing Summary:")
@@ -14,17 +14,11 @@ Requires:
 import json
 import logging
 import os
+import sys
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Union
 
-import numpy as np
-
 # Optional imports with graceful degradation
-try:
-    import faiss
-except ImportError:
-    faiss = None
-
 try:
     from opensearchpy import OpenSearch
 except ImportError:
@@ -35,6 +29,14 @@ try:
 except ImportError:
     SentenceTransformer = None
 
+try:
+    from nlp.faiss_index import load_index, search_live
+    from nlp.id_map import load_id_map
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from nlp.faiss_index import load_index, search_live
+    from nlp.id_map import load_id_map
+
 from .db import get_session
 from .models import Message
 
@@ -75,6 +77,7 @@ class HybridRetriever:
         self.opensearch_client = None
         self.faiss_index = None
         self.faiss_metadata = None
+        self.faiss_ids = None
         self.embedding_model = None
         
         # Initialize on first use
@@ -112,25 +115,27 @@ class HybridRetriever:
     
     def _init_faiss(self) -> bool:
         """Initialize FAISS index if available."""
-        if self._faiss_available or faiss is None:
+        if self._faiss_available:
             return self._faiss_available
         
         try:
-            # Load FAISS index
-            index_file = self.faiss_index_dir / "faiss.index"
             metadata_file = self.faiss_index_dir / "metadata.json"
             
-            if not index_file.exists() or not metadata_file.exists():
+            if not metadata_file.exists():
                 logger.warning("FAISS index files not found at %s", self.faiss_index_dir)
                 return False
             
-            # Load index
-            self.faiss_index = faiss.read_index(str(index_file))
-            
             # Load metadata
             with open(metadata_file, 'r', encoding='utf-8') as f:
                 self.faiss_metadata = json.load(f)
             
+            # Open the index memory-mapped, so uvicorn workers share its pages and start
+            # in constant time; flat indexes are searched over embeddings.npy without faiss.
+            # The nprobe / efSearch it was built with are applied (see nlp/faiss_index.py).
+            self.faiss_index = load_index(self.faiss_index_dir, self.faiss_metadata)
+            # Row -> message id map, memory-mapped as well; tombstoned rows map to None
+            self.faiss_ids = load_id_map(self.faiss_index_dir, self.faiss_metadata)
+            
             logger.info("Loaded FAISS index with %d embeddings, dimension: %d", 
                        self.faiss_metadata.get('num_embeddings', 0),
                        self.faiss_metadata.get('embedding_dim', 0))
@@ -238,29 +243,25 @@ class HybridRetriever:
             # Generate query embedding
             query_embedding = self.embedding_model.encode([query], normalize_embeddings=True)
             
-            # Search FAISS index
-            scores, indices = self.faiss_index.search(query_embedding.astype(np.float32), limit)
+            # Search FAISS index; search_live searches deeper past deleted rows
+            hits = search_live(self.faiss_index, self.faiss_ids, query_embedding, limit)
             
             results = []
-            message_ids = self.faiss_metadata.get('message_ids', [])
             
-            for score, idx in zip(scores[0], indices[0]):
-                if idx >= 0 and idx < len(message_ids):  # Valid index
-                    message_id = message_ids[idx]
-                    
-                    # Fetch message details from database
-                    message_data = self._get_message_by_id(message_id)
-                    if message_data:
-                        results.append({
-                            'message_id': message_id,
-                            'case_id': message_data.get('case_id'),
-                            'content': message_data.get('content', ''),
-                            'sender': message_data.get('sender'),
-                            'recipient': message_data.get('recipient'),
-                            'timestamp': message_data.get('timestamp'),
-                            'score': float(score),  # FAISS similarity score (0-1)
-                            'source': 'faiss'
-                        })
+            for score, _, message_id in hits:
+                # Fetch message details from database
+                message_data = self._get_message_by_id(message_id)
+                if message_data:
+                    results.append({
+                        'message_id': message_id,
+                        'case_id': message_data.get('case_id'),
+                        'content': message_data.get('content', ''),
+                        'sender': message_data.get('sender'),
+                        'recipient': message_data.get('recipient'),
+                        'timestamp': message_data.get('timestamp'),
+                        'score': float(score),  # FAISS similarity score (0-1)
+                        'source': 'faiss'
+                    })
             
             logger.debug("FAISS returned %d results for query: %s", len(results), query)
             return results
@@ -0,0 +1,122 @@
+"""
+bench_entities.py — Entity extraction micro-benchmark
+
+Times the single-scan engine (nlp/entity_engine.py) against the previous
+one-regex-pass-per-entity-type extractors, for both the NLP extractor and the
+parser's per-message entities, over a synthetic message corpus:
+
+    python benchmarks/bench_entities.py --messages 1000000 [--out results/entities.json]
+
+Bodies come from synth_ufdr.message_bodies; every 20th also gets an email
+address so the email path is exercised.
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.bench_parser import git_commit  # noqa: E402
+from benchmarks.synth_ufdr import message_bodies  # noqa: E402
+from nlp.extractors import extract_entities  # noqa: E402
+from parsers.ufdr_parser import extract_entities as parser_extract_entities  # noqa: E402
+
+# Baselines: the extractors as they were before the single-scan engine
+_PHONE = re.compile(r'\+?\d{7,15}')
+_EMAIL = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+_URL = re.compile(r'http[s]?://\S+')
+_ETHEREUM = re.compile(r'0x[a-fA-F0-9]{40}')
+_BITCOIN = re.compile(r'[13][a-km-zA-HJ-NP-Z1-9]{25,34}')
+
+def _unique(matches: List[str]) -> List[str]:
+    seen = set()
+    unique = []
+    for match in matches:
+        if match not in seen:
+            seen.add(match)
+            unique.append(match)
+    return unique
+
+def legacy_nlp_extract(text: str) -> Dict[str, List[str]]:
+    if not text:
+        return {"phones": [], "crypto_addresses": [], "emails": [], "urls": []}
+    return {
+        "phones": _unique(_PHONE.findall(text)),
+        "crypto_addresses": _unique(_ETHEREUM.findall(text) + _BITCOIN.findall(text)),
+        "emails": _unique(_EMAIL.findall(text)),
+        "urls": _unique(_URL.findall(text)),
+    }
+
+def legacy_parser_extract(text: str) -> Dict[str, List[str]]:
+    return {
+        "phone_numbers": re.findall(r"\+?\d{10,15}", text),
+        "crypto_addresses": re.findall(r"0x[a-fA-F0-9]{6,}", text),
+        "urls": re.findall(r"https?://\S+", text),
+    }
+
+CASES: Dict[str, Dict[str, Callable[[str], Dict[str, List[str]]]]] = {
+    "nlp": {"legacy": legacy_nlp_extract, "engine": extract_entities},
+    "parser": {"legacy": legacy_parser_extract, "engine": parser_extract_entities},
+}
+
+def corpus(messages: int, seed: int) -> List[str]:
+    return [
+        body + " mail ops.team@example.com" if i % 20 == 0 else body
+        for i, body in enumerate(message_bodies(messages, seed=seed))
+    ]
+
+def time_extractor(extract: Callable[[str], Any], bodies: List[str], repeat: int) -> float:
+    """Fastest of `repeat` passes over the corpus, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body in bodies:
+            extract(body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(messages: int, seed: int = 1, repeat: int = 1) -> Dict[str, Any]:
+    bodies = corpus(messages, seed)
+    chars = sum(len(body) for body in bodies)
+    results = {}
+    for case, extractors in CASES.items():
+        timings = {name: time_extractor(extract, bodies, repeat) for name, extract in extractors.items()}
+        results[case] = {
+            **{f"{name}_seconds": round(t, 3) for name, t in timings.items()},
+            **{f"{name}_msgs_per_s": round(messages / t) for name, t in timings.items()},
+            "speedup": round(timings["legacy"] / timings["engine"], 2),
+        }
+        print(
+            f"{case:>7}: legacy {timings['legacy']:7.2f}s  engine {timings['engine']:7.2f}s  "
+            f"speedup {results[case]['speedup']:.2f}x",
+            file=sys.stderr,
+        )
+    return {
+        "commit": git_commit(),
+        "messages": messages,
+        "chars": chars,
+        "repeat": repeat,
+        "results": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark entity extraction")
+    parser.add_argument("--messages", type=int, default=1000000, help="Corpus size (default: 1000000)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1, help="Passes per extractor; the fastest is kept")
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    args = parser.parse_args()
+    report = run(args.messages, args.seed, args.repeat)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+bench_faiss.py — Recall vs. latency of the FAISS index types
+
+Builds each index type of nlp/faiss_index.py over the same vectors and sweeps
+its search parameter (nprobe for IVF, efSearch for HNSW). For every setting
+it reports recall@k against the exact flat index and the per-query latency
+of single-vector searches, as the API issues them:
+
+    python benchmarks/bench_faiss.py --embeddings vectors/CASE-001/embeddings.npy [--queries 1000] [--k 10]
+    python benchmarks/bench_faiss.py --vectors 1000000 --dim 384 [--types hnsw ivf-flat ivf-pq] [--out results/faiss.json]
+
+Without --embeddings, clustered random unit vectors are generated. Queries
+are noisy copies of indexed rows. Use the report to choose --index-type and
+--nprobe / --ef-search for nlp/embeddings_worker.py.
+
+Requires:
+    pip install faiss-cpu numpy
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.bench_parser import git_commit  # noqa: E402
+from nlp.faiss_index import build_index, index_spec, require_faiss  # noqa: E402
+
+# Search parameter values swept per index type
+SWEEPS = {
+    "flat": ("", [None]),
+    "hnsw": ("efSearch", [16, 32, 64, 128, 256]),
+    "ivf-flat": ("nprobe", [1, 4, 8, 16, 32, 64, 128]),
+    "ivf-pq": ("nprobe", [1, 4, 8, 16, 32, 64, 128]),
+}
+
+def synthetic_vectors(n: int, dim: int, clusters: int = 256, seed: int = 1) -> np.ndarray:
+    """Unit vectors drawn around random cluster centres, roughly like sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        end = min(n, start + 100_000)
+        vectors[start:end] = centres[rng.integers(0, clusters, end - start)]
+        vectors[start:end] += 0.6 * rng.standard_normal((end - start, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+def make_queries(vectors: np.ndarray, count: int, seed: int = 2) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    queries = np.ascontiguousarray(vectors[np.sort(rng.choice(len(vectors), count, replace=False))], dtype=np.float32)
+    queries += 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)]))
+
+def time_queries(index: Any, queries: np.ndarray, k: int) -> Dict[str, Any]:
+    """Searches one query at a time; returns the ids found and latency percentiles."""
+    latencies = []
+    found = np.empty((len(queries), k), dtype=np.int64)
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, ids = index.search(queries[i:i + 1], k)
+        latencies.append(time.perf_counter() - start)
+        found[i] = ids[0]
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "found": found,
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 3),
+    }
+
+def run(vectors: np.ndarray, queries: np.ndarray, k: int, types: List[str]) -> Dict[str, Any]:
+    faiss = require_faiss()
+    n, dim = vectors.shape
+    results: Dict[str, Any] = {}
+    truth = None
+    for index_type in ["flat"] + [t for t in types if t != "flat"]:
+        spec = index_spec(index_type, n, dim)
+        start = time.perf_counter()
+        index = build_index(vectors, spec)
+        build_s = time.perf_counter() - start
+        param, values = SWEEPS[index_type]
+        rows = []
+        for value in values:
+            if value is not None:
+                faiss.ParameterSpace().set_index_parameter(index, param, value)
+            timed = time_queries(index, queries, k)
+            if truth is None:
+                truth = timed["found"]
+            rows.append({
+                "param": param or None,
+                "value": value,
+                f"recall@{k}": round(recall_at_k(timed["found"], truth), 4),
+                "p50_ms": timed["p50_ms"],
+                "p95_ms": timed["p95_ms"],
+            })
+            print(f"{index_type:<9} {spec['factory']:<16} {param or '-':>8}={value if value is not None else '-':<5} "
+                  f"recall@{k} {rows[-1][f'recall@{k}']:.3f}  p50 {timed['p50_ms']:8.3f} ms  p95 {timed['p95_ms']:8.3f} ms",
+                  file=sys.stderr)
+        results[index_type] = {
+            "factory": spec["factory"],
+            "default_search_params": spec["search_params"],
+            "build_s": round(build_s, 2),
+            "index_bytes": int(faiss.serialize_index(index).size),
+            "sweep": rows,
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index types: recall@k vs. query latency")
+    parser.add_argument("--embeddings", default=None, help="embeddings.npy to index (default: synthetic vectors)")
+    parser.add_argument("--vectors", type=int, default=200_000, help="Synthetic vectors (default: 200000)")
+    parser.add_argument("--dim", type=int, default=384, help="Synthetic dimension (default: 384)")
+    parser.add_argument("--queries", type=int, default=1000, help="Queries, sampled from the vectors with noise (default: 1000)")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query (default: 10)")
+    parser.add_argument("--types", nargs="+", default=["hnsw", "ivf-flat", "ivf-pq"], choices=list(SWEEPS), help="Index types to compare with flat")
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    args = parser.parse_args()
+
+    if args.embeddings:
+        vectors = np.load(args.embeddings, mmap_mode='r')
+    else:
+        vectors = synthetic_vectors(args.vectors, args.dim)
+    queries = make_queries(vectors, min(args.queries, len(vectors)))
+    report = {
+        "commit": git_commit(),
+        "vectors": int(len(vectors)),
+        "dim": int(vectors.shape[1]),
+        "queries": int(len(queries)),
+        "k": args.k,
+        "source": args.embeddings or "synthetic",
+        "results": run(vectors, queries, args.k, args.types),
+    }
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
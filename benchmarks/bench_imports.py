@@ -0,0 +1,99 @@
+"""
+bench_imports.py — Cold import-time benchmark
+
+Times imports the CLIs depend on, each in a fresh interpreter (fastest of
+--repeat runs), and lists which heavy optional dependencies they loaded:
+
+    python benchmarks/bench_imports.py [--repeat 5] [--check] [--out results/imports.json]
+
+With --check the exit status is 1 if a target is over its budget or loads a
+dependency it must not, so CI catches an eager import creeping back in.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Heavy optional dependencies that should only load when a feature needs them
+HEAVY_MODULES = ("numpy", "phonenumbers", "phonenumbers.geodata", "faiss", "sentence_transformers", "torch")
+
+# Statement -> (budget in seconds, heavy modules it may load)
+TARGETS: Dict[str, Dict[str, Any]] = {
+    "import nlp; nlp.extract_entities": {"budget_s": 0.1, "allowed": ()},
+    "import nlp.watchlist": {"budget_s": 0.15, "allowed": ()},
+    "import nlp.normalize_phone": {"budget_s": 0.25, "allowed": ("phonenumbers",)},
+    "import nlp.embeddings_worker": {"budget_s": 0.5, "allowed": ("numpy",)},
+    "import parsers.ufdr_parser": {"budget_s": 0.25, "allowed": ()},
+    "import parsers.export_parquet": {"budget_s": 0.15, "allowed": ()},
+}
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+exec({stmt!r})
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure(stmt: str, repeat: int = 3) -> Dict[str, Any]:
+    """Fastest wall time of stmt in `repeat` fresh interpreters, and the heavy modules it loaded."""
+    best: Optional[Dict[str, Any]] = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(stmt=stmt, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, cwd=REPO_ROOT,
+        )
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+def run(repeat: int = 3, targets: Optional[List[str]] = None) -> Dict[str, Any]:
+    results = {}
+    for stmt in targets or TARGETS:
+        spec = TARGETS.get(stmt, {"budget_s": None, "allowed": HEAVY_MODULES})
+        result = measure(stmt, repeat)
+        if "error" in result:
+            results[stmt] = {**result, "ok": True}  # optional dependency missing here
+            print(f"{stmt:<40} skipped: {result['error']}", file=sys.stderr)
+            continue
+        unexpected = [m for m in result["heavy"] if m not in spec["allowed"]]
+        over = spec["budget_s"] is not None and result["seconds"] > spec["budget_s"]
+        results[stmt] = {
+            "seconds": round(result["seconds"], 4),
+            "budget_s": spec["budget_s"],
+            "heavy": result["heavy"],
+            "unexpected": unexpected,
+            "ok": not over and not unexpected,
+        }
+        print(
+            f"{stmt:<40} {result['seconds'] * 1000:7.1f} ms  budget {spec['budget_s'] * 1000:5.0f} ms  "
+            f"{'ok' if results[stmt]['ok'] else 'FAIL'}{'  loads ' + ', '.join(unexpected) if unexpected else ''}",
+            file=sys.stderr,
+        )
+    return {"python": sys.version.split()[0], "repeat": repeat, "results": results}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold import times")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per target; the fastest is kept")
+    parser.add_argument("--targets", nargs="+", default=None, help="Statements to time (default: all in TARGETS)")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any target is over budget or loads an unexpected module")
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    args = parser.parse_args()
+    report = run(args.repeat, args.targets)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    if args.check and not all(r["ok"] for r in report["results"].values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+bench_parser.py — Throughput benchmarks for the UFDR parser
+
+Runs run_parser in each mode against a (synthetic or real) UFDR and records
+records/sec, input MB/s, peak RSS and the per-phase wall times from the
+parser summary. Every run happens in a fresh subprocess so peak RSS is per
+mode. Results are written as JSON, tagged with the git commit, so two
+commits can be compared:
+
+    python benchmarks/synth_ufdr.py /tmp/bench.ufdr --messages 1000000 --attachments 20000
+    python benchmarks/bench_parser.py /tmp/bench.ufdr --out results/HEAD.json
+    python benchmarks/bench_parser.py /tmp/bench.ufdr --out results/new.json --compare results/HEAD.json
+
+Without an input, a synthetic UFDR is generated with --messages/--attachments.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.synth_ufdr import SynthConfig, generate_ufdr  # noqa: E402
+
+# Mode name -> run_parser keyword arguments
+MODES: Dict[str, Dict[str, Any]] = {
+    "tree": {},
+    "stream": {"streaming": True},
+    "no-extract": {"extract": False},
+    "stream-no-extract": {"streaming": True, "extract": False},
+    "serial-blobs": {"streaming": True, "extract": False, "blob_workers": 1},
+    "no-checkpoint": {"streaming": True, "extract": False, "checkpoint_every": 0},
+    "gzip-shards": {"streaming": True, "extract": False, "compression": "gzip", "shard_size": 100000},
+}
+# Relative change beyond which --compare flags a metric
+REGRESSION_THRESHOLD = 0.10
+
+def input_size(path: Path) -> int:
+    """Bytes of report and media the parser has to read."""
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+    with zipfile.ZipFile(path) as zf:
+        return sum(info.file_size for info in zf.infolist())
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def run_mode(input_path: Path, mode: str) -> Dict[str, Any]:
+    """Runs one mode in this process against a fresh output directory. Used by the subprocess."""
+    from parsers.ufdr_parser import RECORD_HANDLERS, run_parser
+    outdir = Path(tempfile.mkdtemp(prefix="ufdr-bench-"))
+    try:
+        start = time.perf_counter()
+        summary = run_parser(input_path, outdir, "BENCH", **MODES[mode])
+        wall = time.perf_counter() - start
+    finally:
+        shutil.rmtree(outdir, ignore_errors=True)
+    records = sum(summary[kind]["count"] for kind in RECORD_HANDLERS)
+    size = input_size(input_path)
+    return {
+        "mode": mode,
+        "options": MODES[mode],
+        "wall_seconds": round(wall, 3),
+        "records": records,
+        "records_per_s": round(records / wall, 1),
+        "input_mb": round(size / (1024 * 1024), 1),
+        "mb_per_s": round(size / (1024 * 1024) / wall, 2),
+        "blobs": summary["blobs"]["count"],
+        "blob_throughput_mb_s": summary["blobs"]["throughput_mb_s"],
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "phases": summary["timings"],
+    }
+
+def run_in_subprocess(input_path: Path, mode: str) -> Dict[str, Any]:
+    proc = subprocess.run(
+        [sys.executable, __file__, str(input_path), "--single", mode],
+        capture_output=True, text=True, cwd=REPO_ROOT,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Mode {mode} failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=REPO_ROOT, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(input_path: Path, modes: List[str], repeat: int = 1) -> Dict[str, Any]:
+    """Runs each mode `repeat` times and keeps the fastest run of each."""
+    results = []
+    for mode in modes:
+        runs = [run_in_subprocess(input_path, mode) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r["wall_seconds"])
+        best["runs"] = [r["wall_seconds"] for r in runs]
+        print(
+            f"{mode:>18}: {best['wall_seconds']:8.2f}s  {best['records_per_s']:>10.0f} rec/s  "
+            f"{best['mb_per_s']:7.1f} MB/s  {best['peak_rss_mb']:7.1f} MB RSS",
+            file=sys.stderr,
+        )
+        results.append(best)
+    return {
+        "commit": git_commit(),
+        "created_utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "input": str(input_path),
+        "results": results,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Returns one line per mode comparing wall time and peak RSS with the baseline."""
+    lines = []
+    before = {r["mode"]: r for r in baseline["results"]}
+    for r in current["results"]:
+        b = before.get(r["mode"])
+        if b is None:
+            continue
+        row = [f"{r['mode']:>18}:"]
+        for metric in ("wall_seconds", "peak_rss_mb"):
+            change = (r[metric] - b[metric]) / b[metric] if b[metric] else 0.0
+            flag = "  REGRESSION" if change > REGRESSION_THRESHOLD else ""
+            row.append(f"{metric} {b[metric]} -> {r[metric]} ({change:+.0%}){flag}")
+        lines.append("  ".join(row))
+    return lines
+
+def main():
+    defaults = SynthConfig()
+    parser = argparse.ArgumentParser(description="Benchmark UFDR parser modes")
+    parser.add_argument("input", nargs="?", help="UFDR file or folder (default: generate a synthetic one)")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=list(MODES), help="Modes to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per mode; the fastest is kept")
+    parser.add_argument("--messages", type=int, default=defaults.messages, help="Synthetic input: messages")
+    parser.add_argument("--attachments", type=int, default=defaults.attachments, help="Synthetic input: media files")
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--single", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        # Subprocess entry: one mode, JSON on the last stdout line
+        print(json.dumps(run_mode(Path(args.input), args.single)))
+        return
+
+    tmp_dir = None
+    if args.input:
+        input_path = Path(args.input)
+    else:
+        tmp_dir = Path(tempfile.mkdtemp(prefix="ufdr-synth-"))
+        input_path = tmp_dir / "synthetic.ufdr"
+        generate_ufdr(input_path, SynthConfig(messages=args.messages, attachments=args.attachments))
+    try:
+        report = run_benchmarks(input_path, args.modes, args.repeat)
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Compared with {baseline.get('commit')}:")
+        print("\n".join(compare(report, baseline)))
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
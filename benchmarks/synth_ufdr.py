@@ -0,0 +1,232 @@
+"""
+synth_ufdr.py — Synthetic UFDR generator for parser benchmarks and tests
+
+Writes a UFDR archive (or unpacked folder) shaped like a real extraction:
+a namespaced report.xml with messages, contacts and calls, media files under
+several Cellebrite-style folders, and attachment references. Output is
+deterministic for a given seed and is streamed, so millions of messages need
+little memory.
+
+Realism knobs:
+    - timestamps mix ms/s epochs, ISO8601 with Z or an offset, and naive ISO
+    - tag variants (message/sms, timestamp/time, sender/from, body/text)
+    - attachment paths with backslashes and case that differs from the file
+    - duplicate media content under different names, orphan media, and a few
+      references to files that do not exist
+    - bodies containing phone numbers, URLs and crypto addresses
+
+Usage:
+    python benchmarks/synth_ufdr.py <out.ufdr|out_dir> --messages 1000000 --attachments 20000
+"""
+import argparse
+import json
+import random
+import zipfile
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+from xml.sax.saxutils import escape
+
+NAMESPACE = "http://pa.cellebrite.com/report/2.0"
+MEDIA_FOLDERS = ("files/Image", "files/Video", "files/Audio", "media", "attachments")
+MEDIA_EXTS = {"files/Image": ".jpg", "files/Video": ".mp4", "files/Audio": ".amr", "media": ".jpg", "attachments": ".pdf"}
+WORDS = (
+    "meet call tomorrow payment sent received ok done where when package deliver cash "
+    "wallet transfer account check photo location bring money address confirm later now"
+).split()
+BASE_TIME = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+@dataclass
+class SynthConfig:
+    messages: int = 10000
+    contacts: int = 500
+    calls: int = 2000
+    attachments: int = 1000           # distinct media files
+    attach_rate: float = 0.1          # share of messages with attachments
+    duplicate_rate: float = 0.05      # share of media files that copy another file's bytes
+    orphan_rate: float = 0.1          # share of media files no message references
+    missing_rate: float = 0.01        # share of attachment references to absent files
+    media_min_kb: int = 4
+    media_max_kb: int = 64
+    participants: int = 200
+    namespaced: bool = True
+    seed: int = 1
+
+def _phone(rng: random.Random) -> str:
+    return rng.choice(("+91", "+44", "+1", "+49")) + "".join(rng.choice("0123456789") for _ in range(10))
+
+def _timestamp(rng: random.Random, dt: datetime) -> str:
+    """One of the timestamp formats seen in real reports."""
+    fmt = rng.randrange(5)
+    if fmt == 0:
+        return str(int(dt.timestamp() * 1000))
+    if fmt == 1:
+        return str(int(dt.timestamp()))
+    if fmt == 2:
+        return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    if fmt == 3:
+        return dt.astimezone(timezone(timedelta(hours=5, minutes=30))).isoformat()
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+def _body(rng: random.Random, phones: List[str]) -> str:
+    words = rng.choices(WORDS, k=rng.randint(3, 30))
+    extra = rng.random()
+    if extra < 0.05:
+        words.append(rng.choice(phones))
+    elif extra < 0.08:
+        words.append(f"https://example.com/{rng.getrandbits(32):08x}")
+    elif extra < 0.10:
+        words.append("0x" + f"{rng.getrandbits(160):040x}")
+    return " ".join(words)
+
+def _media_plan(cfg: SynthConfig, rng: random.Random) -> List[Tuple[str, int, int]]:
+    """(rel_path, size, content seed) per media file; duplicates reuse another file's seed and size."""
+    plan: List[Tuple[str, int, int]] = []
+    for i in range(cfg.attachments):
+        folder = MEDIA_FOLDERS[i % len(MEDIA_FOLDERS)]
+        rel_path = f"{folder}/IMG_{i:07d}{MEDIA_EXTS[folder]}"
+        if plan and rng.random() < cfg.duplicate_rate:
+            _, size, seed = rng.choice(plan)
+        else:
+            size, seed = rng.randint(cfg.media_min_kb, cfg.media_max_kb) * 1024, i
+        plan.append((rel_path, size, seed))
+    return plan
+
+def _media_bytes(size: int, seed: int) -> bytes:
+    return random.Random(seed).randbytes(size)
+
+def _attachment_ref(rng: random.Random, rel_path: str) -> str:
+    """Attachment paths as exports write them: sometimes with backslashes or different case."""
+    style = rng.random()
+    if style < 0.1:
+        return rel_path.replace("/", "\\")
+    if style < 0.15:
+        return rel_path.upper()
+    return rel_path
+
+def iter_report(cfg: SynthConfig) -> Iterator[str]:
+    """Yields report.xml in chunks."""
+    rng = random.Random(cfg.seed)
+    media = _media_plan(cfg, rng)
+    referenced = [m for m in media if rng.random() >= cfg.orphan_rate] or media
+    phones = [_phone(rng) for _ in range(cfg.participants)]
+    owner = phones[0]
+    xmlns = f' xmlns="{NAMESPACE}"' if cfg.namespaced else ""
+    yield f'<?xml version="1.0" encoding="utf-8"?>\n<report{xmlns}>\n<messages>\n'
+    chunk: List[str] = []
+    for i in range(cfg.messages):
+        dt = BASE_TIME + timedelta(seconds=i * 37 + rng.randrange(30))
+        tag = "message" if rng.random() < 0.8 else "sms"
+        ts_tag = "timestamp" if rng.random() < 0.9 else "time"
+        peer = rng.choice(phones[1:] or phones)
+        sender, recipient = (owner, peer) if rng.random() < 0.5 else (peer, owner)
+        from_tag, to_tag = ("sender", "recipient") if rng.random() < 0.9 else ("from", "to")
+        body_tag = "body" if rng.random() < 0.9 else "text"
+        parts = [
+            f'<{tag} id="msg-{i:08d}">',
+            f"<{ts_tag}>{_timestamp(rng, dt)}</{ts_tag}>",
+            f"<{from_tag}>{sender}</{from_tag}>",
+            f"<{to_tag}>{recipient}</{to_tag}>",
+            f"<{body_tag}>{escape(_body(rng, phones))}</{body_tag}>",
+        ]
+        if rng.random() < cfg.attach_rate:
+            for _ in range(rng.choice((1, 1, 1, 2, 3))):
+                if rng.random() < cfg.missing_rate:
+                    parts.append(f"<attachment>media/MISSING_{i:08d}.jpg</attachment>")
+                else:
+                    parts.append(f"<attachment>{escape(_attachment_ref(rng, rng.choice(referenced)[0]))}</attachment>")
+        parts.append(f"</{tag}>\n")
+        chunk.append("".join(parts))
+        if len(chunk) >= 1000:
+            yield "".join(chunk)
+            chunk = []
+    yield "".join(chunk)
+    yield "</messages>\n<contacts>\n"
+    for i in range(cfg.contacts):
+        phone = phones[i % len(phones)] if i < len(phones) else _phone(rng)
+        yield f"<contact><name>Contact {i}</name><phone>{phone}</phone></contact>\n"
+    yield "</contacts>\n<calls>\n"
+    for i in range(cfg.calls):
+        dt = BASE_TIME + timedelta(seconds=i * 311 + rng.randrange(300))
+        caller, callee = (owner, rng.choice(phones)) if rng.random() < 0.5 else (rng.choice(phones), owner)
+        yield (
+            f"<call><timestamp>{_timestamp(rng, dt)}</timestamp><caller>{caller}</caller>"
+            f"<callee>{callee}</callee><duration>{rng.randrange(0, 3600)}</duration></call>\n"
+        )
+    yield "</calls>\n</report>\n"
+
+def message_bodies(count: int, seed: int = 1, participants: int = 200) -> Iterator[str]:
+    """Yields message bodies like the ones in report.xml, for text-processing benchmarks."""
+    rng = random.Random(seed)
+    phones = [_phone(rng) for _ in range(participants)]
+    for _ in range(count):
+        yield _body(rng, phones)
+
+def iter_media(cfg: SynthConfig) -> Iterator[Tuple[str, bytes]]:
+    rng = random.Random(cfg.seed)
+    for rel_path, size, seed in _media_plan(cfg, rng):
+        yield rel_path, _media_bytes(size, seed)
+
+def _write_report(out: BinaryIO, cfg: SynthConfig) -> int:
+    written = 0
+    for chunk in iter_report(cfg):
+        data = chunk.encode("utf-8")
+        out.write(data)
+        written += len(data)
+    return written
+
+def generate_ufdr(out_path: Union[str, Path], cfg: Optional[SynthConfig] = None) -> Dict[str, int]:
+    """
+    Writes a synthetic UFDR. A path ending in .ufdr or .zip becomes an archive
+    (media stored uncompressed, like real exports); anything else an unpacked folder.
+    Returns the sizes written.
+    """
+    cfg = cfg or SynthConfig()
+    out_path = Path(out_path)
+    stats = {"report_bytes": 0, "media_files": 0, "media_bytes": 0}
+    if out_path.suffix.lower() in (".ufdr", ".zip"):
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+            with zf.open("report.xml", "w", force_zip64=True) as out:
+                stats["report_bytes"] = _write_report(out, cfg)
+            for rel_path, data in iter_media(cfg):
+                zf.writestr(zipfile.ZipInfo(rel_path, (2023, 1, 1, 0, 0, 0)), data, compress_type=zipfile.ZIP_STORED)
+                stats["media_files"] += 1
+                stats["media_bytes"] += len(data)
+    else:
+        out_path.mkdir(parents=True, exist_ok=True)
+        with (out_path / "report.xml").open("wb") as out:
+            stats["report_bytes"] = _write_report(out, cfg)
+        for rel_path, data in iter_media(cfg):
+            dest = out_path / rel_path
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_bytes(data)
+            stats["media_files"] += 1
+            stats["media_bytes"] += len(data)
+    return stats
+
+def main():
+    defaults = SynthConfig()
+    parser = argparse.ArgumentParser(description="Generate a synthetic UFDR for benchmarks")
+    parser.add_argument("out", help="Output .ufdr/.zip file or folder")
+    parser.add_argument("--messages", type=int, default=defaults.messages)
+    parser.add_argument("--contacts", type=int, default=defaults.contacts)
+    parser.add_argument("--calls", type=int, default=defaults.calls)
+    parser.add_argument("--attachments", type=int, default=defaults.attachments, help="Distinct media files")
+    parser.add_argument("--attach-rate", type=float, default=defaults.attach_rate, help="Share of messages with attachments")
+    parser.add_argument("--media-kb", type=int, nargs=2, default=(defaults.media_min_kb, defaults.media_max_kb), metavar=("MIN", "MAX"))
+    parser.add_argument("--no-namespace", action="store_true", help="Write report.xml without an XML namespace")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+    cfg = SynthConfig(
+        messages=args.messages, contacts=args.contacts, calls=args.calls,
+        attachments=args.attachments, attach_rate=args.attach_rate,
+        media_min_kb=args.media_kb[0], media_max_kb=args.media_kb[1],
+        namespaced=not args.no_namespace, seed=args.seed,
+    )
+    stats = generate_ufdr(args.out, cfg)
+    print(json.dumps({"config": asdict(cfg), **stats}, indent=2))
+
+if __name__ == "__main__":
+    main()
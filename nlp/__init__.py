@@ -5,40 +5,79 @@ Author: NLP Engineer
 Python 3.11+
 
 Advanced entity extraction and semantic analysis for forensic investigation.
+
+Submodules are imported on first attribute access (PEP 562), so `import nlp`
+is cheap and a tool that only calls nlp.extract_entities never loads
+phonenumbers, numpy, faiss or sentence-transformers.
 """
 
+import importlib
+import importlib.util
+import sys
+import types
+
 __version__ = "1.0.0"
 __author__ = "NLP Engineer"
 
-# Import main functions for easy access
-from .extractors import extract_entities, extract_phones, extract_emails, extract_urls, extract_crypto_addresses
-from .normalize_phone import normalize_phone, get_phone_metadata, batch_normalize_phones, is_valid_phone
-
-# Conditionally import embeddings worker if dependencies are available
-try:
-    from .embeddings_worker import EmbeddingsWorker
-    __all__ = [
-        "extract_entities",
-        "extract_phones", 
-        "extract_emails",
-        "extract_urls",
-        "extract_crypto_addresses",
-        "normalize_phone",
-        "get_phone_metadata",
-        "batch_normalize_phones", 
-        "is_valid_phone",
-        "EmbeddingsWorker"
-    ]
-except ImportError:
-    # embeddings_worker requires sentence-transformers and faiss
-    __all__ = [
-        "extract_entities",
-        "extract_phones",
-        "extract_emails", 
-        "extract_urls",
-        "extract_crypto_addresses",
-        "normalize_phone",
-        "get_phone_metadata",
-        "batch_normalize_phones",
-        "is_valid_phone"
-    ]
\ No newline at end of file
+# Exported name -> submodule defining it
+_EXPORTS = {
+    "Entity": "entity_engine",
+    "EntityEngine": "entity_engine",
+    "EntityPattern": "entity_engine",
+    "extract_entities": "extractors",
+    "extract_entities_batch": "extractors",
+    "scan_entities": "extractors",
+    "extract_phones": "extractors",
+    "extract_emails": "extractors",
+    "extract_urls": "extractors",
+    "extract_crypto_addresses": "extractors",
+    "Watchlist": "watchlist",
+    "WatchHit": "watchlist",
+    "load_watchlist": "watchlist",
+    # Phone normalization requires phonenumbers; entity extraction works without it
+    "normalize_phone": "normalize_phone",
+    "get_phone_metadata": "normalize_phone",
+    "batch_normalize_phones": "normalize_phone",
+    "is_valid_phone": "normalize_phone",
+    "enrich_phones": "normalize_phone",
+    "phone_cache_stats": "normalize_phone",
+    # Embeddings require numpy, sentence-transformers and faiss
+    "EmbeddingsWorker": "embeddings_worker",
+}
+
+# Third-party packages each optional submodule needs; its names are left out of __all__ without them
+_REQUIRES = {
+    "normalize_phone": "phonenumbers",
+    "embeddings_worker": "numpy",
+}
+
+__all__ = [
+    name for name, module in _EXPORTS.items()
+    if module not in _REQUIRES or importlib.util.find_spec(_REQUIRES[module]) is not None
+]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _Package(types.ModuleType):
+    """Keeps nlp.normalize_phone the function even after the submodule of that name is imported."""
+
+    def __setattr__(self, name, value):
+        # The import system binds each loaded submodule on its package
+        if name in _EXPORTS and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
@@ -0,0 +1,272 @@
+# nlp/batch_extract.py
+"""
+Batch Entity Extraction for UFDR Investigator - Phase 3: NLP & Entity Extraction
+Python 3.11+
+
+Streams a messages.jsonl output (plain, gzip/zstd-compressed or sharded, see
+parsers/jsonl_io.py) through a process pool in chunks of raw lines. Workers
+parse the JSON, extract entities and serialise the result, so the main
+process only moves lines and throughput scales with the number of workers.
+Output order always matches input order.
+
+Two output modes:
+    - sidecar (default): one {"id", "entities"} row per message, written to
+      <messages>_entities.jsonl (optionally compressed/sharded)
+    - in place: each record gets an "nlp_entities" field (see --field) and
+      every input file is rewritten atomically, keeping its compression
+
+Usage:
+    python nlp/batch_extract.py --input parsed/messages.jsonl [--workers 8] [--chunk-size 2000]
+    python nlp/batch_extract.py --input parsed/messages.jsonl --in-place
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from parsers.jsonl_io import COMPRESSION_SUFFIXES, JsonlWriter, index_path, jsonl_exists, open_text, resolve_shards
+except ImportError:  # run as a script: python nlp/batch_extract.py
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from parsers.jsonl_io import COMPRESSION_SUFFIXES, JsonlWriter, index_path, jsonl_exists, open_text, resolve_shards
+
+from nlp.extractors import extract_entities_batch, scan_entities
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_TEXT_FIELD = "body"
+DEFAULT_FIELD = "nlp_entities"
+
+
+def _chunks(items: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    chunk: List[Any] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _ordered_map(func: Any, chunks: Iterable[Any], workers: int, pool: Optional[ProcessPoolExecutor]) -> Iterator[Any]:
+    """Applies func to each chunk, in the pool if there is one, yielding results in input order."""
+    if pool is None:
+        for chunk in chunks:
+            yield func(chunk)
+        return
+    pending: Deque[Future] = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(func, chunk))
+        if len(pending) >= 2 * workers:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def extract_entities_parallel(texts: Iterable[str], workers: int = DEFAULT_WORKERS,
+                              chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Dict[str, List[str]]]:
+    """
+    Extract entities from many texts using a process pool.
+
+    Args:
+        texts: Iterable of message texts
+        workers: Worker processes (1 runs in this process)
+        chunk_size: Texts sent to a worker at a time
+
+    Returns:
+        One extract_entities result per text, in input order
+    """
+    if workers <= 1:
+        return extract_entities_batch(texts)
+    results: List[Dict[str, List[str]]] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_results in _ordered_map(extract_entities_batch, _chunks(texts, chunk_size), workers, pool):
+            results.extend(chunk_results)
+    return results
+
+
+def _process_lines(job: Tuple[List[str], Dict[str, Any]]) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Worker: turns raw JSONL lines into output lines.
+
+    Returns the output lines and counts of records, malformed lines and
+    records with at least one entity.
+    """
+    lines, options = job
+    records: List[Optional[Dict[str, Any]]] = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            records.append(None)
+    texts = [(record.get(options["text_field"]) or "") if isinstance(record, dict) else "" for record in records]
+    results = extract_entities_batch(texts)
+    counts = {"records": 0, "malformed": 0, "with_entities": 0}
+    out: List[str] = []
+    for line, record, text, entities in zip(lines, records, texts, results):
+        if not isinstance(record, dict):
+            counts["malformed"] += 1
+            if options["in_place"]:
+                out.append(line)  # never drop data when rewriting the input
+            continue
+        counts["records"] += 1
+        if any(entities.values()):
+            counts["with_entities"] += 1
+        if options["in_place"]:
+            record[options["field"]] = entities
+            if options["spans"]:
+                record[options["field"] + "_spans"] = [e._asdict() for e in scan_entities(text)]
+            out.append(json.dumps(record, ensure_ascii=False))
+        else:
+            row: Dict[str, Any] = {"id": record.get("id"), "entities": entities}
+            if options["spans"]:
+                row["spans"] = [e._asdict() for e in scan_entities(text)]
+            out.append(json.dumps(row, ensure_ascii=False))
+    return out, counts
+
+
+def _iter_lines(path: Path) -> Iterator[str]:
+    with open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def sidecar_path(input_path: Path) -> Path:
+    """Default sidecar location: parsed/messages.jsonl(.gz) or messages.index.json -> parsed/messages_entities.jsonl"""
+    base = index_path(input_path).name[:-len(".index.json")]
+    return input_path.with_name(base + "_entities.jsonl")
+
+
+def extract_file(
+    input_path: Path,
+    output_path: Optional[Path] = None,
+    in_place: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    text_field: str = DEFAULT_TEXT_FIELD,
+    field: str = DEFAULT_FIELD,
+    spans: bool = False,
+    shard_size: int = 0,
+    compression: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Extract entities for every record of a JSONL output.
+
+    Args:
+        input_path: messages.jsonl (plain, compressed or sharded)
+        output_path: Sidecar path (default: see sidecar_path); ignored with in_place
+        in_place: Add the entities to each record as `field` and rewrite the input files
+        workers: Worker processes (1 runs in this process)
+        chunk_size: Lines sent to a worker at a time
+        text_field: Record field holding the text
+        field: Record field written in place
+        spans: Also write typed entities with character offsets
+        shard_size / compression: Sidecar layout, as for the parser outputs
+
+    Returns:
+        Dictionary with counts, output path, wall time and records/sec
+    """
+    input_path = Path(input_path)
+    if not jsonl_exists(input_path):
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    options = {"text_field": text_field, "field": field, "spans": spans, "in_place": in_place}
+    totals = {"records": 0, "malformed": 0, "with_entities": 0}
+    start = time.perf_counter()
+    shards = resolve_shards(input_path)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if in_place:
+            by_suffix = {suffix: name for name, suffix in COMPRESSION_SUFFIXES.items()}
+            for shard in shards:
+                tmp_dir = Path(tempfile.mkdtemp(dir=shard.parent, prefix=".entities-"))
+                try:
+                    writer = JsonlWriter(tmp_dir / "part.jsonl", compression=by_suffix.get(shard.suffix))
+                    jobs = ((chunk, options) for chunk in _chunks(_iter_lines(shard), chunk_size))
+                    for lines, counts in _ordered_map(_process_lines, jobs, workers, pool):
+                        for line in lines:
+                            writer.write_line(line)
+                        for key, n in counts.items():
+                            totals[key] += n
+                    writer.close()
+                    os.replace(writer.output_path, shard)
+                finally:
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+            output = input_path
+        else:
+            writer = JsonlWriter(output_path or sidecar_path(input_path), shard_size=shard_size, compression=compression)
+            lines_iter = (line for shard in shards for line in _iter_lines(shard))
+            jobs = ((chunk, options) for chunk in _chunks(lines_iter, chunk_size))
+            for lines, counts in _ordered_map(_process_lines, jobs, workers, pool):
+                for line in lines:
+                    writer.write_line(line)
+                for key, n in counts.items():
+                    totals[key] += n
+            writer.close()
+            output = writer.output_path
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    seconds = time.perf_counter() - start
+    if totals["malformed"]:
+        logger.warning("Skipped %d malformed lines", totals["malformed"])
+    return {
+        **totals,
+        "output": str(output),
+        "workers": workers,
+        "seconds": round(seconds, 2),
+        "records_per_s": round(totals["records"] / seconds) if seconds else 0,
+    }
+
+
+def main():
+    """
+    CLI entry point for batch entity extraction.
+    """
+    parser = argparse.ArgumentParser(description="Extract entities from a messages JSONL output in parallel")
+    parser.add_argument("--input", required=True, help="messages.jsonl (plain, compressed or sharded)")
+    parser.add_argument("--out", default=None, help="Sidecar JSONL path (default: <messages>_entities.jsonl)")
+    parser.add_argument("--in-place", action="store_true", help="Add entities to each record instead of writing a sidecar")
+    parser.add_argument("--field", default=DEFAULT_FIELD, help=f"Record field written with --in-place (default: {DEFAULT_FIELD})")
+    parser.add_argument("--text-field", default=DEFAULT_TEXT_FIELD, help=f"Field containing the text (default: {DEFAULT_TEXT_FIELD})")
+    parser.add_argument("--spans", action="store_true", help="Also write typed entities with character offsets")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Worker processes (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help=f"Lines per worker task (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--shard-size", type=int, default=0, help="Split the sidecar into shards of N records")
+    parser.add_argument("--compress", choices=sorted(COMPRESSION_SUFFIXES), default=None, help="Compress the sidecar with gzip or zstd")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    try:
+        result = extract_file(
+            Path(args.input), Path(args.out) if args.out else None, in_place=args.in_place,
+            workers=args.workers, chunk_size=args.chunk_size, text_field=args.text_field,
+            field=args.field, spans=args.spans, shard_size=args.shard_size, compression=args.compress,
+        )
+    except Exception as e:
+        logger.error("Entity extraction failed: %s", str(e))
+        return 1
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,86 @@
+# nlp/embedding_cache.py
+"""
+Embedding Cache for UFDR Investigator - Phase 3: NLP & Entity Extraction
+Python 3.11+
+
+Persistent map of content hash -> embedding for one model, in a SQLite file.
+Keys are the parser's message hash ("sha256:<hex>" of the body), so a body
+that recurs across messages, devices and cases (forwarded chain messages, OTP
+texts, ...) is encoded once and its vector reused on every later run.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+
+# SQLite's default limit on host parameters per statement is 999
+_LOOKUP_BATCH = 500
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed map of content hash -> float32 embedding.
+
+    A cache file belongs to one model; opening it with another raises
+    ValueError. Safe to share between threads.
+    """
+
+    def __init__(self, path: Union[str, Path], model_name: str):
+        self.path = Path(path)
+        self.model_name = model_name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS embeddings (hash TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'model_name'").fetchone()
+        if row is None:
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('model_name', ?)", (model_name,))
+        elif row[0] != model_name:
+            self.conn.close()
+            raise ValueError(f"Embedding cache {self.path} holds {row[0]} embeddings, not {model_name}")
+        self.conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Returns the cached vectors of the given keys; missing keys are left out."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for start in range(0, len(keys), _LOOKUP_BATCH):
+                batch = keys[start:start + _LOOKUP_BATCH]
+                rows = self.conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE hash IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        """Stores vectors and commits; existing keys keep their vector."""
+        rows: List[Tuple[str, bytes]] = [
+            (key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items
+        ]
+        with self._lock:
+            self.conn.executemany("INSERT OR IGNORE INTO embeddings (hash, vector) VALUES (?, ?)", rows)
+            self.conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
@@ -7,30 +7,66 @@ Python 3.11+
 Generates semantic embeddings for messages using sentence-transformers.
 Creates FAISS index for efficient similarity search.
 
+Messages are streamed in chunks: each chunk is encoded, written into a
+preallocated memory-mapped embeddings file and added to the index, and
+progress is checkpointed, so memory is bounded by the chunk size (plus the
+index itself) and an interrupted run resumes from its last chunk.
+
 Requires:
     pip install sentence-transformers
     pip install faiss-cpu  # or faiss-gpu for GPU acceleration
 """
 
 import argparse
+import hashlib
+import importlib.util
 import json
 import logging
 import os
 import pickle
+import sys
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
 import numpy as np
+from numpy.lib import format as npy_format
+from numpy.lib.format import open_memmap
+
+# faiss and sentence-transformers (which pulls in torch) are imported on first
+# use, so loading this module, or a search that needs only one of them, is cheap
+faiss = None
+SentenceTransformer = None
+
+
+def _import_faiss():
+    """Returns the faiss module, or None if it is not installed."""
+    global faiss
+    if faiss is None and importlib.util.find_spec("faiss") is not None:
+        import faiss as faiss_module
+        faiss = faiss_module
+    return faiss
 
-try:
-    import faiss
-except ImportError:
-    faiss = None
+
+def _import_sentence_transformer():
+    """Returns the SentenceTransformer class, or None if sentence-transformers is not installed."""
+    global SentenceTransformer
+    if SentenceTransformer is None and importlib.util.find_spec("sentence_transformers") is not None:
+        from sentence_transformers import SentenceTransformer as model_class
+        SentenceTransformer = model_class
+    return SentenceTransformer
 
 try:
-    from sentence_transformers import SentenceTransformer
-except ImportError:
-    SentenceTransformer = None
+    from parsers.jsonl_io import DEFAULT_READ_WORKERS, iter_records, jsonl_exists
+except ImportError:  # run as a script: python nlp/embeddings_worker.py
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from parsers.jsonl_io import DEFAULT_READ_WORKERS, iter_records, jsonl_exists
+
+from nlp.embedding_cache import EmbeddingCache
+from nlp.id_map import ID_MAP_FILE, id_map_files, load_id_map, segment_file, tombstone_path, write_id_map
+from nlp.faiss_index import (
+    INDEX_TYPES, apply_search_params, build_index, index_spec, load_index, needs_training, new_index, save_index,
+    search_live,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +76,333 @@ DEFAULT_MODEL = "all-MiniLM-L6-v2"  # Fast, good quality general-purpose model
 # "all-mpnet-base-v2"  # Higher quality but slower
 # "multi-qa-MiniLM-L6-cos-v1"  # Optimized for Q&A/search
 
+# Parser output (messages.jsonl) keeps message text in "body"
+DEFAULT_TEXT_FIELD = "body"
+# Texts encoded, written and checkpointed together
+DEFAULT_CHUNK_SIZE = 10000
+CHECKPOINT_VERSION = 1
+CHECKPOINT_FILE = ".embeddings_checkpoint.json"
+# Outputs are built under these names and renamed when the run completes
+PARTIAL_EMBEDDINGS_FILE = "embeddings.partial.npy"
+PARTIAL_IDS_FILE = "message_ids.partial.txt"
+
+
+def content_key(message: Dict[str, Any], text: str, text_field: str = DEFAULT_TEXT_FIELD) -> str:
+    """
+    Cache key of a message's text: the parser's "sha256:<hex>" body hash when
+    the body is what is embedded, else the SHA-256 of the text itself.
+    """
+    digest = message.get("hash") if text_field == "body" else None
+    if isinstance(digest, str) and digest.startswith("sha256:") and len(digest) == 71:
+        return digest
+    return "sha256:" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def iter_texts(input_file: Path, text_field: str = DEFAULT_TEXT_FIELD, read_workers: int = 1,
+               skip_known: bool = False, stats: Optional[Dict[str, int]] = None) -> Iterator[Tuple[str, str, str]]:
+    """
+    Yields (message_id, text, content key) for every record with text to embed.
+
+    Args:
+        input_file: JSONL file (plain, compressed or sharded)
+        text_field: Field containing the text
+        read_workers: Processes decoding shards in parallel
+        skip_known: Skip records the parser tagged as known files
+        stats: If given, counts the records read ("records"), those with text_field ("with_field")
+               and the known records skipped ("skipped")
+    """
+    for record_num, message in enumerate(iter_records(input_file, workers=read_workers), 1):
+        if stats is not None:
+            stats["records"] = stats.get("records", 0) + 1
+            if text_field in message:
+                stats["with_field"] = stats.get("with_field", 0) + 1
+        if skip_known and message.get("known"):
+            if stats is not None:
+                stats["skipped"] = stats.get("skipped", 0) + 1
+            continue
+        text_content = message.get(text_field, "")
+        if text_content and isinstance(text_content, str):
+            yield (str(message.get("id", f"msg_{record_num}")), text_content,
+                   content_key(message, text_content, text_field))
+
+
+def _replace_json(path: Path, data: Dict[str, Any], indent: Optional[int] = None) -> None:
+    """Writes a JSON file through a temporary file and a rename, so readers never see it half-written."""
+    tmp_path = path.with_suffix(".tmp")
+    with tmp_path.open('w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _load_checkpoint(path: Path, identity: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Returns the saved state, or None if there is no checkpoint."""
+    if not path.exists():
+        return None
+    with path.open('r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version in {path}")
+    if state.get("identity") != identity:
+        raise ValueError(f"Checkpoint {path} belongs to a different run: {state.get('identity')} != {identity}")
+    return state
+
+
+def _read_npy_header(f) -> Tuple[Tuple[int, int], Any, int]:
+    """Shape, dtype and data offset of an open .npy file."""
+    version = npy_format.read_magic(f)
+    if version == (1, 0):
+        shape, fortran_order, dtype = npy_format.read_array_header_1_0(f)
+    elif version == (2, 0):
+        shape, fortran_order, dtype = npy_format.read_array_header_2_0(f)
+    else:
+        raise ValueError(f"Unsupported .npy format version {version}")
+    if fortran_order or len(shape) != 2:
+        raise ValueError(f"Expected a C-ordered matrix, got shape {shape}")
+    return shape, dtype, f.tell()
+
+
+def _npy_header_bytes(version: Tuple[int, int], dtype: Any, shape: Tuple[int, int], size: int) -> bytes:
+    """A .npy header of exactly size bytes (magic included), space-padded as numpy pads it."""
+    magic = npy_format.magic(*version)
+    length_size = 2 if version == (1, 0) else 4
+    room = size - len(magic) - length_size
+    header = repr({"descr": npy_format.dtype_to_descr(dtype), "fortran_order": False, "shape": shape})
+    if len(header) + 1 > room:
+        raise ValueError(f"No room in the {size}-byte .npy header for shape {shape}")
+    return magic + room.to_bytes(length_size, "little") + header.ljust(room - 1).encode("latin1") + b"\n"
+
+
+def _grow_npy(path: Path, base: int, rows: int, dim: int) -> np.memmap:
+    """
+    Extends a (base, dim) .npy matrix to rows in place and maps all of it.
+
+    The header keeps the old shape, so readers still see the base rows, until
+    _set_npy_rows records the new row count; nothing before row base is rewritten.
+    """
+    with path.open('rb') as f:
+        version = npy_format.read_magic(f)
+        f.seek(0)
+        shape, dtype, offset = _read_npy_header(f)
+    # The header is already at rows when a run stopped after _set_npy_rows
+    if shape[1] != dim or shape[0] not in (base, rows):
+        raise ValueError(f"{path.name} has shape {shape}, expected {(base, dim)}")
+    # Fail before writing anything if the final shape will not fit the header
+    _npy_header_bytes(version, dtype, (rows, dim), offset)
+    os.truncate(path, offset + rows * dim * dtype.itemsize)
+    return np.memmap(path, dtype=dtype, mode='r+', offset=offset, shape=(rows, dim))
+
+
+def _set_npy_rows(path: Path, rows: int) -> None:
+    """Rewrites the shape in a .npy header in place, after _grow_npy."""
+    with path.open('r+b') as f:
+        version = npy_format.read_magic(f)
+        f.seek(0)
+        shape, dtype, offset = _read_npy_header(f)
+        f.seek(0)
+        f.write(_npy_header_bytes(version, dtype, (rows, shape[1]), offset))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _encode_chunk(chunk: List[Tuple[str, str, str]], encode: Callable[[List[str]], np.ndarray],
+                  cache: Optional[EmbeddingCache], stats: Dict[str, int]) -> np.ndarray:
+    """Vectors of a chunk, encoding each distinct text once and only if it is not cached."""
+    vectors: Dict[str, np.ndarray] = cache.get_many(key for _, _, key in chunk) if cache is not None else {}
+    stats["cached"] += sum(1 for _, _, key in chunk if key in vectors)
+    missing: Dict[str, str] = {}
+    for _, text, key in chunk:
+        if key not in vectors:
+            missing.setdefault(key, text)
+    if missing:
+        encoded = np.asarray(encode(list(missing.values())), dtype=np.float32)
+        stats["encoded"] += len(missing)
+        new = dict(zip(missing, encoded))
+        if cache is not None:
+            cache.put_many(new.items())
+        vectors.update(new)
+    return np.stack([vectors[key] for _, _, key in chunk])
+
+
+def write_embeddings(
+    items: Iterable[Tuple[str, str, str]],
+    total: int,
+    encode: Callable[[List[str]], np.ndarray],
+    output_dir: Path,
+    identity: Dict[str, Any],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    resume: bool = True,
+    index_factory: Optional[Callable[[int], Any]] = None,
+    append: bool = False,
+    cache: Optional[EmbeddingCache] = None,
+    finish_index: Optional[Callable[[Any], Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Encodes (message_id, text, content key) items chunk by chunk into output_dir.
+
+    Each chunk is written into a preallocated memory-mapped embeddings file of
+    total rows and added to the index, then the file, the id list and a
+    checkpoint are flushed. When the run completes the outputs are renamed to
+    embeddings.npy and the ids are written to the id map (nlp/id_map.py)
+    named in metadata.json.
+
+    When appending, nothing already in output_dir is copied: embeddings.npy is
+    extended in place (its header keeps the old row count until the run
+    completes) and the new ids go to a new id map segment.
+
+    metadata.json is written last, through a rename, so a reader sees either
+    the previous outputs or the complete new ones; finish_index runs before it
+    to save the index the new metadata describes.
+
+    Within a chunk each distinct content key is encoded once; with a cache,
+    keys it already holds are not encoded at all.
+
+    Args:
+        items: (message_id, text, content key) triples, the same sequence on every attempt
+        total: Number of items
+        encode: Returns one L2-normalised row per text
+        output_dir: Output directory
+        identity: Run settings stored in metadata.json; a checkpoint is only resumed if they match
+        chunk_size: Texts per chunk
+        resume: Continue from a checkpoint left by an interrupted run with the same identity
+        index_factory: Returns the index for a dimension; None to build no index. The index
+                       may already hold rows (index.ntotal), e.g. the previous run's when appending
+        append: Keep the embeddings and message ids already in output_dir and add the items after them
+        cache: Embedding cache consulted before encoding and updated with new vectors
+        finish_index: Called with the index (None if index_factory built none) once
+                      embeddings.npy holds every row and before metadata.json is written;
+                      returns the index to report, e.g. after building and saving it
+
+    Returns:
+        Dictionary with the number of rows added, encoded and taken from the cache,
+        the total rows, the embedding dimension and the index
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = output_dir / CHECKPOINT_FILE
+    embeddings_path = output_dir / PARTIAL_EMBEDDINGS_FILE
+    ids_path = output_dir / PARTIAL_IDS_FILE
+    metadata_file = output_dir / "metadata.json"
+
+    previous: Dict[str, Any] = {}
+    if append and metadata_file.exists():
+        with open(metadata_file, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    base = previous.get("num_embeddings", 0)
+    identity = {**identity, "total": total, "base_rows": base}
+
+    state = _load_checkpoint(checkpoint_path, identity) if resume else None
+    done = state["rows"] if state else base
+    dim = state["embedding_dim"] if state else None
+    matrix = index = None
+    stats = {"encoded": 0, "cached": 0}
+
+    def open_outputs(dimension: int) -> None:
+        nonlocal matrix, index
+        if matrix is None:
+            if base:
+                matrix = _grow_npy(output_dir / "embeddings.npy", base, base + total, dimension)
+            else:
+                matrix = open_memmap(embeddings_path, mode='w+', dtype=np.float32, shape=(total, dimension))
+        index = index_factory(dimension) if index_factory is not None else None
+        if index is not None:
+            # Catch the index up with the rows on disk it does not hold yet: rows written
+            # before an interruption, or all previous rows when the index is new
+            for start in range(index.ntotal, done, chunk_size):
+                index.add(np.ascontiguousarray(matrix[start:min(done, start + chunk_size)]))
+
+    if state:
+        if not base:
+            matrix = np.load(embeddings_path, mmap_mode='r+')
+        open_outputs(dim)
+        os.truncate(ids_path, state["ids_offset"])
+        logger.info("Resuming from checkpoint at %d/%d embeddings", done - base, total)
+        ids_file = ids_path.open('a', encoding='utf-8')
+    else:
+        ids_file = ids_path.open('w', encoding='utf-8')
+
+    try:
+        chunk: List[Tuple[str, str, str]] = []
+        position = 0
+
+        def flush_chunk() -> None:
+            nonlocal dim, done
+            vectors = _encode_chunk(chunk, encode, cache, stats)
+            if matrix is None:
+                dim = int(vectors.shape[1])
+                open_outputs(dim)
+            matrix[done:done + len(chunk)] = vectors
+            if index is not None:
+                index.add(vectors)
+            ids_file.write("".join(message_id.replace("\n", " ") + "\n" for message_id, _, _ in chunk))
+            done += len(chunk)
+            # Rows and ids must be on disk before the checkpoint that counts them
+            matrix.flush()
+            ids_file.flush()
+            os.fsync(ids_file.fileno())
+            _replace_json(checkpoint_path, {
+                "version": CHECKPOINT_VERSION,
+                "identity": identity,
+                "rows": done,
+                "embedding_dim": dim,
+                "ids_offset": ids_file.tell(),
+            })
+            logger.info("Embedded %d/%d messages", done - base, total)
+
+        for item in items:
+            position += 1
+            if position <= done - base:
+                continue
+            if done - base + len(chunk) >= total:
+                raise ValueError(f"Input has more than the {total} messages it was sized for; it changed during the run")
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                flush_chunk()
+                chunk = []
+        if chunk:
+            flush_chunk()
+    finally:
+        ids_file.close()
+
+    if done != base + total:
+        raise ValueError(f"Input has {done - base} messages, not the {total} it was sized for; it changed during the run")
+
+    del matrix
+    if base:
+        _set_npy_rows(output_dir / "embeddings.npy", done)
+        id_maps = id_map_files(previous)
+        if not id_maps:
+            # Outputs from before id maps: their ids move out of metadata.json once
+            write_id_map(previous["message_ids"], output_dir / ID_MAP_FILE)
+            id_maps = [ID_MAP_FILE]
+        id_maps.append(segment_file(base))
+    else:
+        os.replace(embeddings_path, output_dir / "embeddings.npy")
+        # Rows were renumbered: deletions recorded against the previous map no longer apply
+        tombstone_path(output_dir / ID_MAP_FILE).unlink(missing_ok=True)
+        id_maps = [ID_MAP_FILE]
+    with ids_path.open('r', encoding='utf-8') as f:
+        write_id_map((line.rstrip("\n") for line in f), output_dir / id_maps[-1])
+    if finish_index is not None:
+        index = finish_index(index)
+    metadata = {
+        **{k: v for k, v in identity.items() if k not in ("total", "base_rows")},
+        "embedding_dim": dim,
+        "num_embeddings": done,
+        "id_map": id_maps,
+    }
+    _replace_json(metadata_file, metadata, indent=2)
+    if not base:
+        # Earlier segments and their deletions are removed only now that metadata.json no longer names them
+        listed = set(id_maps) | {tombstone_path(name).name for name in id_maps}
+        for stale in output_dir.glob("message_ids*.bin*"):
+            if stale.name not in listed:
+                stale.unlink()
+    logger.info("Saved %d embeddings and metadata to: %s", done, output_dir)
+    ids_path.unlink()
+    checkpoint_path.unlink()
+    return {"processed": total, **stats, "rows": done, "embedding_dim": dim, "index": index}
+
 
 class EmbeddingsWorker:
     """
@@ -53,7 +416,7 @@ class EmbeddingsWorker:
         Args:
             model_name: Name of the sentence-transformers model to use
         """
-        if SentenceTransformer is None:
+        if importlib.util.find_spec("sentence_transformers") is None:
             raise ImportError("sentence-transformers is required. Install with: pip install sentence-transformers")
         
         self.model_name = model_name
@@ -66,20 +429,21 @@ class EmbeddingsWorker:
         """Load the sentence transformer model."""
         if self.model is None:
             logger.info("Loading sentence transformer model: %s", self.model_name)
-            self.model = SentenceTransformer(self.model_name)
+            self.model = _import_sentence_transformer()(self.model_name)
             
             # Get embedding dimension
             test_embedding = self.model.encode(["test"])
             self.embedding_dim = len(test_embedding[0])
             logger.info("Model loaded. Embedding dimension: %d", self.embedding_dim)
     
-    def generate_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+    def generate_embeddings(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = True) -> np.ndarray:
         """
         Generate embeddings for a list of texts.
         
         Args:
             texts: List of text strings to embed
             batch_size: Batch size for encoding (default: 32)
+            show_progress_bar: Show a progress bar while encoding
             
         Returns:
             NumPy array of embeddings with shape (len(texts), embedding_dim)
@@ -89,112 +453,185 @@ class EmbeddingsWorker:
         
         self.load_model()
         
-        logger.info("Generating embeddings for %d texts", len(texts))
+        logger.debug("Generating embeddings for %d texts", len(texts))
         
         # Generate embeddings in batches
         embeddings = self.model.encode(
             texts,
             batch_size=batch_size,
-            show_progress_bar=True,
+            show_progress_bar=show_progress_bar,
             convert_to_numpy=True,
             normalize_embeddings=True  # L2 normalization for cosine similarity
         )
         
-        logger.info("Generated embeddings with shape: %s", embeddings.shape)
+        logger.debug("Generated embeddings with shape: %s", embeddings.shape)
         return embeddings
     
-    def process_jsonl_file(self, input_file: Path, output_dir: Path, text_field: str = "content") -> Dict[str, Any]:
+    def process_jsonl_file(self, input_file: Path, output_dir: Path, text_field: str = DEFAULT_TEXT_FIELD,
+                           read_workers: int = 1, skip_known: bool = False,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE, resume: bool = True,
+                           incremental: bool = False, cache_path: Optional[Path] = None,
+                           index_type: str = "auto", index_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Process a JSONL file to generate embeddings for message content.
         
+        The file is read twice: once to count the messages with text, so the
+        embeddings file can be preallocated, and once to encode them chunk by
+        chunk (see write_embeddings).
+        
+        With incremental, output_dir keeps the embeddings of an earlier run:
+        messages whose id it already holds are skipped, and the new ones are
+        appended to its embeddings, message ids and FAISS index.
+        
+        The index type is chosen from the total number of embeddings (see
+        nlp/faiss_index.py). Untrained types are filled chunk by chunk; IVF
+        types are trained on a sample and filled once all embeddings are
+        written. An appended index keeps the type it was built with.
+        
         Args:
-            input_file: Path to input JSONL file containing messages
+            input_file: Path to input JSONL file containing messages (plain, compressed or sharded)
             output_dir: Directory to save output files
-            text_field: Field name containing text to embed (default: "content")
+            text_field: Field name containing text to embed (default: "body", as in parser output;
+                        only then is the parser's body hash the cache key, see content_key)
+            read_workers: Processes decoding shards in parallel
+            skip_known: Skip records the parser tagged as known files (e.g. a blobs manifest
+                        built with --known-files), so boilerplate is not embedded
+            chunk_size: Messages encoded and checkpointed together; bounds memory use
+            resume: Continue an interrupted run from its last checkpoint
+            incremental: Add only messages not already in output_dir
+            cache_path: SQLite embedding cache keyed by content hash, shared between runs
+                        and cases, so each distinct body is encoded once per model
+            index_type: One of faiss_index.INDEX_TYPES (default: auto)
+            index_options: nlist, nprobe, ef_search, hnsw_m or pq_m for faiss_index.index_spec
             
         Returns:
             Dictionary with processing statistics
         """
-        if not input_file.exists():
+        if not jsonl_exists(input_file):
             raise FileNotFoundError(f"Input file not found: {input_file}")
         
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Read messages from JSONL
-        messages = []
-        texts = []
-        message_ids = []
-        
-        logger.info("Reading messages from: %s", input_file)
-        
-        with open(input_file, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                try:
-                    message = json.loads(line.strip())
-                    text_content = message.get(text_field, "")
-                    
-                    if text_content and isinstance(text_content, str):
-                        messages.append(message)
-                        texts.append(text_content)
-                        message_ids.append(message.get("id", f"msg_{line_num}"))
-                    
-                except json.JSONDecodeError as e:
-                    logger.warning("Failed to parse JSON on line %d: %s", line_num, str(e))
-                    continue
-        
-        if not texts:
-            logger.warning("No valid text content found in %s", input_file)
-            return {"processed": 0, "skipped": 0}
-        
-        logger.info("Found %d messages with text content", len(texts))
-        
-        # Generate embeddings
-        embeddings = self.generate_embeddings(texts)
-        
-        # Save embeddings and metadata
-        embeddings_file = output_dir / "embeddings.npy"
         metadata_file = output_dir / "metadata.json"
+        index_file = output_dir / "faiss.index"
+        indexed_rows = 0
+        previous_spec = None
+        if incremental and metadata_file.exists():
+            with open(metadata_file, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            if metadata.get("model_name") != self.model_name:
+                raise ValueError(f"{output_dir} holds {metadata.get('model_name')} embeddings, not {self.model_name}")
+            indexed_rows = metadata["num_embeddings"]
+            # Indexes written before index types were recorded are flat
+            previous_spec = metadata.get("index")
+            if previous_spec is None and index_file.exists():
+                previous_spec = index_spec("flat", indexed_rows, metadata["embedding_dim"])
+            logger.info("Appending to %d existing embeddings", indexed_rows)
+        
+        def new_texts(stats=None):
+            # The id map is opened per pass and closed before write_embeddings replaces it
+            indexed_ids = load_id_map(output_dir, metadata) if indexed_rows else None
+            try:
+                for item in iter_texts(input_file, text_field, read_workers, skip_known, stats):
+                    if indexed_ids is None or item[0] not in indexed_ids:
+                        yield item
+            finally:
+                if indexed_ids is not None:
+                    indexed_ids.close()
+        
+        logger.info("Counting messages in: %s", input_file)
+        stats = {"skipped": 0}
+        total = sum(1 for _ in new_texts(stats))
+        
+        if stats.get("records") and not stats.get("with_field"):
+            raise ValueError(f"No record in {input_file} has a {text_field!r} field; "
+                             f"parser output keeps message text in {DEFAULT_TEXT_FIELD!r}")
+        if not total:
+            logger.warning("No new text content found in %s", input_file)
+            return {"processed": 0, "skipped": stats["skipped"], "output_dir": str(output_dir)}
+        
+        logger.info("Found %d messages with text content", total)
+        
+        if _import_faiss() is None:
+            logger.warning("FAISS not available. Skipping index creation. Install with: pip install faiss-cpu")
         
-        # Save embeddings as NumPy array
-        np.save(embeddings_file, embeddings)
-        logger.info("Saved embeddings to: %s", embeddings_file)
+        spec = None
+        if _import_faiss() is not None:
+            self.load_model()
+            spec = previous_spec or index_spec(index_type, indexed_rows + total, self.embedding_dim,
+                                               **(index_options or {}))
+            logger.info("Using %s index (%s)", spec["type"], spec["factory"])
         
-        # Save metadata
-        metadata = {
+        identity = {
             "model_name": self.model_name,
-            "embedding_dim": self.embedding_dim,
-            "num_embeddings": len(embeddings),
-            "message_ids": message_ids,
             "text_field": text_field,
-            "input_file": str(input_file)
+            "input_file": str(input_file),
+            "skip_known": skip_known,
+            "index": spec,
         }
         
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2)
-        logger.info("Saved metadata to: %s", metadata_file)
-        
-        # Create FAISS index if available
-        if faiss is not None:
-            self.create_faiss_index(embeddings, output_dir)
-        else:
-            logger.warning("FAISS not available. Skipping index creation. Install with: pip install faiss-cpu")
+        def index_factory(dimension: int):
+            # The previous index is only replaced once every row is written, so when an
+            # append resumes it holds the previous rows, or all of them if the run stopped
+            # between saving it and writing metadata.json
+            if previous_spec is not None and index_file.exists():
+                return apply_search_params(faiss.read_index(str(index_file)), spec["search_params"])
+            if needs_training(spec):
+                return None  # trained and filled once every row is written
+            return new_index(spec, dimension)
+        
+        def finish_index(index):
+            if index is None:
+                logger.info("Training %s index on %d of %d embeddings", spec["type"], spec["train_size"],
+                            indexed_rows + total)
+                index = build_index(np.load(output_dir / "embeddings.npy", mmap_mode='r'), spec)
+            save_index(index, index_file)
+            logger.info("Saved FAISS index to: %s", index_file)
+            return index
+        
+        cache = EmbeddingCache(cache_path, self.model_name) if cache_path else None
+        try:
+            result = write_embeddings(
+                new_texts(),
+                total,
+                lambda texts: self.generate_embeddings(texts, show_progress_bar=False),
+                output_dir,
+                identity,
+                chunk_size=chunk_size,
+                resume=resume,
+                index_factory=index_factory if spec is not None else None,
+                append=incremental,
+                cache=cache,
+                finish_index=finish_index if spec is not None else None,
+            )
+        finally:
+            if cache is not None:
+                cache.close()
+        self.embedding_dim = result["embedding_dim"]
         
         return {
-            "processed": len(texts),
-            "skipped": 0,
+            "processed": result["processed"],
+            "encoded": result["encoded"],
+            "cached": result["cached"],
+            "total_embeddings": result["rows"],
+            "skipped": stats["skipped"],
             "embedding_dim": self.embedding_dim,
             "output_dir": str(output_dir)
         }
     
-    def create_faiss_index(self, embeddings: np.ndarray, output_dir: Path):
+    def create_faiss_index(self, embeddings: np.ndarray, output_dir: Path, index_type: str = "flat",
+                           index_options: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """
         Create a FAISS index for efficient similarity search.
         
         Args:
             embeddings: NumPy array of embeddings
             output_dir: Directory to save the FAISS index
+            index_type: One of faiss_index.INDEX_TYPES (default: flat)
+            index_options: nlist, nprobe, ef_search, hnsw_m or pq_m for faiss_index.index_spec
+            
+        Returns:
+            The index spec, to be stored as "index" in metadata.json
         """
-        if faiss is None:
+        if _import_faiss() is None:
             logger.warning("FAISS not available. Cannot create index.")
             return
         
@@ -204,19 +641,18 @@ class EmbeddingsWorker:
         
         logger.info("Creating FAISS index for %d embeddings", len(embeddings))
         
-        # Create FAISS index (using IndexFlatIP for cosine similarity with normalized vectors)
-        dimension = embeddings.shape[1]
-        index = faiss.IndexFlatIP(dimension)  # Inner product (cosine similarity for normalized vectors)
-        
-        # Add embeddings to index
-        index.add(embeddings.astype(np.float32))
+        # Inner product is cosine similarity for normalized vectors
+        spec = index_spec(index_type, len(embeddings), embeddings.shape[1], **(index_options or {}))
+        index = build_index(embeddings, spec)
         
         # Save index
         index_file = output_dir / "faiss.index"
-        faiss.write_index(index, str(index_file))
+        save_index(index, index_file)
         logger.info("Saved FAISS index to: %s", index_file)
+        return spec
     
-    def search_similar(self, query_text: str, embeddings_dir: Path, top_k: int = 10) -> List[Dict[str, Any]]:
+    def search_similar(self, query_text: str, embeddings_dir: Path, top_k: int = 10,
+                       mmap: bool = True) -> List[Dict[str, Any]]:
         """
         Search for similar messages given a query text.
         
@@ -224,6 +660,8 @@ class EmbeddingsWorker:
             query_text: Text to search for similar messages
             embeddings_dir: Directory containing embeddings and FAISS index
             top_k: Number of top similar results to return
+            mmap: Memory-map the index rather than reading it (see faiss_index.load_index);
+                  a flat index is then searched over embeddings.npy without faiss
             
         Returns:
             List of dictionaries with similarity results
@@ -236,35 +674,27 @@ class EmbeddingsWorker:
         with open(metadata_file, 'r', encoding='utf-8') as f:
             metadata = json.load(f)
         
-        # Load FAISS index
-        index_file = embeddings_dir / "faiss.index"
-        if not index_file.exists():
-            raise FileNotFoundError(f"FAISS index not found: {index_file}")
-        
-        if faiss is None:
-            raise ImportError("FAISS is required for similarity search. Install with: pip install faiss-cpu")
-        
-        index = faiss.read_index(str(index_file))
+        # Open the index
+        index = load_index(embeddings_dir, metadata, mmap=mmap)
         
         # Generate query embedding
         self.load_model()
         query_embedding = self.model.encode([query_text], normalize_embeddings=True)
         
-        # Search for similar embeddings
-        scores, indices = index.search(query_embedding.astype(np.float32), top_k)
-        
-        # Format results
-        results = []
-        message_ids = metadata["message_ids"]
-        
-        for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-            if idx < len(message_ids):
+        # Deleted rows are still in the index; search_live searches deeper until top_k live rows are found
+        message_ids = load_id_map(embeddings_dir, metadata)
+        try:
+            # Format results
+            results = []
+            for score, idx, message_id in search_live(index, message_ids, query_embedding, top_k):
                 results.append({
-                    "rank": i + 1,
-                    "message_id": message_ids[idx],
-                    "similarity_score": float(score),
-                    "index": int(idx)
+                    "rank": len(results) + 1,
+                    "message_id": message_id,
+                    "similarity_score": score,
+                    "index": idx
                 })
+        finally:
+            message_ids.close()
         
         return results
 
@@ -277,7 +707,17 @@ def main():
     parser.add_argument("--input", required=True, help="Input JSONL file with messages")
     parser.add_argument("--out", required=True, help="Output directory for embeddings")
     parser.add_argument("--model", default=DEFAULT_MODEL, help=f"Sentence transformer model (default: {DEFAULT_MODEL})")
-    parser.add_argument("--text-field", default="content", help="Field containing text to embed (default: content)")
+    parser.add_argument("--text-field", default=DEFAULT_TEXT_FIELD, help=f"Field containing text to embed (default: {DEFAULT_TEXT_FIELD})")
+    parser.add_argument("--read-workers", type=int, default=DEFAULT_READ_WORKERS, help=f"Processes decoding sharded JSONL in parallel (default: {DEFAULT_READ_WORKERS})")
+    parser.add_argument("--skip-known", action="store_true", help="Skip records tagged as known files by the parser")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help=f"Messages encoded and checkpointed together (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--no-resume", action="store_true", help="Start over instead of resuming an interrupted run")
+    parser.add_argument("--incremental", action="store_true", help="Append only messages not yet in --out to its embeddings and index")
+    parser.add_argument("--cache", default=None, help="SQLite embedding cache keyed by content hash, shared between runs and cases")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="auto", help="FAISS index type (default: auto, by number of embeddings)")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF cells (default: about 4 * sqrt(embeddings))")
+    parser.add_argument("--nprobe", type=int, default=None, help="IVF cells scanned per query, stored with the index")
+    parser.add_argument("--ef-search", type=int, default=None, help="HNSW search list size, stored with the index")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
     
     args = parser.parse_args()
@@ -293,14 +733,18 @@ def main():
     input_file = Path(args.input)
     output_dir = Path(args.out)
     
-    if not input_file.exists():
+    if not jsonl_exists(input_file):
         logger.error("Input file not found: %s", input_file)
         return 1
     
     try:
         # Initialize worker and process file
         worker = EmbeddingsWorker(model_name=args.model)
-        result = worker.process_jsonl_file(input_file, output_dir, args.text_field)
+        result = worker.process_jsonl_file(input_file, output_dir, args.text_field, args.read_workers, args.skip_known,
+                                           args.chunk_size, resume=not args.no_resume, incremental=args.incremental,
+                                           cache_path=Path(args.cache) if args.cache else None, index_type=args.index_type,
+                                           index_options={k: v for k, v in (("nlist", args.nlist), ("nprobe", args.nprobe),
+                                                                            ("ef_search", args.ef_search)) if v is not None})
         
         logger.info("Processing complete: %s", result)
         print(f"Successfully processed {result['processed']} messages")
@@ -0,0 +1,186 @@
+# nlp/entity_engine.py
+"""
+Single-scan Entity Engine for UFDR Investigator - Phase 3: NLP & Entity Extraction
+Python 3.11+
+
+Compiles entity patterns into one regex of named groups, so a message body is
+scanned once for all of them instead of once per entity type. Where two of
+these patterns could match at the same position, the earlier one wins.
+Patterns marked independent are scanned on their own instead, so their
+matches may overlap other kinds': a wallet or email inside a URL, or a phone
+number inside any of them, is still reported, as it was when every type had
+its own scan. Entity kinds whose values can nest inside another kind's must
+be independent.
+
+The combined regex starts with a lookahead on the characters any entity can
+start with, which lets the regex engine skip ahead to candidate positions
+instead of trying every alternative at every character. Patterns that can
+start almost anywhere (emails) are only scanned for when the text contains
+their required literal ("@" for emails, "://" for URLs).
+"""
+
+import heapq
+import re
+from typing import Dict, Iterator, List, Match, NamedTuple, Optional, Pattern, Sequence, Tuple
+
+
+class Entity(NamedTuple):
+    """One entity occurrence: its type, text and character offsets in the body."""
+    kind: str
+    value: str
+    start: int
+    end: int
+
+
+class EntityPattern(NamedTuple):
+    """
+    Regex for one entity kind.
+
+    first: characters a match can start with, as character class members: single
+           characters (escaped where needed when the class is built) or escapes such as \\d
+    requires: literal every match contains; the pattern is skipped for texts without it
+    independent: scan this pattern on its own, so its matches may overlap other kinds'
+    """
+    regex: str
+    first: str
+    requires: str = ""
+    independent: bool = False
+
+
+# Entity kinds used by nlp.extractors, in priority order
+NLP_PATTERNS: Dict[str, EntityPattern] = {
+    "url": EntityPattern(r'http[s]?://\S+', "h", requires="://"),
+    "email": EntityPattern(r'[\w\.-]+@[\w\.-]+\.\w+', r"\w.-", requires="@", independent=True),
+    "ethereum": EntityPattern(r'0x[a-fA-F0-9]{40}', "0", independent=True),
+    "bitcoin": EntityPattern(r'[13][a-km-zA-HJ-NP-Z1-9]{25,34}', "13", independent=True),
+    "phone": EntityPattern(r'\+?\d{7,15}', r"+\d", independent=True),
+}
+
+# Result key -> entity kinds whose values it collects, in order
+NLP_GROUPS: Dict[str, Sequence[str]] = {
+    "phones": ("phone",),
+    "crypto_addresses": ("ethereum", "bitcoin"),
+    "emails": ("email",),
+    "urls": ("url",),
+}
+
+
+def _class_members(first: str) -> List[str]:
+    """Splits EntityPattern.first into character class members, escaping the class metacharacters."""
+    members = []
+    i = 0
+    while i < len(first):
+        if first[i] == "\\":
+            members.append(first[i:i + 2])
+            i += 2
+        else:
+            members.append("\\" + first[i] if first[i] in "[]^-" else first[i])
+            i += 1
+    return members
+
+
+def _compile(active: List[Tuple[str, EntityPattern]]) -> Pattern:
+    """One regex with a named group per pattern, preceded by a lookahead on their first characters."""
+    members = list(dict.fromkeys(m for _, p in active for m in _class_members(p.first)))
+    alternatives = "|".join(f"(?P<{kind}>{p.regex})" for kind, p in active)
+    if len(active) == 1 and len(members) == 1 and not members[0].startswith("\\"):
+        # A lone pattern starting with a literal: re's own literal prefix search is faster
+        return re.compile(alternatives)
+    return re.compile(f"(?=[{''.join(members)}])(?:{alternatives})")
+
+
+class EntityEngine:
+    """
+    A set of entity patterns compiled into one scanner.
+
+    Args:
+        patterns: Entity kind -> EntityPattern, in priority order
+        groups: Result key -> kinds collected under it (see extract)
+        dedupe: Drop repeated values within each result key, keeping first occurrences
+    """
+
+    def __init__(self, patterns: Dict[str, EntityPattern], groups: Dict[str, Sequence[str]], dedupe: bool = True):
+        for kinds in groups.values():
+            unknown = set(kinds) - set(patterns)
+            if unknown:
+                raise ValueError(f"Unknown entity kinds in groups: {sorted(unknown)}")
+        self.patterns = dict(patterns)
+        self.kinds = list(patterns)
+        self.groups = {key: tuple(kinds) for key, kinds in groups.items()}
+        self.dedupe = dedupe
+        self._combined = {kind: p for kind, p in patterns.items() if not p.independent}
+        self._literals = list(dict.fromkeys(p.requires for p in patterns.values() if p.requires))
+        # Scanners keyed by which required literals the text contains
+        self._compiled: Dict[Tuple[bool, ...], List[Tuple[Optional[str], Pattern]]] = {}
+
+    def _build(self, included: Tuple[bool, ...]) -> List[Tuple[Optional[str], Pattern]]:
+        """
+        The regexes for texts containing the included literals: the combined one,
+        then each independent one, in priority order. Each comes with its kind if
+        it matches only one (its values can then be taken with findall).
+        """
+        present = {literal for literal, use in zip(self._literals, included) if use}
+        active = [(kind, p) for kind, p in self._combined.items() if not p.requires or p.requires in present]
+        scanners: List[Tuple[Optional[str], Pattern]] = []
+        if active:
+            scanners.append((active[0][0] if len(active) == 1 else None, _compile(active)))
+        for kind, p in self.patterns.items():
+            if p.independent and (not p.requires or p.requires in present):
+                scanners.append((kind, _compile([(kind, p)])))
+        self._compiled[included] = scanners
+        return scanners
+
+    def _scanners(self, text: str) -> List[Tuple[Optional[str], Pattern]]:
+        included = tuple([literal in text for literal in self._literals])
+        scanners = self._compiled.get(included)
+        return scanners if scanners is not None else self._build(included)
+
+    def finditer(self, text: str) -> Iterator[Match]:
+        """Iterates over the regex matches in text by position; m.lastgroup is the entity kind."""
+        scanners = [regex for _, regex in self._scanners(text)]
+        if len(scanners) == 1:
+            return scanners[0].finditer(text)
+        # Stable: at the same position the combined regex's match comes first
+        return heapq.merge(*(regex.finditer(text) for regex in scanners), key=Match.start)
+
+    def scan(self, text: str) -> List[Entity]:
+        """Returns every entity in text, in order of position."""
+        if not text:
+            return []
+        return [Entity(m.lastgroup, m.group(), m.start(), m.end()) for m in self.finditer(text)]
+
+    def extract(self, text: str) -> Dict[str, List[str]]:
+        """Returns entity values grouped by result key (see groups)."""
+        if not text:
+            return {key: [] for key in self.groups}
+        found: Dict[str, List[str]] = {}
+        # Values are grouped by kind, so each regex's matches are taken in turn rather than merged
+        for kind, regex in self._scanners(text):
+            if kind is not None:
+                values = regex.findall(text)
+                if values:
+                    found[kind] = values
+            else:
+                for m in regex.finditer(text):
+                    found.setdefault(m.lastgroup, []).append(m.group())
+        if not found:
+            return {key: [] for key in self.groups}
+        result = {}
+        for key, kinds in self.groups.items():
+            values = found.get(kinds[0], []) if len(kinds) == 1 else [v for kind in kinds for v in found.get(kind, ())]
+            result[key] = list(dict.fromkeys(values)) if self.dedupe else values
+        return result
+
+
+# Engine behind nlp.extractors
+NLP_ENGINE = EntityEngine(NLP_PATTERNS, NLP_GROUPS)
+
+
+__all__ = [
+    "Entity",
+    "EntityPattern",
+    "EntityEngine",
+    "NLP_ENGINE",
+    "NLP_PATTERNS",
+    "NLP_GROUPS",
+]
@@ -6,22 +6,39 @@ Python 3.11+
 
 Extracts structured entities from message text using regex patterns.
 Supports phones, crypto addresses, emails, and URLs.
+All extractors share the single-scan engine in nlp/entity_engine.py.
 """
 
 import re
 import logging
-from typing import Dict, List, Set
+from typing import Dict, Iterable, List
+
+from .entity_engine import NLP_ENGINE, NLP_PATTERNS, Entity
 
 logger = logging.getLogger(__name__)
 
-# Compiled regex patterns for better performance
-PHONE_PATTERN = re.compile(r'\+?\d{7,15}')
-EMAIL_PATTERN = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
-URL_PATTERN = re.compile(r'http[s]?://\S+')
+# Compiled single-entity patterns (used for validation)
+PHONE_PATTERN = re.compile(NLP_PATTERNS["phone"].regex)
+EMAIL_PATTERN = re.compile(NLP_PATTERNS["email"].regex)
+URL_PATTERN = re.compile(NLP_PATTERNS["url"].regex)
 
 # Cryptocurrency address patterns
-ETHEREUM_PATTERN = re.compile(r'0x[a-fA-F0-9]{40}')
-BITCOIN_PATTERN = re.compile(r'[13][a-km-zA-HJ-NP-Z1-9]{25,34}')
+ETHEREUM_PATTERN = re.compile(NLP_PATTERNS["ethereum"].regex)
+BITCOIN_PATTERN = re.compile(NLP_PATTERNS["bitcoin"].regex)
+
+
+def scan_entities(text: str) -> List[Entity]:
+    """
+    Find every entity in text in a single scan, with character offsets.
+    
+    Args:
+        text: Input text to scan
+        
+    Returns:
+        List of Entity(kind, value, start, end) in order of position; kind is one of
+        "url", "email", "ethereum", "bitcoin" or "phone"
+    """
+    return NLP_ENGINE.scan(text)
 
 
 def extract_phones(text: str) -> List[str]:
@@ -34,19 +51,7 @@ def extract_phones(text: str) -> List[str]:
     Returns:
         List of unique phone number strings found
     """
-    if not text:
-        return []
-    
-    matches = PHONE_PATTERN.findall(text)
-    # Remove duplicates while preserving order
-    seen: Set[str] = set()
-    unique_matches = []
-    for match in matches:
-        if match not in seen:
-            seen.add(match)
-            unique_matches.append(match)
-    
-    return unique_matches
+    return NLP_ENGINE.extract(text)["phones"]
 
 
 def extract_emails(text: str) -> List[str]:
@@ -59,19 +64,7 @@ def extract_emails(text: str) -> List[str]:
     Returns:
         List of unique email address strings found
     """
-    if not text:
-        return []
-    
-    matches = EMAIL_PATTERN.findall(text)
-    # Remove duplicates while preserving order
-    seen: Set[str] = set()
-    unique_matches = []
-    for match in matches:
-        if match not in seen:
-            seen.add(match)
-            unique_matches.append(match)
-    
-    return unique_matches
+    return NLP_ENGINE.extract(text)["emails"]
 
 
 def extract_urls(text: str) -> List[str]:
@@ -84,19 +77,7 @@ def extract_urls(text: str) -> List[str]:
     Returns:
         List of unique URL strings found
     """
-    if not text:
-        return []
-    
-    matches = URL_PATTERN.findall(text)
-    # Remove duplicates while preserving order
-    seen: Set[str] = set()
-    unique_matches = []
-    for match in matches:
-        if match not in seen:
-            seen.add(match)
-            unique_matches.append(match)
-    
-    return unique_matches
+    return NLP_ENGINE.extract(text)["urls"]
 
 
 def extract_crypto_addresses(text: str) -> List[str]:
@@ -108,35 +89,19 @@ def extract_crypto_addresses(text: str) -> List[str]:
         text: Input text to search for crypto addresses
         
     Returns:
-        List of unique cryptocurrency address strings found
+        List of unique cryptocurrency address strings found (Ethereum first, then Bitcoin)
     """
-    if not text:
-        return []
-    
-    crypto_addresses = []
-    seen: Set[str] = set()
-    
-    # Extract Ethereum addresses (0x followed by 40 hex characters)
-    eth_matches = ETHEREUM_PATTERN.findall(text)
-    for match in eth_matches:
-        if match not in seen:
-            seen.add(match)
-            crypto_addresses.append(match)
-    
-    # Extract Bitcoin addresses (base58 format starting with 1 or 3)
-    btc_matches = BITCOIN_PATTERN.findall(text)
-    for match in btc_matches:
-        if match not in seen:
-            seen.add(match)
-            crypto_addresses.append(match)
-    
-    return crypto_addresses
+    return NLP_ENGINE.extract(text)["crypto_addresses"]
 
 
 def extract_entities(text: str) -> Dict[str, List[str]]:
     """
     Extract all supported entities from message text.
     
+    The text is scanned by nlp.entity_engine. Each entity type is reported as
+    if it had its own scan, so a wallet or email inside a URL, or digits inside
+    any of them, are reported as well.
+    
     Args:
         text: Input message text to analyze
         
@@ -149,38 +114,32 @@ def extract_entities(text: str) -> Dict[str, List[str]]:
             "urls": ["list", "of", "urls"]
         }
     """
-    if not text:
-        # Return empty structure for empty/None input
-        return {
-            "phones": [],
-            "crypto_addresses": [],
-            "emails": [],
-            "urls": []
-        }
-    
-    logger.debug("Extracting entities from text: %s...", text[:100])
-    
-    # Extract each entity type
-    phones = extract_phones(text)
-    crypto_addresses = extract_crypto_addresses(text)
-    emails = extract_emails(text)
-    urls = extract_urls(text)
-    
-    entities = {
-        "phones": phones,
-        "crypto_addresses": crypto_addresses,
-        "emails": emails,
-        "urls": urls
-    }
+    entities = NLP_ENGINE.extract(text)
     
     # Log summary
-    total_entities = sum(len(entity_list) for entity_list in entities.values())
-    if total_entities > 0:
-        logger.debug("Found %d entities: %s", total_entities, entities)
+    if logger.isEnabledFor(logging.DEBUG):
+        total_entities = sum(len(entity_list) for entity_list in entities.values())
+        if total_entities > 0:
+            logger.debug("Found %d entities: %s", total_entities, entities)
     
     return entities
 
 
+def extract_entities_batch(texts: Iterable[str]) -> List[Dict[str, List[str]]]:
+    """
+    Extract entities from many texts in one call.
+    
+    Args:
+        texts: Iterable of message texts (None or empty strings give empty results)
+        
+    Returns:
+        One extract_entities result per text, in input order. For multiple
+        processes see nlp.batch_extract.extract_entities_parallel.
+    """
+    extract = NLP_ENGINE.extract
+    return [extract(text) for text in texts]
+
+
 def validate_bitcoin_address(address: str) -> bool:
     """
     Basic validation for Bitcoin addresses using regex pattern.
@@ -217,7 +176,9 @@ def validate_ethereum_address(address: str) -> bool:
 
 # Export main functions
 __all__ = [
+    "scan_entities",
     "extract_entities",
+    "extract_entities_batch",
     "extract_phones", 
     "extract_emails",
     "extract_urls",
@@ -0,0 +1,302 @@
+# nlp/faiss_index.py
+"""
+FAISS Index Selection for UFDR Investigator - Phase 3: NLP & Entity Extraction
+Python 3.11+
+
+Builds the similarity index for a case's embeddings. An exact IndexFlatIP
+scan costs time linear in the number of vectors per query, so larger cases
+use approximate indexes:
+
+    flat      exact inner-product scan              (< 100k vectors)
+    hnsw      HNSW graph over the full vectors      (< 1M)
+    ivf-flat  inverted lists over k-means cells     (< 5M)
+    ivf-pq    inverted lists of PQ-compressed codes (larger cases)
+
+"auto" picks the type from the vector count. An index is described by a spec
+(type, FAISS factory string, training sample size and search parameters),
+stored in metadata.json as "index", so readers apply the same nprobe /
+efSearch the index was built for (apply_search_params).
+
+load_index opens an index without copying it into each process: a flat index
+is searched directly over the memory-mapped embeddings.npy (MappedFlatIndex),
+and other types are read with FAISS memory-mapped I/O where the type allows
+it. Processes serving the same case then share its pages through the OS page
+cache, and opening an index takes constant time. Because readers map the file,
+save_index never rewrites faiss.index in place: it writes a new file and
+renames it over the old one, so a mapped index stays valid until it is closed.
+
+Requires:
+    pip install faiss-cpu
+"""
+
+import importlib.util
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("auto", "flat", "hnsw", "ivf-flat", "ivf-pq")
+# Types that are trained on a sample of the vectors before any are added
+TRAINED_TYPES = ("ivf-flat", "ivf-pq")
+# Largest vector count auto gives each type; above the last, ivf-pq
+AUTO_LIMITS = (("flat", 100_000), ("hnsw", 1_000_000), ("ivf-flat", 5_000_000))
+
+DEFAULT_HNSW_M = 32
+DEFAULT_EF_SEARCH = 64
+# Training points per IVF cell; FAISS warns below 39
+TRAIN_POINTS_PER_CELL = 64
+# PQ codebooks have 256 centroids per subquantizer
+MIN_PQ_TRAIN = 256 * 256
+
+# faiss is imported on first use (see require_faiss)
+faiss = None
+
+
+def require_faiss():
+    """Returns the faiss module, importing it on first use."""
+    global faiss
+    if faiss is None:
+        if importlib.util.find_spec("faiss") is None:
+            raise ImportError("FAISS is required. Install with: pip install faiss-cpu")
+        import faiss as faiss_module
+        faiss = faiss_module
+    return faiss
+
+
+def choose_index_type(num_vectors: int) -> str:
+    """Index type auto uses for a corpus of num_vectors."""
+    for index_type, limit in AUTO_LIMITS:
+        if num_vectors < limit:
+            return index_type
+    return "ivf-pq"
+
+
+def ivf_nlist(num_vectors: int) -> int:
+    """Number of IVF cells: the power of two nearest 4 * sqrt(n), with enough training points per cell."""
+    nlist = 2 ** round(math.log2(max(1.0, 4 * math.sqrt(num_vectors))))
+    nlist = min(nlist, 65536, max(1, num_vectors // TRAIN_POINTS_PER_CELL))
+    return max(1, nlist)
+
+
+def pq_subquantizers(dim: int) -> int:
+    """PQ subquantizers for a dimension: as many as divide it, up to 64 (e.g. 384 -> 64, 100 -> 50)."""
+    for m in range(min(64, dim), 0, -1):
+        if dim % m == 0 and dim // m >= 2:
+            return m
+    return 1
+
+
+def index_spec(
+    index_type: str,
+    num_vectors: int,
+    dim: int,
+    nlist: Optional[int] = None,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    hnsw_m: int = DEFAULT_HNSW_M,
+    pq_m: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Describes the index to build for num_vectors embeddings of a dimension.
+
+    Args:
+        index_type: One of INDEX_TYPES
+        num_vectors: Number of vectors the index will hold
+        dim: Embedding dimension
+        nlist: IVF cells (default: ivf_nlist)
+        nprobe: IVF cells scanned per query (default: nlist / 16, at least 8)
+        ef_search: HNSW candidate list size per query (default: DEFAULT_EF_SEARCH)
+        hnsw_m: HNSW links per node
+        pq_m: PQ subquantizers for ivf-pq (default: pq_subquantizers)
+
+    Returns:
+        Dictionary with "type", "factory" (a faiss.index_factory string),
+        "train_size" (0 for untrained types) and "search_params"
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}; use one of {list(INDEX_TYPES)}")
+    if index_type == "auto":
+        index_type = choose_index_type(num_vectors)
+    spec: Dict[str, Any] = {"type": index_type, "train_size": 0, "search_params": {}}
+    if index_type == "flat":
+        spec["factory"] = "Flat"
+    elif index_type == "hnsw":
+        spec["factory"] = f"HNSW{hnsw_m}"
+        spec["search_params"] = {"efSearch": ef_search or DEFAULT_EF_SEARCH}
+    else:
+        nlist = nlist or ivf_nlist(num_vectors)
+        if index_type == "ivf-flat":
+            spec["factory"] = f"IVF{nlist},Flat"
+            spec["train_size"] = min(num_vectors, nlist * TRAIN_POINTS_PER_CELL)
+        else:
+            m = pq_m or pq_subquantizers(dim)
+            if dim % m:
+                raise ValueError(f"pq_m {m} does not divide the dimension {dim}")
+            spec["factory"] = f"IVF{nlist},PQ{m}x8"
+            spec["train_size"] = min(num_vectors, max(nlist * TRAIN_POINTS_PER_CELL, MIN_PQ_TRAIN))
+        spec["search_params"] = {"nprobe": min(nlist, nprobe or max(8, nlist // 16))}
+    return spec
+
+
+def needs_training(spec: Dict[str, Any]) -> bool:
+    return spec["type"] in TRAINED_TYPES
+
+
+def apply_search_params(index: Any, params: Dict[str, Any]) -> Any:
+    """Sets nprobe / efSearch on an index (also through wrappers) and returns it."""
+    if params:
+        space = require_faiss().ParameterSpace()
+        for name, value in params.items():
+            space.set_index_parameter(index, name, value)
+    return index
+
+
+def new_index(spec: Dict[str, Any], dim: int) -> Any:
+    """Empty inner-product index for a spec; trained types must be trained before use."""
+    faiss_module = require_faiss()
+    index = faiss_module.index_factory(dim, spec["factory"], faiss_module.METRIC_INNER_PRODUCT)
+    return apply_search_params(index, spec["search_params"])
+
+
+def train_index(index: Any, vectors: np.ndarray, sample_size: int, seed: int = 0) -> None:
+    """Trains an index on a random sample of rows (vectors may be a memory-mapped array)."""
+    sample_size = min(sample_size, len(vectors))
+    rows = np.sort(np.random.default_rng(seed).choice(len(vectors), sample_size, replace=False))
+    index.train(np.ascontiguousarray(vectors[rows], dtype=np.float32))
+
+
+def build_index(vectors: np.ndarray, spec: Dict[str, Any], chunk_size: int = 100_000) -> Any:
+    """
+    Builds the index of a spec over all rows of vectors, trained first if the type requires it.
+
+    vectors may be a memory-mapped array; rows are added chunk by chunk.
+    """
+    index = new_index(spec, vectors.shape[1])
+    if needs_training(spec):
+        train_index(index, vectors, spec["train_size"])
+    for start in range(0, len(vectors), chunk_size):
+        index.add(np.ascontiguousarray(vectors[start:start + chunk_size], dtype=np.float32))
+    return index
+
+
+class MappedFlatIndex:
+    """
+    Exact inner-product search over a memory-mapped embeddings.npy.
+
+    Equivalent to an IndexFlatIP over the same rows, with the same search()
+    signature, but nothing is read until a query touches it and the pages are
+    shared between processes. Does not need faiss.
+    """
+
+    def __init__(self, path: Union[str, Path], block_rows: int = 262144):
+        self.path = Path(path)
+        self.vectors = np.load(self.path, mmap_mode='r')
+        self.ntotal, self.d = self.vectors.shape
+        self.block_rows = block_rows
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (scores, ids) of the k best rows per query, best first; ids are -1 past ntotal."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        # Blocks bound the temporary score matrix; each keeps its k best merged with the running best
+        for start in range(0, self.ntotal, self.block_rows):
+            block = queries @ np.asarray(self.vectors[start:start + self.block_rows]).T
+            block_ids = np.broadcast_to(np.arange(start, start + block.shape[1]), block.shape)
+            merged_scores = np.concatenate([scores, block], axis=1)
+            merged_ids = np.concatenate([ids, block_ids], axis=1)
+            top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            scores = np.take_along_axis(merged_scores, top, axis=1)
+            ids = np.take_along_axis(merged_ids, top, axis=1)
+        order = np.argsort(-scores, axis=1, kind="stable")
+        scores = np.take_along_axis(scores, order, axis=1)
+        ids = np.take_along_axis(ids, order, axis=1)
+        ids[~np.isfinite(scores)] = -1
+        return scores, ids
+
+
+def save_index(index: Any, index_file: Union[str, Path]) -> None:
+    """
+    Writes an index to index_file through a temporary file and a rename.
+
+    Processes that have the previous file memory-mapped (load_index) keep
+    reading it; truncating it in place would corrupt their reads.
+    """
+    index_file = Path(index_file)
+    tmp_path = index_file.with_name(index_file.name + ".tmp")
+    require_faiss().write_index(index, str(tmp_path))
+    os.replace(tmp_path, index_file)
+
+
+def load_index(index_dir: Union[str, Path], metadata: Dict[str, Any], mmap: bool = True) -> Any:
+    """
+    Opens the index of an embeddings directory for searching.
+
+    Args:
+        index_dir: Directory with metadata.json, faiss.index and/or embeddings.npy
+        metadata: Its parsed metadata.json
+        mmap: Map the index instead of reading it into memory where possible
+
+    Returns:
+        An object with faiss's search(queries, k) and ntotal, with the stored search parameters applied
+    """
+    index_dir = Path(index_dir)
+    spec = metadata.get("index") or {"type": "flat", "search_params": {}}
+    embeddings_file = index_dir / "embeddings.npy"
+    if mmap and spec["type"] == "flat" and embeddings_file.exists():
+        index = MappedFlatIndex(embeddings_file)
+        if index.ntotal == metadata.get("num_embeddings", index.ntotal):
+            return index
+    index_file = index_dir / "faiss.index"
+    if not index_file.exists():
+        raise FileNotFoundError(f"FAISS index not found: {index_file}")
+    faiss_module = require_faiss()
+    index = None
+    if mmap:
+        # Maps inverted lists (and flat codes on recent faiss) instead of copying them
+        flags = getattr(faiss_module, "IO_FLAG_MMAP", 0) | getattr(faiss_module, "IO_FLAG_READ_ONLY", 0)
+        try:
+            index = faiss_module.read_index(str(index_file), flags)
+        except RuntimeError as e:
+            logger.info("%s index cannot be memory-mapped, reading it into memory: %s", spec["type"], e)
+    if index is None:
+        index = faiss_module.read_index(str(index_file))
+    return apply_search_params(index, spec["search_params"])
+
+
+def search_live(index: Any, id_map: Any, query: np.ndarray, limit: int) -> List[Tuple[float, int, str]]:
+    """
+    The limit best (score, row, message id) of one query, skipping tombstoned rows.
+
+    Deleted rows stay in the index and may outrank every live one, so k starts
+    at limit plus the deleted count (at most 2 * limit) and doubles until limit
+    live rows are found or the whole index has been searched.
+
+    Args:
+        index: Index from load_index
+        id_map: Id map from nlp.id_map.load_id_map; get(row) is None for deleted rows
+        query: One query vector
+        limit: Number of results wanted
+    """
+    ntotal = int(index.ntotal)
+    if limit <= 0 or not ntotal:
+        return []
+    query = np.asarray(query, dtype=np.float32).reshape(1, -1)
+    k = min(ntotal, limit + min(id_map.deleted, limit))
+    while True:
+        scores, rows = index.search(query, k)
+        hits = []
+        for score, row in zip(scores[0], rows[0]):
+            message_id = id_map.get(int(row))
+            if message_id is not None:
+                hits.append((float(score), int(row), message_id))
+                if len(hits) == limit:
+                    return hits
+        if k >= ntotal:
+            return hits
+        k = min(ntotal, 2 * k)
@@ -0,0 +1,379 @@
+# nlp/id_map.py
+"""
+Message Id Map for UFDR Investigator - Phase 3: NLP & Entity Extraction
+Python 3.11+
+
+Maps FAISS rows to message ids. Kept as a JSON list in metadata.json, every
+id costs about 100 bytes of Python objects in each process that loads it;
+this module stores them in one memory-mapped file instead:
+
+    - row -> id: (rows + 1) offsets into a blob of UTF-8 ids
+    - id -> row (optional): 64-bit hashes of the ids, sorted, with their rows,
+      so a lookup is one binary search plus a check of the id itself
+
+About 20 bytes per id on disk, nothing per id in RAM; opening the map is
+instant and only the pages that lookups touch are read.
+
+An incremental run appends its ids as a new segment (message_ids.<first
+row>.bin) rather than rewriting the map; metadata.json lists the segments in
+row order and SegmentedIdMap reads them as one map.
+
+Deleted messages are tombstoned in a sidecar bitmap (<map>.tombstones), one
+bit per row, rewritten on each delete: their rows stay in the index (FAISS rows
+cannot be renumbered without a rebuild) but are no longer returned.
+
+Usage:
+    python nlp/id_map.py convert <embeddings_dir>        # metadata.json message_ids -> message_ids.bin
+    python nlp/id_map.py lookup <embeddings_dir> <row or id> [...]
+    python nlp/id_map.py delete <embeddings_dir> <id> [...]
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+MAGIC = b"FQIDM001"
+# magic, rows, blob bytes, has reverse index
+HEADER = struct.Struct("<8sQQQ")
+ID_MAP_FILE = "message_ids.bin"
+TOMBSTONE_SUFFIX = ".tombstones"
+
+
+def id_hash(message_id: str) -> int:
+    """64-bit hash of an id, as stored in the reverse index."""
+    return int.from_bytes(hashlib.blake2b(message_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def tombstone_path(map_path: Union[str, Path]) -> Path:
+    """Sidecar bitmap of deleted rows for an id map file."""
+    map_path = Path(map_path)
+    return map_path.with_name(map_path.name + TOMBSTONE_SUFFIX)
+
+
+def segment_file(start_row: int) -> str:
+    """File name of the id map segment appended at start_row."""
+    return f"message_ids.{start_row}.bin"
+
+
+def id_map_files(metadata: Dict[str, Any]) -> List[str]:
+    """Id map files named in metadata.json, in row order; empty for outputs from before id maps."""
+    files = metadata.get("id_map") or []
+    return [files] if isinstance(files, str) else list(files)
+
+
+def _pad8(size: int) -> int:
+    return (size + 7) // 8 * 8
+
+
+def write_id_map(ids: Iterable[str], out_path: Union[str, Path], reverse: bool = True) -> int:
+    """
+    Writes ids, in row order, to an id map file.
+
+    ids is consumed once, so it can stream from a file; the blob is spooled to
+    a temporary file and only 8 (16 with reverse) bytes per id are held in memory.
+    Tombstones of a map previously at out_path are kept: callers that renumber
+    rows must remove them (see tombstone_path).
+
+    Args:
+        ids: Message ids, one per row
+        out_path: Output file; replaced atomically
+        reverse: Also write the id -> row index
+
+    Returns:
+        Number of rows
+    """
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    offsets = array("Q", [0])
+    hashes = array("Q")
+    with tempfile.TemporaryFile(dir=out_path.parent) as blob:
+        for message_id in ids:
+            data = message_id.encode("utf-8")
+            blob.write(data)
+            offsets.append(offsets[-1] + len(data))
+            if reverse:
+                hashes.append(id_hash(message_id))
+        rows = len(offsets) - 1
+        blob_size = offsets[-1]
+
+        tmp_path = out_path.with_name(out_path.name + ".tmp")
+        with tmp_path.open('wb') as f:
+            f.write(HEADER.pack(MAGIC, rows, blob_size, int(reverse)))
+            f.write(offsets.tobytes())
+            blob.seek(0)
+            while True:
+                data = blob.read(1 << 20)
+                if not data:
+                    break
+                f.write(data)
+            f.write(b"\0" * (_pad8(blob_size) - blob_size))
+            if reverse:
+                hash_array = np.frombuffer(hashes, dtype="<u8")
+                order = np.argsort(hash_array, kind="stable")
+                f.write(hash_array[order].tobytes())
+                f.write(order.astype("<u4").tobytes())
+    tmp_path.replace(out_path)
+    return rows
+
+
+class IdMap:
+    """
+    Read-only, memory-mapped row <-> message id map built by write_id_map,
+    with tombstones for deleted rows.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = self.path.open('rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows, blob_size, reverse = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a message id map")
+        self._offsets = np.frombuffer(self._mm, dtype="<u8", count=self.rows + 1, offset=HEADER.size)
+        self._blob = HEADER.size + (self.rows + 1) * 8
+        self._hashes = self._index_rows = None
+        if reverse:
+            start = self._blob + _pad8(blob_size)
+            self._hashes = np.frombuffer(self._mm, dtype="<u8", count=self.rows, offset=start)
+            self._index_rows = np.frombuffer(self._mm, dtype="<u4", count=self.rows, offset=start + self.rows * 8)
+        self.tombstone_path = tombstone_path(self.path)
+        self._tombstones = bytearray(self.tombstone_path.read_bytes()) if self.tombstone_path.exists() else bytearray()
+        self.deleted = sum(bin(byte).count("1") for byte in self._tombstones)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, row: int) -> str:
+        """Id of a row, tombstoned or not."""
+        if not 0 <= row < self.rows:
+            raise IndexError(row)
+        start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+        return self._mm[self._blob + start:self._blob + end].decode("utf-8")
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield self[row]
+
+    def is_deleted(self, row: int) -> bool:
+        byte = row >> 3
+        return byte < len(self._tombstones) and bool(self._tombstones[byte] & (1 << (row & 7)))
+
+    def get(self, row: int) -> Optional[str]:
+        """Id of a search result row; None for -1, out-of-range and tombstoned rows."""
+        if not 0 <= row < self.rows or self.is_deleted(row):
+            return None
+        return self[row]
+
+    def row_of(self, message_id: str) -> Optional[int]:
+        """Row of a message id; None if it is absent or deleted. Requires the reverse index."""
+        if self._hashes is None:
+            raise ValueError(f"{self.path} was written without a reverse index")
+        h = np.uint64(id_hash(message_id))
+        i = int(np.searchsorted(self._hashes, h))
+        while i < self.rows and self._hashes[i] == h:
+            row = int(self._index_rows[i])
+            if self[row] == message_id and not self.is_deleted(row):
+                return row
+            i += 1
+        return None
+
+    def __contains__(self, message_id: object) -> bool:
+        return isinstance(message_id, str) and self.row_of(message_id) is not None
+
+    def delete(self, message_ids: Iterable[str]) -> int:
+        """Tombstones the rows of message ids and saves the bitmap. Returns the number newly deleted."""
+        newly = 0
+        for message_id in message_ids:
+            row = self.row_of(message_id)
+            if row is None:
+                continue
+            if len(self._tombstones) <= row >> 3:
+                self._tombstones.extend(b"\0" * ((row >> 3) + 1 - len(self._tombstones)))
+            self._tombstones[row >> 3] |= 1 << (row & 7)
+            newly += 1
+        if newly:
+            self.deleted += newly
+            tmp_path = self.tombstone_path.with_name(self.tombstone_path.name + ".tmp")
+            tmp_path.write_bytes(bytes(self._tombstones))
+            os.replace(tmp_path, self.tombstone_path)
+        return newly
+
+    def close(self) -> None:
+        # Views into the map must be released before it can be closed
+        self._offsets = self._hashes = self._index_rows = None
+        self._mm.close()
+        self._file.close()
+
+
+class SegmentedIdMap:
+    """Id map segments of consecutive row ranges, read as one IdMap."""
+
+    def __init__(self, paths: Iterable[Union[str, Path]]):
+        self.segments: List[IdMap] = []
+        try:
+            for path in paths:
+                self.segments.append(IdMap(path))
+        except Exception:
+            self.close()
+            raise
+        self.starts = [0]
+        for segment in self.segments:
+            self.starts.append(self.starts[-1] + len(segment))
+        self.rows = self.starts[-1]
+
+    @property
+    def deleted(self) -> int:
+        return sum(segment.deleted for segment in self.segments)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _locate(self, row: int):
+        i = bisect.bisect_right(self.starts, row) - 1
+        return self.segments[i], row - self.starts[i]
+
+    def __getitem__(self, row: int) -> str:
+        if not 0 <= row < self.rows:
+            raise IndexError(row)
+        segment, local = self._locate(row)
+        return segment[local]
+
+    def __iter__(self):
+        for segment in self.segments:
+            yield from segment
+
+    def is_deleted(self, row: int) -> bool:
+        segment, local = self._locate(row)
+        return segment.is_deleted(local)
+
+    def get(self, row: int) -> Optional[str]:
+        if not 0 <= row < self.rows:
+            return None
+        segment, local = self._locate(row)
+        return segment.get(local)
+
+    def row_of(self, message_id: str) -> Optional[int]:
+        for start, segment in zip(self.starts, self.segments):
+            row = segment.row_of(message_id)
+            if row is not None:
+                return start + row
+        return None
+
+    def __contains__(self, message_id: object) -> bool:
+        return isinstance(message_id, str) and self.row_of(message_id) is not None
+
+    def delete(self, message_ids: Iterable[str]) -> int:
+        message_ids = list(message_ids)
+        return sum(segment.delete(message_ids) for segment in self.segments)
+
+    def close(self) -> None:
+        for segment in self.segments:
+            segment.close()
+
+
+class _ListIdMap:
+    """IdMap interface over a metadata.json message_ids list, for outputs written before id maps."""
+
+    def __init__(self, message_ids: List[str]):
+        self._ids = message_ids
+        self._rows: Optional[Dict[str, int]] = None
+        self.rows = len(message_ids)
+        self.deleted = 0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, row: int) -> str:
+        return self._ids[row]
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def get(self, row: int) -> Optional[str]:
+        return self._ids[row] if 0 <= row < self.rows else None
+
+    def row_of(self, message_id: str) -> Optional[int]:
+        if self._rows is None:
+            self._rows = {message_id: row for row, message_id in enumerate(self._ids)}
+        return self._rows.get(message_id)
+
+    def __contains__(self, message_id: object) -> bool:
+        return isinstance(message_id, str) and self.row_of(message_id) is not None
+
+    def close(self) -> None:
+        pass
+
+
+def load_id_map(index_dir: Union[str, Path], metadata: Dict[str, Any]) -> Union[IdMap, SegmentedIdMap, _ListIdMap]:
+    """The id map of an embeddings directory, or its metadata.json message_ids list in older outputs."""
+    files = id_map_files(metadata)
+    if len(files) == 1:
+        return IdMap(Path(index_dir) / files[0])
+    if files:
+        return SegmentedIdMap(Path(index_dir) / name for name in files)
+    return _ListIdMap(metadata.get("message_ids", []))
+
+
+def convert_metadata(index_dir: Union[str, Path]) -> int:
+    """Moves the message_ids list of an embeddings directory's metadata.json into an id map."""
+    metadata_file = Path(index_dir) / "metadata.json"
+    with metadata_file.open('r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    if "message_ids" not in metadata:
+        return 0
+    rows = write_id_map(metadata.pop("message_ids"), Path(index_dir) / ID_MAP_FILE)
+    metadata["id_map"] = [ID_MAP_FILE]
+    tmp_path = metadata_file.with_suffix(".tmp")
+    with tmp_path.open('w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(tmp_path, metadata_file)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert, query or tombstone the message id map of an embeddings directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("convert", help="Move metadata.json message_ids into message_ids.bin")
+    convert.add_argument("dir")
+    lookup = sub.add_parser("lookup", help="Print the id of rows or the row of ids")
+    lookup.add_argument("dir")
+    lookup.add_argument("keys", nargs="+")
+    delete = sub.add_parser("delete", help="Tombstone message ids so searches no longer return them")
+    delete.add_argument("dir")
+    delete.add_argument("ids", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        print(json.dumps({"rows": convert_metadata(args.dir)}))
+        sys.exit(0)
+    with (Path(args.dir) / "metadata.json").open('r', encoding='utf-8') as f:
+        id_map = load_id_map(args.dir, json.load(f))
+    if args.command == "lookup":
+        for key in args.keys:
+            if key.isdigit():
+                print(json.dumps({"row": int(key), "id": id_map.get(int(key))}))
+            else:
+                print(json.dumps({"id": key, "row": id_map.row_of(key)}))
+    else:
+        if isinstance(id_map, _ListIdMap):
+            print("Run convert first: metadata.json still holds the id list", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps({"deleted": id_map.delete(args.ids), "total_deleted": id_map.deleted}))
+    id_map.close()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
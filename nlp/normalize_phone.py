@@ -5,16 +5,24 @@ Author: NLP Engineer
 Python 3.11+
 
 Normalizes phone numbers to E.164 format with country detection.
+Region, carrier and timezone metadata come from the precomputed prefix table
+(nlp/phone_table.py) when it has been built; otherwise the phonenumbers
+geocoder, carrier and timezone modules are imported on first use.
 Requires: pip install phonenumbers
 """
 
 import re
 import logging
-from typing import Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 import phonenumbers
-from phonenumbers import geocoder, carrier, timezone
 from phonenumbers.phonenumberutil import NumberParseException
 
+from .phone_table import PhonePrefixTable, default_table
+
 logger = logging.getLogger(__name__)
 
 # Default country code for phone numbers without country code
@@ -23,27 +31,67 @@ DEFAULT_COUNTRY = "US"
 # Common country codes for context-aware normalization
 COMMON_COUNTRIES = ["US", "GB", "CA", "AU", "DE", "FR", "IT", "ES", "NL", "BE"]
 
+# Distinct (number, default country) results kept by normalize_phone
+PHONE_CACHE_SIZE = 65536
 
-def normalize_phone(phone_str: str, default_country: str = DEFAULT_COUNTRY) -> Optional[str]:
+# Numbers per worker task in batch_normalize_phones
+DEFAULT_CHUNK_SIZE = 5000
+
+
+class PhoneCache:
     """
-    Normalize a phone number string to E.164 format.
+    Bounded LRU cache of normalization results, keyed by (cleaned number, default country).
     
-    Args:
-        phone_str: Raw phone number string to normalize
-        default_country: Default country code to use if none detected (default: "US")
-        
-    Returns:
-        E.164 formatted phone number string (e.g., "+12345678901") or None if invalid
+    Invalid numbers are cached too (as None), so repeated junk is not re-parsed.
+    Safe to share between threads.
     """
-    if not phone_str:
-        return None
     
-    # Clean input - remove common non-digit characters but preserve +
-    cleaned = re.sub(r'[^\d+]', '', phone_str.strip())
+    def __init__(self, maxsize: int = PHONE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Tuple[str, str], Optional[str]]" = OrderedDict()
+        self._lock = threading.Lock()
     
-    if not cleaned:
-        return None
+    def get(self, key: Tuple[str, str]) -> Any:
+        """Returns the cached result for key, or _MISSING (counted as a miss)."""
+        with self._lock:
+            result = self._data.get(key, _MISSING)
+            if result is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+            return result
+    
+    def put(self, key: Tuple[str, str], value: Optional[str]) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
     
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+
+_MISSING = object()
+_cache = PhoneCache()
+
+
+def _clean(phone_str: str) -> str:
+    """Removes common non-digit characters but preserves +."""
+    return re.sub(r'[^\d+]', '', phone_str.strip())
+
+
+def _parse_cleaned(cleaned: str, default_country: str) -> Optional[str]:
+    """Parses a cleaned number to E.164, trying COMMON_COUNTRIES if the default country fails."""
     try:
         # Try parsing with default country first
         parsed_number = phonenumbers.parse(cleaned, default_country)
@@ -52,11 +100,11 @@ def normalize_phone(phone_str: str, default_country: str = DEFAULT_COUNTRY) -> O
         if phonenumbers.is_valid_number(parsed_number):
             # Format to E.164 international format
             normalized = phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.E164)
-            logger.debug("Normalized %s to %s", phone_str, normalized)
+            logger.debug("Normalized %s to %s", cleaned, normalized)
             return normalized
             
         else:
-            logger.debug("Invalid phone number: %s", phone_str)
+            logger.debug("Invalid phone number: %s", cleaned)
             return None
             
     except NumberParseException as e:
@@ -69,15 +117,101 @@ def normalize_phone(phone_str: str, default_country: str = DEFAULT_COUNTRY) -> O
                 parsed_number = phonenumbers.parse(cleaned, country)
                 if phonenumbers.is_valid_number(parsed_number):
                     normalized = phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.E164)
-                    logger.debug("Normalized %s to %s (country: %s)", phone_str, normalized, country)
+                    logger.debug("Normalized %s to %s (country: %s)", cleaned, normalized, country)
                     return normalized
             except NumberParseException:
                 continue
         
-        logger.debug("Failed to parse phone number: %s (error: %s)", phone_str, str(e))
+        logger.debug("Failed to parse phone number: %s (error: %s)", cleaned, str(e))
         return None
 
 
+def _parse_chunk(cleaned_numbers: List[str], default_country: str) -> List[Optional[str]]:
+    """Worker: parses a chunk of cleaned numbers (no cache)."""
+    return [_parse_cleaned(cleaned, default_country) for cleaned in cleaned_numbers]
+
+
+def normalize_phone(phone_str: str, default_country: str = DEFAULT_COUNTRY) -> Optional[str]:
+    """
+    Normalize a phone number string to E.164 format.
+    
+    Results are memoized per (cleaned number, default_country); see phone_cache_stats.
+    
+    Args:
+        phone_str: Raw phone number string to normalize
+        default_country: Default country code to use if none detected (default: "US")
+        
+    Returns:
+        E.164 formatted phone number string (e.g., "+12345678901") or None if invalid
+    """
+    if not phone_str:
+        return None
+    
+    cleaned = _clean(phone_str)
+    
+    if not cleaned:
+        return None
+    
+    key = (cleaned, default_country)
+    normalized = _cache.get(key)
+    if normalized is _MISSING:
+        normalized = _parse_cleaned(cleaned, default_country)
+        _cache.put(key, normalized)
+    return normalized
+
+
+def phone_cache_stats() -> Dict[str, int]:
+    """Returns hits, misses, size and maxsize of the normalize_phone cache."""
+    return _cache.stats()
+
+
+def clear_phone_cache() -> None:
+    """Empties the normalize_phone cache and resets its counters."""
+    _cache.clear()
+
+
+def _table_metadata(table: PhonePrefixTable, e164: str, country_code: Optional[str]) -> Dict[str, Any]:
+    """Region, carrier and timezones of a valid E.164 number from the prefix table."""
+    info = table.lookup(e164)
+    region = info.region if info is not None else ""
+    if not region and country_code:
+        region = table.country_name(country_code)
+    return {
+        "region": region or None,
+        "carrier": (info.carrier if info is not None else "") or None,
+        "timezones": list(info.timezones) if info is not None else [],
+    }
+
+
+def _geocoder_metadata(parsed_number: Any) -> Dict[str, Any]:
+    """Region, carrier and timezones from the phonenumbers databases (used when no table is built)."""
+    # Large data modules: imported on first use only
+    from phonenumbers import geocoder, carrier, timezone
+    metadata: Dict[str, Any] = {}
+    
+    # Get region/country name
+    try:
+        region = geocoder.description_for_number(parsed_number, "en")
+        metadata["region"] = region if region else None
+    except Exception:
+        metadata["region"] = None
+    
+    # Get carrier information
+    try:
+        carrier_name = carrier.name_for_number(parsed_number, "en")
+        metadata["carrier"] = carrier_name if carrier_name else None
+    except Exception:
+        metadata["carrier"] = None
+    
+    # Get timezone information
+    try:
+        timezones_list = timezone.time_zones_for_number(parsed_number)
+        metadata["timezones"] = list(timezones_list) if timezones_list else []
+    except Exception:
+        metadata["timezones"] = []
+    return metadata
+
+
 def get_phone_metadata(phone_str: str, default_country: str = DEFAULT_COUNTRY) -> Dict[str, Any]:
     """
     Extract metadata for a phone number including country, carrier, timezone.
@@ -110,7 +244,7 @@ def get_phone_metadata(phone_str: str, default_country: str = DEFAULT_COUNTRY) -
         return metadata
     
     # Clean input
-    cleaned = re.sub(r'[^\d+]', '', phone_str.strip())
+    cleaned = _clean(phone_str)
     
     if not cleaned:
         return metadata
@@ -130,26 +264,12 @@ def get_phone_metadata(phone_str: str, default_country: str = DEFAULT_COUNTRY) -
             # Get country code
             metadata["country_code"] = phonenumbers.region_code_for_number(parsed_number)
             
-            # Get region/country name
-            try:
-                region = geocoder.description_for_number(parsed_number, "en")
-                metadata["region"] = region if region else None
-            except Exception:
-                metadata["region"] = None
-            
-            # Get carrier information
-            try:
-                carrier_name = carrier.name_for_number(parsed_number, "en")
-                metadata["carrier"] = carrier_name if carrier_name else None
-            except Exception:
-                metadata["carrier"] = None
-            
-            # Get timezone information
-            try:
-                timezones_list = timezone.time_zones_for_number(parsed_number)
-                metadata["timezones"] = list(timezones_list) if timezones_list else []
-            except Exception:
-                metadata["timezones"] = []
+            # Get region, carrier and timezones
+            table = default_table()
+            if table is not None:
+                metadata.update(_table_metadata(table, metadata["normalized"], metadata["country_code"]))
+            else:
+                metadata.update(_geocoder_metadata(parsed_number))
         
         logger.debug("Phone metadata for %s: %s", phone_str, metadata)
         return metadata
@@ -159,33 +279,97 @@ def get_phone_metadata(phone_str: str, default_country: str = DEFAULT_COUNTRY) -
         return metadata
 
 
-def batch_normalize_phones(phone_list: list, default_country: str = DEFAULT_COUNTRY) -> Dict[str, Optional[str]]:
+def batch_normalize_phones(phone_list: Iterable[str], default_country: str = DEFAULT_COUNTRY,
+                           workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Optional[str]]:
     """
     Normalize a batch of phone numbers to E.164 format.
     
+    Numbers are deduplicated (raw and after cleaning) before parsing, and numbers
+    already in the cache are not parsed again, so the cost depends on the unique
+    numbers rather than on how often they occur.
+    
     Args:
-        phone_list: List of phone number strings to normalize
+        phone_list: Phone number strings to normalize (duplicates welcome)
         default_country: Default country code to use if none detected
+        workers: Processes parsing uncached numbers (1 parses in this process)
+        chunk_size: Numbers sent to a worker at a time
         
     Returns:
         Dictionary mapping original phone strings to normalized E.164 format (or None if invalid)
     """
-    if not phone_list:
+    cleaned_of = {phone_str: _clean(phone_str) if phone_str else "" for phone_str in phone_list}
+    if not cleaned_of:
         return {}
     
-    results = {}
+    # Unique cleaned numbers: take what the cache has, parse the rest
+    resolved: Dict[str, Optional[str]] = {"": None}
+    pending: List[str] = []
+    for cleaned in dict.fromkeys(cleaned_of.values()):
+        if not cleaned:
+            continue
+        normalized = _cache.get((cleaned, default_country))
+        if normalized is _MISSING:
+            pending.append(cleaned)
+        else:
+            resolved[cleaned] = normalized
+    
+    if workers > 1 and len(pending) > chunk_size:
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = [n for chunk in pool.map(_parse_chunk, chunks, repeat(default_country)) for n in chunk]
+    else:
+        parsed = _parse_chunk(pending, default_country)
+    for cleaned, normalized in zip(pending, parsed):
+        resolved[cleaned] = normalized
+        _cache.put((cleaned, default_country), normalized)
     
-    for phone_str in phone_list:
-        normalized = normalize_phone(phone_str, default_country)
-        results[phone_str] = normalized
+    results = {phone_str: resolved[cleaned] for phone_str, cleaned in cleaned_of.items()}
     
     # Log summary
     valid_count = sum(1 for v in results.values() if v is not None)
-    logger.info("Normalized %d/%d phone numbers successfully", valid_count, len(phone_list))
+    logger.info("Normalized %d/%d unique phone numbers successfully (%d parsed, %d cached)",
+                valid_count, len(results), len(pending), len(resolved) - 1 - len(pending))
     
     return results
 
 
+def enrich_phones(phone_list: Iterable[str], default_country: str = DEFAULT_COUNTRY, workers: int = 1,
+                  table: Optional[PhonePrefixTable] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Metadata for every distinct number of a case in one pass.
+    
+    Numbers are normalized with batch_normalize_phones and each distinct E.164
+    number is looked up once in the prefix table, so the cost depends on the
+    unique numbers; the geocoder databases are never loaded.
+    
+    Args:
+        phone_list: Phone number strings (duplicates welcome)
+        default_country: Default country code to use if none detected
+        workers: Processes parsing uncached numbers
+        table: Prefix table (default: the one built at phone_table.DEFAULT_TABLE_PATH)
+        
+    Returns:
+        Dictionary mapping original phone strings to get_phone_metadata-style dictionaries
+    """
+    table = table or default_table()
+    if table is None:
+        raise FileNotFoundError("Phone prefix table not built. Build it with: python nlp/phone_table.py build")
+    normalized = batch_normalize_phones(phone_list, default_country, workers=workers)
+    
+    by_number: Dict[str, Dict[str, Any]] = {}
+    for e164 in dict.fromkeys(v for v in normalized.values() if v):
+        info = table.lookup(e164)
+        country_code = info.country_code if info is not None else ""
+        if not country_code:
+            # Calling code shared by several regions (+1, +44, ...): core metadata decides
+            country_code = phonenumbers.region_code_for_number(phonenumbers.parse(e164))
+        by_number[e164] = {"normalized": e164, "country_code": country_code,
+                           **_table_metadata(table, e164, country_code), "is_valid": True}
+    
+    invalid = {"normalized": None, "country_code": None, "region": None, "carrier": None, "timezones": [], "is_valid": False}
+    return {phone_str: dict(by_number[e164]) if e164 else dict(invalid) for phone_str, e164 in normalized.items()}
+
+
 def is_valid_phone(phone_str: str, default_country: str = DEFAULT_COUNTRY) -> bool:
     """
     Check if a phone number string is valid.
@@ -200,7 +384,7 @@ def is_valid_phone(phone_str: str, default_country: str = DEFAULT_COUNTRY) -> bo
     if not phone_str:
         return False
     
-    cleaned = re.sub(r'[^\d+]', '', phone_str.strip())
+    cleaned = _clean(phone_str)
     
     if not cleaned:
         return False
@@ -217,5 +401,9 @@ __all__ = [
     "normalize_phone",
     "get_phone_metadata", 
     "batch_normalize_phones",
-    "is_valid_phone"
+    "is_valid_phone",
+    "enrich_phones",
+    "phone_cache_stats",
+    "clear_phone_cache",
+    "PhoneCache",
 ]
\ No newline at end of file
@@ -0,0 +1,266 @@
+# nlp/phone_table.py
+"""
+Phone Prefix Metadata Table for UFDR Investigator - Phase 3: NLP & Entity Extraction
+Python 3.11+
+
+The phonenumbers geocoder, carrier and timezone databases are large Python
+modules (about half a second to import) and each lookup walks their prefix
+dictionaries. This module compiles them once, offline, into a compact file of
+E.164 prefixes -> (country, region, carrier, timezones):
+
+    - sorted, fixed-width prefix keys, each with the index of its longest
+      prefix that is also a key (its parent)
+    - "@<ISO>" keys with region names, for numbers whose calling code is
+      shared by several regions (+1, +44, +7, ...)
+    - one row of string ids per key, already resolved: a row holds the data
+      of the longest prefix that has it, so a lookup only needs one key
+    - a deduplicated string table
+
+The file is memory-mapped. A lookup is one binary search for the greatest key
+<= the number, then a walk up the parent chain to the first key that is a
+prefix of the number (usually zero or one step), so it takes microseconds and
+needs neither phonenumbers nor its metadata at runtime.
+
+Building the table requires phonenumbers:
+    python nlp/phone_table.py build [--out nlp/data/phone_prefixes.bin]
+    python nlp/phone_table.py lookup +919812345678 [...]
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+MAGIC = b"FQPHT001"
+# magic, entries, key width, strings
+HEADER = struct.Struct("<8sIII")
+# parent, country code, region, carrier, timezones (string ids; parent NO_PARENT for none)
+ROW = struct.Struct("<IIIII")
+NO_PARENT = 0xFFFFFFFF
+COUNTRY_NAME_PREFIX = "@"
+DEFAULT_TABLE_PATH = Path(__file__).resolve().parent / "data" / "phone_prefixes.bin"
+
+
+class PrefixInfo(NamedTuple):
+    """Metadata for the longest known prefix of a number ("" where unknown)."""
+    prefix: str
+    country_code: str
+    region: str
+    carrier: str
+    timezones: Tuple[str, ...]
+
+
+def _resolve(mapping: Dict[str, str], key: str) -> str:
+    """Value of the longest prefix of key present in mapping."""
+    for length in range(len(key), 0, -1):
+        value = mapping.get(key[:length])
+        if value:
+            return value
+    return ""
+
+
+def build_prefix_table(out_path: Union[str, Path] = DEFAULT_TABLE_PATH, lang: str = "en") -> int:
+    """
+    Compiles the phonenumbers geocoder, carrier and timezone data into a table file.
+
+    Args:
+        out_path: Output file
+        lang: Language of region and carrier names
+
+    Returns:
+        Number of prefixes in the table
+    """
+    try:
+        from phonenumbers.carrierdata import CARRIER_DATA
+        from phonenumbers.geodata import GEOCODE_DATA
+        from phonenumbers.geodata.locale import LOCALE_DATA
+        from phonenumbers.phonenumberutil import COUNTRY_CODE_TO_REGION_CODE
+        from phonenumbers.tzdata import TIMEZONE_DATA
+    except ImportError:
+        raise ImportError("phonenumbers is required to build the table. Install with: pip install phonenumbers")
+
+    def locale_name(region_code: str) -> str:
+        names = LOCALE_DATA.get(region_code, {})
+        name = names.get(lang, "")
+        # "*<other lang>" means the name is held under that language
+        return names.get(name[1:], "") if name.startswith("*") else name
+
+    # Country calling code -> ISO region and its name, where the code has exactly one region
+    countries: Dict[str, str] = {}
+    country_names: Dict[str, str] = {}
+    for cc, regions in COUNTRY_CODE_TO_REGION_CODE.items():
+        regions = [r for r in regions if r != "001"]
+        countries[str(cc)] = regions[0] if len(regions) == 1 else ""
+        country_names[str(cc)] = locale_name(regions[0]) if len(regions) == 1 else ""
+    areas = {p: names[lang] for p, names in GEOCODE_DATA.items() if names.get(lang)}
+    carriers = {p: names[lang] for p, names in CARRIER_DATA.items() if names.get(lang)}
+    zones = {p: "&".join(z for z in tz if z != "Etc/Unknown") for p, tz in TIMEZONE_DATA.items()}
+
+    # "@<ISO>" keys hold region names by ISO code; they sort after all digit keys
+    region_codes = {r for regions in COUNTRY_CODE_TO_REGION_CODE.values() for r in regions if r != "001"}
+    names = {COUNTRY_NAME_PREFIX + r: locale_name(r) for r in region_codes if locale_name(r)}
+
+    keys = sorted(set(countries) | set(areas) | set(carriers) | set(zones) | set(names))
+    index = {key: i for i, key in enumerate(keys)}
+    strings: Dict[str, int] = {"": 0}
+
+    def string_id(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+
+    rows = []
+    for key in keys:
+        if key in names:
+            rows.append(ROW.pack(NO_PARENT, string_id(key[1:]), string_id(names[key]), 0, 0))
+            continue
+        parent = next((index[key[:n]] for n in range(len(key) - 1, 0, -1) if key[:n] in index), NO_PARENT)
+        region = _resolve(areas, key) or _resolve(country_names, key)
+        rows.append(ROW.pack(parent, string_id(_resolve(countries, key)), string_id(region),
+                             string_id(_resolve(carriers, key)), string_id(_resolve(zones, key))))
+    width = max(len(key) for key in keys)
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with tmp_path.open('wb') as f:
+        f.write(HEADER.pack(MAGIC, len(keys), width, len(encoded)))
+        for key in keys:
+            f.write(key.encode("ascii").ljust(width, b"\0"))
+        for row in rows:
+            f.write(row)
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        for data in encoded:
+            f.write(data)
+    tmp_path.replace(out_path)
+    return len(keys)
+
+
+class PhonePrefixTable:
+    """
+    Read-only, memory-mapped prefix table built by build_prefix_table.
+
+    Safe to share between threads.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_TABLE_PATH):
+        self.path = Path(path)
+        self._file = self.path.open('rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.entries, self.key_width, self.strings = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a phone prefix table")
+        self._keys = HEADER.size
+        self._rows = self._keys + self.entries * self.key_width
+        self._offsets = self._rows + self.entries * ROW.size
+        self._blob = self._offsets + (self.strings + 1) * 4
+        self._string_cache: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return self.entries
+
+    def _key(self, i: int) -> bytes:
+        start = self._keys + i * self.key_width
+        return self._mm[start:start + self.key_width]
+
+    def _string(self, string_id: int) -> str:
+        value = self._string_cache.get(string_id)
+        if value is None:
+            start, end = struct.unpack_from("<2I", self._mm, self._offsets + string_id * 4)
+            value = self._string_cache[string_id] = self._mm[self._blob + start:self._blob + end].decode("utf-8")
+        return value
+
+    def lookup(self, e164: str) -> Optional[PrefixInfo]:
+        """
+        Metadata for an E.164 number ("+919812345678" or "919812345678").
+
+        Returns None if no prefix of the number is in the table.
+        """
+        digits = e164[1:] if e164.startswith("+") else e164
+        if not digits.isdigit():
+            return None
+        probe = digits[:self.key_width].encode("ascii").ljust(self.key_width, b"\0")
+        # Greatest key <= probe
+        lo, hi = 0, self.entries
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) <= probe:
+                lo = mid + 1
+            else:
+                hi = mid
+        i = lo - 1
+        # The longest key that is a prefix of the number is on that key's parent chain
+        while i != NO_PARENT and i >= 0:
+            key = self._key(i).rstrip(b"\0")
+            parent, country, region, carrier, zones = ROW.unpack_from(self._mm, self._rows + i * ROW.size)
+            if probe.startswith(key):
+                tz = self._string(zones)
+                return PrefixInfo(key.decode("ascii"), self._string(country), self._string(region),
+                                  self._string(carrier), tuple(tz.split("&")) if tz else ())
+            i = parent
+        return None
+
+    def country_name(self, region_code: str) -> str:
+        """Name of an ISO region ("IN" -> "India"), "" if unknown."""
+        probe = (COUNTRY_NAME_PREFIX + region_code).encode("ascii").ljust(self.key_width, b"\0")
+        lo, hi = 0, self.entries
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < probe:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.entries and self._key(lo) == probe:
+            return self._string(ROW.unpack_from(self._mm, self._rows + lo * ROW.size)[2])
+        return ""
+
+    def lookup_many(self, numbers: List[str]) -> Dict[str, Optional[PrefixInfo]]:
+        """Looks up each distinct number once."""
+        return {number: self.lookup(number) for number in dict.fromkeys(numbers)}
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+
+_default_table: Optional[PhonePrefixTable] = None
+
+
+def default_table() -> Optional[PhonePrefixTable]:
+    """The table at DEFAULT_TABLE_PATH, opened once; None if it has not been built."""
+    global _default_table
+    if _default_table is None and DEFAULT_TABLE_PATH.exists():
+        _default_table = PhonePrefixTable(DEFAULT_TABLE_PATH)
+    return _default_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the phone prefix metadata table")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Compile the phonenumbers prefix data (requires phonenumbers)")
+    build.add_argument("--out", default=str(DEFAULT_TABLE_PATH), help=f"Output file (default: {DEFAULT_TABLE_PATH})")
+    build.add_argument("--lang", default="en", help="Language of region and carrier names (default: en)")
+    lookup = sub.add_parser("lookup", help="Look up E.164 numbers")
+    lookup.add_argument("numbers", nargs="+")
+    lookup.add_argument("--table", default=str(DEFAULT_TABLE_PATH), help="Table file")
+    args = parser.parse_args()
+    if args.command == "build":
+        entries = build_prefix_table(Path(args.out), args.lang)
+        print(json.dumps({"entries": entries, "bytes": Path(args.out).stat().st_size, "path": args.out}, indent=2))
+        sys.exit(0)
+    table = PhonePrefixTable(args.table)
+    for number in args.numbers:
+        info = table.lookup(number)
+        print(json.dumps({"number": number, **(info._asdict() if info else {})}))
+    table.close()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+# nlp/watchlist.py
+"""
+Watchlist Matcher for UFDR Investigator - Phase 3: NLP & Entity Extraction
+Python 3.11+
+
+Finds which messages mention any entry of an investigator watchlist (phone
+numbers, wallet addresses, emails, URLs, keywords). All entries are compiled
+into one Aho-Corasick automaton, so a body is scanned once in time linear in
+its length, however many entries the list has.
+
+Matching is case-insensitive and on whole tokens. Phone entries are
+normalised with normalize_phone first and matched on their national number,
+so "+91 98123 45678", "0091-9812345678" and "098123 45678" in a body all hit
+the entry "+919812345678". Without phonenumbers installed, phones are
+matched on their digits only.
+
+Uses the pyahocorasick C extension when installed, else a pure-Python automaton.
+
+Watchlist files are CSV with one kind,value[,label] entry per line; blank
+lines and lines starting with # are skipped.
+
+Usage:
+    python nlp/watchlist.py --watchlist watchlist.csv --input output/CASE-1/parsed/messages.jsonl [...] [--out hits.jsonl]
+"""
+
+import argparse
+import csv
+import importlib.util
+import json
+import logging
+import re
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from parsers.jsonl_io import DEFAULT_READ_WORKERS, iter_records, jsonl_exists
+except ImportError:  # run as a script: python nlp/watchlist.py
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from parsers.jsonl_io import DEFAULT_READ_WORKERS, iter_records, jsonl_exists
+
+# Phone normalization requires phonenumbers; without it phones match on digits.
+# It is imported when the first phone entry is compiled (see _import_phone_support).
+phonenumbers = None
+normalize_phone = None
+DEFAULT_COUNTRY = "US"  # as in nlp.normalize_phone
+
+logger = logging.getLogger(__name__)
+
+WATCH_KINDS = ("phone", "crypto", "email", "url", "keyword")
+
+# Phone-like runs in a body; separators inside them are dropped before matching
+_PHONE_RUN = re.compile(r"\+?\(?\d[\d ().-]{4,}\d")
+_PHONE_SEPARATORS = re.compile(r"[ ().-]")
+
+
+class WatchEntry(NamedTuple):
+    """One watchlist entry. value is normalised (E.164 for phones, casefolded otherwise)."""
+    kind: str
+    value: str
+    label: str = ""
+
+
+class WatchHit(NamedTuple):
+    """A watchlist entry found in a text."""
+    kind: str
+    value: str
+    label: str
+
+    def to_dict(self) -> Dict[str, str]:
+        return self._asdict()
+
+
+def _import_phone_support() -> bool:
+    """Imports phonenumbers and normalize_phone on first use; False if phonenumbers is not installed."""
+    global phonenumbers, normalize_phone
+    if normalize_phone is None and importlib.util.find_spec("phonenumbers") is not None:
+        import phonenumbers as phonenumbers_module
+        from nlp.normalize_phone import normalize_phone as normalize
+        phonenumbers, normalize_phone = phonenumbers_module, normalize
+    return normalize_phone is not None
+
+
+def load_watchlist(path: Union[str, Path]) -> Iterator[Tuple[str, ...]]:
+    """
+    Reads kind,value[,label] rows from a watchlist CSV file.
+
+    A first row of "kind,value[,label]" is treated as a header and skipped.
+    """
+    with Path(path).open('r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip() or row[0].lstrip().startswith("#"):
+                continue
+            if row[0].strip().lower() == "kind":
+                continue
+            yield tuple(cell.strip() for cell in row)
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def normalize_text(text: str) -> str:
+    """Form bodies are matched in: casefolded, with separators removed inside phone-like runs."""
+    text = text.casefold()
+    return _PHONE_RUN.sub(lambda m: _PHONE_SEPARATORS.sub("", m.group()), text)
+
+
+class _Automaton:
+    """Pure-Python Aho-Corasick automaton with the subset of the pyahocorasick API used here."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Any]] = [[]]
+        self._values: Dict[int, Any] = {}
+
+    def add_word(self, key: str, value: Any) -> None:
+        state = 0
+        for ch in key:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._values[state] = value
+
+    def make_automaton(self) -> None:
+        goto, fail, out = self._goto, self._fail, self._out
+        for state, value in self._values.items():
+            out[state] = [value]
+        # Breadth-first, so every fail target is finished before it is used
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, Any]]:
+        """Yields (index of the last character, value) for every occurrence of every key."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt or 0
+            if out[state]:
+                for value in out[state]:
+                    yield i, value
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class Watchlist:
+    """
+    A watchlist compiled into one Aho-Corasick automaton.
+
+    Args:
+        entries: (kind, value) or (kind, value, label) tuples; kind is one of WATCH_KINDS
+        default_country: Region for phone entries without a country code (default: DEFAULT_COUNTRY)
+    """
+
+    def __init__(self, entries: Iterable[Sequence[str]], default_country: Optional[str] = None):
+        self.default_country = default_country or DEFAULT_COUNTRY
+        self.entries: List[WatchEntry] = []
+        # pattern -> [(entry index, accepted digit prefixes for phones, else None)]
+        patterns: Dict[str, List[Tuple[int, Optional[Tuple[str, ...]]]]] = {}
+        seen = set()
+        for row in entries:
+            kind, value = row[0].strip().lower(), row[1].strip()
+            label = row[2] if len(row) > 2 else ""
+            if kind not in WATCH_KINDS:
+                raise ValueError(f"Unknown watchlist kind {kind!r}; use one of {list(WATCH_KINDS)}")
+            if kind == "phone":
+                entry_value, pattern, prefixes = self._phone_pattern(value)
+            else:
+                entry_value, pattern = value.casefold(), normalize_text(value)
+                prefixes = None
+            if not pattern or (kind, entry_value) in seen:
+                continue
+            seen.add((kind, entry_value))
+            patterns.setdefault(pattern, []).append((len(self.entries), prefixes))
+            self.entries.append(WatchEntry(kind, entry_value, label))
+        self._automaton = ahocorasick.Automaton() if ahocorasick is not None else _Automaton()
+        for pattern, targets in patterns.items():
+            self._automaton.add_word(pattern, (len(pattern), tuple(targets)))
+        if patterns:
+            self._automaton.make_automaton()
+        self.texts_scanned = 0
+        self.texts_matched = 0
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], default_country: Optional[str] = None) -> "Watchlist":
+        """Builds a watchlist from a kind,value[,label] CSV file (see load_watchlist)."""
+        return cls(load_watchlist(path), default_country)
+
+    def _phone_pattern(self, value: str) -> Tuple[str, str, Tuple[str, ...]]:
+        """
+        Returns the normalised entry value, the digits matched in bodies and the digit
+        prefixes allowed right before them: none, a trunk 0, or the country code.
+        """
+        normalized = normalize_phone(value, self.default_country) if _import_phone_support() else None
+        if normalized is None:
+            digits = re.sub(r"\D", "", value)
+            return ("+" + digits if value.strip().startswith("+") else digits), digits, ("", "0", "00")
+        parsed = phonenumbers.parse(normalized)
+        cc, national = str(parsed.country_code), str(parsed.national_number)
+        return normalized, national, ("", "0", cc, "00" + cc)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def scan(self, text: str) -> List[WatchHit]:
+        """Returns the entries found in text, each once, in order of first occurrence."""
+        self.texts_scanned += 1
+        if not text or not self.entries:
+            return []
+        norm = normalize_text(text)
+        found: Dict[int, None] = {}
+        size = len(norm)
+        for end, (length, targets) in self._automaton.iter(norm):
+            start = end - length + 1
+            after = norm[end + 1] if end + 1 < size else ""
+            for entry_index, prefixes in targets:
+                if entry_index in found:
+                    continue
+                if prefixes is None:
+                    if (after and _is_word(after)) or (start and _is_word(norm[start - 1])):
+                        continue
+                else:
+                    if after.isdigit():
+                        continue
+                    i = start
+                    while i and norm[i - 1].isdigit():
+                        i -= 1
+                    if norm[i:start] not in prefixes or (i and norm[i - 1].isalpha()):
+                        continue
+                found[entry_index] = None
+        if not found:
+            return []
+        self.texts_matched += 1
+        return [WatchHit(*self.entries[i]) for i in found]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "texts_scanned": self.texts_scanned,
+            "texts_matched": self.texts_matched,
+            "engine": "pyahocorasick" if ahocorasick is not None else "python",
+        }
+
+
+def rescan_messages(
+    watchlist: Watchlist,
+    inputs: Iterable[Union[str, Path]],
+    out: Any,
+    text_field: str = "body",
+    read_workers: int = 1,
+) -> Dict[str, Any]:
+    """
+    Re-scans existing messages outputs against a watchlist.
+
+    Args:
+        watchlist: Compiled watchlist
+        inputs: messages.jsonl outputs (plain, compressed or sharded), e.g. one per case
+        out: Text stream receiving one {"case_id", "id", "hits"} JSON line per matching message
+        text_field: Record field holding the text
+        read_workers: Processes decoding shards in parallel
+
+    Returns:
+        Dictionary with counts and throughput
+    """
+    start = time.perf_counter()
+    scanned = matched = 0
+    for input_path in inputs:
+        if not jsonl_exists(Path(input_path)):
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        for record in iter_records(Path(input_path), workers=read_workers):
+            scanned += 1
+            hits = watchlist.scan(record.get(text_field) or "")
+            if hits:
+                matched += 1
+                row = {"case_id": record.get("case_id"), "id": record.get("id"), "hits": [h.to_dict() for h in hits]}
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+    seconds = time.perf_counter() - start
+    return {
+        "messages": scanned,
+        "matched": matched,
+        "seconds": round(seconds, 2),
+        "messages_per_s": round(scanned / seconds) if seconds else 0,
+        **{k: v for k, v in watchlist.stats().items() if k in ("entries", "engine")},
+    }
+
+
+def main():
+    """
+    CLI entry point for watchlist re-scans.
+    """
+    parser = argparse.ArgumentParser(description="Scan parsed messages for watchlist entries")
+    parser.add_argument("--watchlist", required=True, help="CSV file with kind,value[,label] rows")
+    parser.add_argument("--input", required=True, nargs="+", help="messages.jsonl outputs to scan (plain, compressed or sharded)")
+    parser.add_argument("--out", default=None, help="Output JSONL of matching messages (default: stdout)")
+    parser.add_argument("--country", default=DEFAULT_COUNTRY, help=f"Default region for phone numbers (default: {DEFAULT_COUNTRY})")
+    parser.add_argument("--text-field", default="body", help="Field containing the text (default: body)")
+    parser.add_argument("--read-workers", type=int, default=DEFAULT_READ_WORKERS, help=f"Processes decoding sharded JSONL in parallel (default: {DEFAULT_READ_WORKERS})")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    try:
+        watchlist = Watchlist.from_file(args.watchlist, args.country)
+        logger.info("Loaded %d watchlist entries", len(watchlist))
+        if args.out:
+            with open(args.out, 'w', encoding='utf-8') as out:
+                result = rescan_messages(watchlist, args.input, out, args.text_field, args.read_workers)
+        else:
+            result = rescan_messages(watchlist, args.input, sys.stdout, args.text_field, args.read_workers)
+    except Exception as e:
+        logger.error("Watchlist scan failed: %s", str(e))
+        return 1
+    logger.info("Scan complete: %s", json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,147 @@
+"""
+batch_ingest.py — Parse every device extraction of a case in parallel
+
+Runs the UFDR parser once per input in a pool of worker processes. Each device
+gets its own <case>/devices/<device_id>/ directory, and all devices share the
+case's content-addressed blobs/ store, so media present on several phones is
+stored once. With --blob-store the content is kept once across cases too.
+
+Usage:
+    python parsers/batch_ingest.py <outdir> <case_id> phone1.ufdr [DEVICE-ID=]phone2.ufdr ...
+"""
+import argparse
+import json
+import logging
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .blob_store import LINK_MODES
+    from .jsonl_io import COMPRESSION_SUFFIXES
+    from .ufdr_parser import DEFAULT_BLOB_WORKERS, run_parser
+except ImportError:  # run as a script: python parsers/batch_ingest.py
+    from blob_store import LINK_MODES
+    from jsonl_io import COMPRESSION_SUFFIXES
+    from ufdr_parser import DEFAULT_BLOB_WORKERS, run_parser
+
+def assign_device_ids(inputs: List[str]) -> List[Tuple[str, Path]]:
+    """
+    Pairs each input with a device ID.
+
+    Inputs may be given as DEVICE-ID=path; otherwise the ID is derived from the
+    archive or folder name. Repeated IDs get a numeric suffix.
+    """
+    devices = []
+    seen: Dict[str, int] = {}
+    for spec in inputs:
+        name, sep, path = spec.partition("=")
+        if not sep or "/" in name or "\\" in name:
+            name, path = "", spec
+        path = Path(path)
+        device_id = re.sub(r"[^A-Za-z0-9._-]+", "-", name or path.stem).strip("-.") or "device"
+        seen[device_id] = seen.get(device_id, 0) + 1
+        if seen[device_id] > 1:
+            device_id = f"{device_id}-{seen[device_id]}"
+        devices.append((device_id, path))
+    return devices
+
+def _parse_device(device_id: str, input_path: Path, outdir: Path, case_id: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker: parses one device and reports its summary and wall time."""
+    start = time.perf_counter()
+    try:
+        summary = run_parser(input_path, outdir, case_id, device_id=device_id, **options)
+        status, error = "ok", None
+    except Exception as e:
+        logging.exception(f"Device {device_id} failed")
+        summary, status, error = {}, "failed", str(e)
+    return {
+        "device_id": device_id,
+        "input": str(input_path),
+        "status": status,
+        "error": error,
+        "seconds": round(time.perf_counter() - start, 2),
+        "summary": summary,
+    }
+
+def run_batch(
+    inputs: List[str],
+    outdir: Path,
+    case_id: str,
+    jobs: Optional[int] = None,
+    **options: Any,
+) -> Dict[str, Any]:
+    """Parses all inputs for a case with up to `jobs` worker processes. Returns a consolidated summary."""
+    outdir = Path(outdir)
+    devices = assign_device_ids(inputs)
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs or None) as pool:
+        futures = [
+            pool.submit(_parse_device, device_id, path, outdir, case_id, options)
+            for device_id, path in devices
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            logging.info(f"Device {result['device_id']}: {result['status']} in {result['seconds']}s")
+            results.append(result)
+    order = {device_id: i for i, (device_id, _) in enumerate(devices)}
+    results.sort(key=lambda r: order[r["device_id"]])
+
+    totals = {"messages": 0, "contacts": 0, "calls": 0, "blobs": 0}
+    device_rows = []
+    for result in results:
+        summary = result["summary"]
+        row = {k: result[k] for k in ("device_id", "input", "status", "seconds")}
+        if result["error"]:
+            row["error"] = result["error"]
+        for kind in totals:
+            count = summary.get(kind, {}).get("count", 0)
+            row[kind] = count
+            totals[kind] += count
+        device_rows.append(row)
+    blobs_dir = outdir / case_id / "blobs"
+    unique_blobs = sum(1 for f in blobs_dir.iterdir() if f.is_file()) if blobs_dir.exists() else 0
+    return {
+        "case_id": case_id,
+        "devices": device_rows,
+        "totals": totals,
+        "unique_blobs": unique_blobs,
+        "wall_seconds": round(time.perf_counter() - start, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch UFDR ingestion for multi-device cases")
+    parser.add_argument("outdir", help="Output directory")
+    parser.add_argument("case_id", help="Case ID")
+    parser.add_argument("inputs", nargs="+", help="UFDR files or folders, optionally as DEVICE-ID=path")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Parallel device workers (default: CPU count)")
+    parser.add_argument("--stream", action="store_true", help="Stream report.xml incrementally")
+    parser.add_argument("--no-extract", action="store_true", help="Read inputs in place instead of unpacking to raw/")
+    parser.add_argument("--blob-workers", type=int, default=DEFAULT_BLOB_WORKERS, help="Blob threads per device")
+    parser.add_argument("--shard-size", type=int, default=0, help="Split record outputs into shards of N records")
+    parser.add_argument("--compress", choices=sorted(COMPRESSION_SUFFIXES), default=None, help="Compress record outputs with gzip or zstd")
+    parser.add_argument("--parquet", action="store_true", help="Also export each device's outputs to Parquet")
+    parser.add_argument("--blob-store", default=None, help="Cross-case content-addressed store shared by all devices")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="auto", help="How blobs/ references the store")
+    parser.add_argument("--known-files", default=None, help="Known-file set; tags manifest entries as known")
+    parser.add_argument("--skip-known", action="store_true", help="Do not store or list known media that no message references")
+    parser.add_argument("--watchlist", default=None, help="Watchlist CSV; matching entries are listed on each message")
+    parser.add_argument("--watchlist-country", default=None, help="Default region for watchlist phone numbers")
+    args = parser.parse_args()
+    summary = run_batch(
+        args.inputs, Path(args.outdir), args.case_id, jobs=args.jobs,
+        streaming=args.stream, extract=not args.no_extract, blob_workers=args.blob_workers,
+        shard_size=args.shard_size, compression=args.compress, parquet=args.parquet,
+        blob_store=args.blob_store, link_mode=args.link_mode,
+        known_files=args.known_files, skip_known=args.skip_known,
+        watchlist=args.watchlist, watchlist_country=args.watchlist_country,
+    )
+    print(json.dumps(summary, indent=2))
+    sys.exit(0 if all(d["status"] == "ok" for d in summary["devices"]) else 1)
+
+if __name__ == "__main__":
+    main()
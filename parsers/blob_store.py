@@ -0,0 +1,244 @@
+"""
+blob_store.py — Cross-case content-addressed blob store
+
+Objects live once under <root>/<aa>/<bb>/<sha256> (two-level fan-out on the
+digest). A case's blobs/<sha256><ext> is a reflink or hardlink to the object
+where the filesystem allows it, otherwise a copy. A SQLite index at
+<root>/store.sqlite records object sizes and which cases reference each
+object, so a case can be released and unreferenced objects collected.
+
+Usage:
+    python parsers/blob_store.py <root> stats
+    python parsers/blob_store.py <root> release <case_id>
+    python parsers/blob_store.py <root> gc
+"""
+import argparse
+import errno
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
+
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+# Errors meaning "this filesystem (pair) cannot do that link"; fall back to the next mode
+_UNSUPPORTED = {errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EPERM, errno.EMLINK, errno.ENOSYS}
+
+class BlobStore:
+    """
+    Content-addressed store shared by all cases.
+
+    Safe to use from the parser's blob worker threads and from several parser
+    processes at once (objects are published with an atomic rename, and the
+    index uses SQLite WAL with a busy timeout).
+    """
+
+    def __init__(self, root: Path, link_mode: str = "auto"):
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"Unknown link mode {link_mode!r}; use one of {LINK_MODES}")
+        self.root = Path(root)
+        self.link_mode = link_mode
+        self.incoming = self.root / ".incoming"
+        self.incoming.mkdir(parents=True, exist_ok=True)
+        self.links: Dict[str, int] = {mode: 0 for mode in LINK_MODES if mode != "auto"}
+        self.ingested = 0
+        self.ingested_bytes = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.root / "store.sqlite"), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS objects (sha256 TEXT PRIMARY KEY, size INTEGER NOT NULL)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS refs ("
+            " sha256 TEXT NOT NULL,"
+            " case_id TEXT NOT NULL,"
+            " PRIMARY KEY (sha256, case_id))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS refs_by_case ON refs (case_id)")
+        self.conn.commit()
+
+    def object_path(self, sha: str) -> Path:
+        return self.root / sha[:2] / sha[2:4] / sha
+
+    def has(self, sha: str) -> bool:
+        return self.object_path(sha).is_file()
+
+    def ingest(self, fsrc: BinaryIO, expected_sha: Optional[str] = None, chunk_size: int = 65536) -> Tuple[str, int]:
+        """
+        Copies a stream into the store, hashing it on the way. If the object
+        already exists the copy is discarded. With expected_sha, a stream whose
+        digest differs (the source changed since it was hashed) raises ValueError.
+        Returns (sha256, size).
+        """
+        h = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=self.incoming, prefix="blob-")
+        try:
+            with os.fdopen(fd, 'wb') as fdst:
+                for chunk in iter(lambda: fsrc.read(chunk_size), b''):
+                    h.update(chunk)
+                    fdst.write(chunk)
+                    size += len(chunk)
+            sha = h.hexdigest()
+            if expected_sha is not None and sha != expected_sha:
+                raise ValueError(f"Source changed while storing: expected {expected_sha}, read {sha}")
+            dest = self.object_path(sha)
+            if dest.exists():
+                os.unlink(tmp_name)
+                with self._lock:
+                    self.reused += 1
+            else:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                # Objects may be hardlinked into cases: keep them read-only
+                os.chmod(tmp_name, 0o444)
+                os.replace(tmp_name, dest)
+                with self._lock:
+                    self.conn.execute("INSERT OR IGNORE INTO objects (sha256, size) VALUES (?, ?)", (sha, size))
+                    self.conn.commit()
+                    self.ingested += 1
+                    self.ingested_bytes += size
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        return sha, size
+
+    def mark_reused(self) -> None:
+        """Counts a blob that was found in the store without being read again."""
+        with self._lock:
+            self.reused += 1
+
+    def _reflink(self, src: Path, dest: Path) -> None:
+        with src.open('rb') as fsrc, dest.open('xb') as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            except OSError:
+                fdst.close()
+                dest.unlink()
+                raise
+
+    def link(self, sha: str, ext: str, dest_dir: Path) -> Path:
+        """Materialises an object as dest_dir/<sha><ext> and returns that path."""
+        dest = dest_dir / f"{sha}{ext}"
+        if dest.exists():
+            return dest
+        src = self.object_path(sha)
+        modes = ("reflink", "hardlink", "copy") if self.link_mode == "auto" else (self.link_mode,)
+        for mode in modes:
+            try:
+                if mode == "reflink":
+                    self._reflink(src, dest)
+                elif mode == "hardlink":
+                    os.link(src, dest)
+                else:
+                    fd, tmp_name = tempfile.mkstemp(dir=dest_dir, prefix=".incoming-")
+                    os.close(fd)
+                    shutil.copyfile(src, tmp_name)
+                    os.chmod(tmp_name, 0o644)
+                    os.replace(tmp_name, dest)
+            except FileExistsError:
+                # Another worker or device linked it first
+                return dest
+            except OSError as e:
+                if e.errno in _UNSUPPORTED and mode != modes[-1]:
+                    continue
+                raise
+            with self._lock:
+                self.links[mode] += 1
+            return dest
+        return dest
+
+    def add_refs(self, case_id: str, shas: Iterable[str]) -> None:
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO refs (sha256, case_id) VALUES (?, ?)",
+                ((sha, case_id) for sha in shas),
+            )
+            self.conn.commit()
+
+    def release_case(self, case_id: str) -> int:
+        """Drops a case's references. Returns how many were removed; run gc() to free space."""
+        with self._lock:
+            removed = self.conn.execute("DELETE FROM refs WHERE case_id = ?", (case_id,)).rowcount
+            self.conn.commit()
+        return removed
+
+    def gc(self) -> Tuple[int, int]:
+        """
+        Deletes objects no case references. Returns (objects, bytes) freed.
+        Do not run while a case is being ingested: its objects are only
+        referenced once the parser finishes.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT sha256, size FROM objects WHERE sha256 NOT IN (SELECT sha256 FROM refs)"
+            ).fetchall()
+        freed = 0
+        for sha, size in rows:
+            path = self.object_path(sha)
+            if path.exists():
+                path.unlink()
+                freed += size
+            with self._lock:
+                self.conn.execute("DELETE FROM objects WHERE sha256 = ?", (sha,))
+        with self._lock:
+            self.conn.commit()
+        return len(rows), freed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            objects, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+            refs, cases = self.conn.execute("SELECT COUNT(*), COUNT(DISTINCT case_id) FROM refs").fetchone()
+            logical = self.conn.execute(
+                "SELECT COALESCE(SUM(o.size), 0) FROM refs r JOIN objects o ON o.sha256 = r.sha256"
+            ).fetchone()[0]
+        return {"objects": objects, "bytes": size, "refs": refs, "cases": cases, "referenced_bytes": logical}
+
+    def session_stats(self) -> Dict[str, object]:
+        """What this process did: objects written, blobs reused, and links by mode."""
+        return {
+            "root": str(self.root),
+            "ingested": self.ingested,
+            "ingested_bytes": self.ingested_bytes,
+            "reused": self.reused,
+            "links": dict(self.links),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the cross-case blob store")
+    parser.add_argument("root", help="Blob store directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Object, reference and size totals")
+    release = sub.add_parser("release", help="Drop a case's references")
+    release.add_argument("case_id")
+    sub.add_parser("gc", help="Delete objects no case references")
+    args = parser.parse_args()
+    store = BlobStore(Path(args.root))
+    try:
+        if args.command == "stats":
+            result: Dict[str, object] = dict(store.stats())
+        elif args.command == "release":
+            result = {"case_id": args.case_id, "refs_removed": store.release_case(args.case_id)}
+        else:
+            objects, freed = store.gc()
+            result = {"objects_deleted": objects, "bytes_freed": freed}
+    finally:
+        store.close()
+    print(json.dumps(result, indent=2))
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+checkpoint.py — Checkpoint/resume support for long UFDR parser runs
+
+A checkpoint records, per record kind, how many records have been written and
+the state of each JSONL writer at that point (shard list and byte offset, see
+jsonl_io.JsonlWriter.sync). Manifest updates made while
+parsing messages are appended to a journal whose offset is checkpointed too.
+On resume the outputs are truncated back to the checkpoint, the journal is
+replayed, and parsing skips records that were already written, which yields
+the same bytes as an uninterrupted run.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CHECKPOINT_VERSION = 2
+DEFAULT_CHECKPOINT_EVERY = 10000
+
+class Checkpointer:
+    """Persists parser progress under parsed_dir and replays it on resume."""
+
+    def __init__(self, parsed_dir: Path, identity: Dict[str, Any], every: int = DEFAULT_CHECKPOINT_EVERY):
+        self.path = parsed_dir / ".checkpoint.json"
+        self.journal_path = parsed_dir / ".blobs_manifest.journal.jsonl"
+        self.identity = identity
+        self.every = every
+        self.journal = None
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Returns the saved state, or None if there is no checkpoint."""
+        if not self.path.exists():
+            return None
+        with self.path.open('r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version in {self.path}")
+        if state.get("identity") != self.identity:
+            raise ValueError(
+                f"Checkpoint {self.path} belongs to a different run: "
+                f"{state.get('identity')} != {self.identity}"
+            )
+        return state
+
+    def start(self, state: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Opens the manifest journal for appending. When resuming, truncates it to
+        the checkpointed offset and returns the manifest entries it replays.
+        """
+        manifest_entries: Dict[str, Dict[str, Any]] = {}
+        if state is None:
+            self.journal = self.journal_path.open('w', encoding='utf-8')
+            return manifest_entries
+        offset = state["journal_offset"]
+        os.truncate(self.journal_path, offset)
+        with self.journal_path.open('r', encoding='utf-8') as f:
+            for line in f:
+                item = json.loads(line)
+                manifest_entries[item["sha"]] = item["entry"]
+        self.journal = self.journal_path.open('a', encoding='utf-8')
+        return manifest_entries
+
+    def journal_manifest_entry(self, sha: str, entry: Dict[str, Any]) -> None:
+        self.journal.write(json.dumps({"sha": sha, "entry": entry}, ensure_ascii=False) + "\n")
+
+    def save(self, counts: Dict[str, int], offsets: Dict[str, Dict[str, Any]]) -> None:
+        """Atomically writes a checkpoint. Outputs must already be synced to offsets."""
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "identity": self.identity,
+            "counts": counts,
+            "offsets": offsets,
+            "journal_offset": self.journal.tell(),
+        }
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open('w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def close(self) -> None:
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def clear(self) -> None:
+        """Removes checkpoint state after a run completes."""
+        self.close()
+        for path in (self.path, self.journal_path):
+            if path.exists():
+                path.unlink()
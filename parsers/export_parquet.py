@@ -0,0 +1,213 @@
+"""
+export_parquet.py — Columnar Parquet export of parsed UFDR output
+
+Converts messages, contacts, calls and the blob manifest from JSONL (plain,
+compressed or sharded) into one Parquet file each, with typed columns:
+timestamps are UTC timestamp columns, counts and sizes are integers, and
+participants, attachments and each entity type are list columns.
+
+Usage:
+    python parsers/export_parquet.py <parsed_dir> [--out <dir>]
+
+Requires:
+    pip install pyarrow
+"""
+import argparse
+import importlib.util
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+# pyarrow is imported by require_pyarrow on first export, so importing the
+# parser (which imports this module) does not load it
+pa = None
+pq = None
+
+try:
+    from .jsonl_io import iter_records, jsonl_exists
+except ImportError:  # run as a script: python parsers/export_parquet.py
+    from jsonl_io import iter_records, jsonl_exists
+
+DEFAULT_BATCH_SIZE = 65536
+# Entity types written by ufdr_parser.extract_entities, one list column each
+ENTITY_KEYS = ("phone_numbers", "crypto_addresses", "urls")
+
+def parse_utc(value: Optional[str]) -> Optional[datetime]:
+    """Parses an ISO8601 timestamp as written by the parser; naive values are taken as UTC."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+def parse_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _get(key: str) -> Callable[[Dict[str, Any]], Any]:
+    return lambda rec: rec.get(key)
+
+def _raw_timestamp(key: str) -> Callable[[Dict[str, Any]], Optional[str]]:
+    """Keeps the original value when it is not a parseable timestamp, so nothing is lost."""
+    def raw(rec: Dict[str, Any]) -> Optional[str]:
+        value = rec.get(key)
+        return value if value and parse_utc(value) is None else None
+    return raw
+
+def _entity(key: str) -> Callable[[Dict[str, Any]], List[str]]:
+    return lambda rec: (rec.get("entities") or {}).get(key) or []
+
+# kind -> (JSONL file name, [(column, arrow type name, value getter)])
+Column = Tuple[str, str, Callable[[Dict[str, Any]], Any]]
+TABLES: Dict[str, Tuple[str, List[Column]]] = {
+    "messages": ("messages.jsonl", [
+        ("id", "string", _get("id")),
+        ("case_id", "string", _get("case_id")),
+        ("device_id", "string", _get("device_id")),
+        ("timestamp_utc", "timestamp", lambda rec: parse_utc(rec.get("timestamp_utc"))),
+        ("timestamp_raw", "string", _raw_timestamp("timestamp_utc")),
+        ("direction", "string", _get("direction")),
+        ("participants", "list", lambda rec: rec.get("participants") or []),
+        ("body", "string", _get("body")),
+        ("attachments", "list", lambda rec: rec.get("attachments") or []),
+        *[(f"entities_{key}", "list", _entity(key)) for key in ENTITY_KEYS],
+        ("raw_source", "string", _get("raw_source")),
+        ("hash", "string", _get("hash")),
+    ]),
+    "contacts": ("contacts.jsonl", [
+        ("id", "string", _get("id")),
+        ("case_id", "string", _get("case_id")),
+        ("name", "string", _get("name")),
+        ("phone", "string", _get("phone")),
+        ("raw_source", "string", _get("raw_source")),
+    ]),
+    "calls": ("calls.jsonl", [
+        ("id", "string", _get("id")),
+        ("case_id", "string", _get("case_id")),
+        ("timestamp_utc", "timestamp", lambda rec: parse_utc(rec.get("timestamp_utc"))),
+        ("timestamp_raw", "string", _raw_timestamp("timestamp_utc")),
+        ("caller", "string", _get("caller")),
+        ("callee", "string", _get("callee")),
+        ("duration_s", "int64", lambda rec: parse_int(rec.get("duration"))),
+        ("raw_source", "string", _get("raw_source")),
+    ]),
+    "blobs": ("blobs_manifest.jsonl", [
+        ("blob_id", "string", _get("blob_id")),
+        ("case_id", "string", _get("case_id")),
+        ("orig_path", "string", _get("orig_path")),
+        ("blob_path", "string", _get("blob_path")),
+        ("sha256", "string", _get("sha256")),
+        ("size_bytes", "int64", lambda rec: parse_int(rec.get("size_bytes"))),
+        ("mtime_utc", "timestamp", lambda rec: parse_utc(rec.get("mtime_utc"))),
+        ("related_message_ids", "list", lambda rec: rec.get("related_message_ids") or []),
+        # Null unless the parser ran with a known-file set
+        ("known", "bool", _get("known")),
+    ]),
+}
+
+def require_pyarrow() -> None:
+    global pa, pq
+    if pa is not None:
+        return
+    if importlib.util.find_spec("pyarrow") is None:
+        raise ImportError("pyarrow is required for Parquet export. Install with: pip install pyarrow")
+    import pyarrow
+    import pyarrow.parquet
+    pa, pq = pyarrow, pyarrow.parquet
+
+def _arrow_type(name: str) -> "pa.DataType":
+    return {
+        "string": pa.string(),
+        "int64": pa.int64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+        "list": pa.list_(pa.string()),
+    }[name]
+
+def table_schema(kind: str) -> "pa.Schema":
+    require_pyarrow()
+    return pa.schema([(name, _arrow_type(type_name)) for name, type_name, _ in TABLES[kind][1]])
+
+def _batch(columns: List[Column], schema: "pa.Schema", records: List[Dict[str, Any]]) -> "pa.Table":
+    data = {name: [get(rec) for rec in records] for name, _, get in columns}
+    return pa.Table.from_pydict(data, schema=schema)
+
+def records_to_parquet(
+    records: Iterable[Dict[str, Any]],
+    kind: str,
+    parquet_path: Path,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    compression: str = "zstd",
+) -> int:
+    """Writes records of the given kind to parquet_path in row groups of batch_size. Returns the row count."""
+    require_pyarrow()
+    columns = TABLES[kind][1]
+    schema = table_schema(kind)
+    parquet_path = Path(parquet_path)
+    parquet_path.parent.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    batch: List[Dict[str, Any]] = []
+    with pq.ParquetWriter(str(parquet_path), schema, compression=compression) as writer:
+        for rec in records:
+            batch.append(rec)
+            if len(batch) >= batch_size:
+                writer.write_table(_batch(columns, schema, batch))
+                rows += len(batch)
+                batch = []
+        if batch or not rows:
+            # An empty table still gets a file with the full schema
+            writer.write_table(_batch(columns, schema, batch))
+            rows += len(batch)
+    return rows
+
+def export_parsed_dir(
+    parsed_dir: Union[str, Path],
+    out_dir: Optional[Union[str, Path]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    read_workers: int = 1,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Exports every known output in parsed_dir to <out_dir>/<kind>.parquet
+    (default: parsed_dir/parquet). Returns {kind: {"count", "path"}}.
+    """
+    parsed_dir = Path(parsed_dir)
+    out_dir = Path(out_dir) if out_dir else parsed_dir / "parquet"
+    summary = {}
+    for kind, (filename, _) in TABLES.items():
+        jsonl_path = parsed_dir / filename
+        if not jsonl_exists(jsonl_path):
+            logging.warning(f"Skipping {kind}: no {filename} in {parsed_dir}")
+            continue
+        parquet_path = out_dir / f"{kind}.parquet"
+        count = records_to_parquet(iter_records(jsonl_path, workers=read_workers), kind, parquet_path, batch_size)
+        summary[kind] = {"count": count, "path": str(parquet_path)}
+        logging.info(f"Exported {count} {kind} to {parquet_path}")
+    return summary
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Export parsed UFDR JSONL to Parquet")
+    parser.add_argument("parsed_dir", help="Parser output directory (<outdir>/<case_id>/parsed)")
+    parser.add_argument("--out", default=None, help="Output directory (default: <parsed_dir>/parquet)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help=f"Rows per row group (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--read-workers", type=int, default=1, help="Processes decoding sharded JSONL in parallel")
+    args = parser.parse_args()
+    try:
+        summary = export_parsed_dir(args.parsed_dir, args.out, args.batch_size, args.read_workers)
+        print(json.dumps(summary, indent=2))
+        sys.exit(0)
+    except Exception as e:
+        logging.error(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
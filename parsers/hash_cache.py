@@ -0,0 +1,80 @@
+"""
+hash_cache.py — Persistent SHA256 cache for re-ingesting the same extraction
+
+Stores digests in a SQLite sidecar keyed by (relative path, size, mtime_ns), so a
+re-run of the parser only re-hashes files that changed since the last run.
+"""
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+class HashCache:
+    """
+    SQLite-backed map of (rel_path, size, mtime_ns) -> sha256.
+
+    Safe to share between the parser's blob worker threads. With reverify=True
+    lookups always miss, so every file is hashed again (for evidentiary runs),
+    but fresh digests are still recorded.
+    """
+
+    def __init__(self, path: Path, reverify: bool = False, commit_every: int = 1000):
+        self.path = Path(path)
+        self.reverify = reverify
+        self.commit_every = commit_every
+        self.hits = 0
+        self.misses = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            " rel_path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " sha256 TEXT NOT NULL,"
+            " PRIMARY KEY (rel_path, size, mtime_ns))"
+        )
+        self.conn.commit()
+
+    def get(self, rel_path: str, size: int, mtime_ns: int) -> Optional[str]:
+        """Returns the cached digest for an unchanged file, or None."""
+        if self.reverify:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT sha256 FROM hashes WHERE rel_path = ? AND size = ? AND mtime_ns = ?",
+                (rel_path, size, mtime_ns),
+            ).fetchone()
+            if row:
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, rel_path: str, size: int, mtime_ns: int, sha: str) -> None:
+        """Records a digest; older entries for the same path are replaced."""
+        with self._lock:
+            self.conn.execute("DELETE FROM hashes WHERE rel_path = ?", (rel_path,))
+            self.conn.execute(
+                "INSERT INTO hashes (rel_path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+                (rel_path, size, mtime_ns, sha),
+            )
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self.conn.commit()
+                self._pending = 0
+
+    def commit(self) -> None:
+        with self._lock:
+            self.conn.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        self.commit()
+        self.conn.close()
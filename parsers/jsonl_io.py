@@ -0,0 +1,279 @@
+"""
+jsonl_io.py — Compressed, sharded JSONL output and a shared parallel reader
+
+The parser can write each record kind as a single messages.jsonl (the default),
+as one gzip/zstd-compressed file, or as shards of N records each:
+
+    messages-00000.jsonl.zst
+    messages-00001.jsonl.zst
+    messages.index.json        # shard file names and record counts
+
+Downstream stages (ETL, OpenSearch indexing, embeddings) read any of these
+layouts through iter_records(), given the logical path (parsed/messages.jsonl).
+With workers > 1, shards are decompressed and decoded in worker processes.
+"""
+import gzip
+import io
+import json
+import logging
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, TextIO, TypeVar
+
+# Optional: zstandard for zstd-compressed output (install via pip if desired)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+INDEX_VERSION = 1
+DEFAULT_READ_WORKERS = min(4, os.cpu_count() or 1)
+
+T = TypeVar("T")
+
+def _base_name(path: Path) -> str:
+    """messages.jsonl, messages.jsonl.gz, messages.index.json -> messages"""
+    name = path.name
+    for suffix in (".index.json", *COMPRESSION_SUFFIXES.values()):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+    return name[: -len(".jsonl")] if name.endswith(".jsonl") else name
+
+def index_path(path: Path) -> Path:
+    """Index file of a sharded output: parsed/messages.jsonl -> parsed/messages.index.json"""
+    path = Path(path)
+    return path.with_name(_base_name(path) + ".index.json")
+
+def output_path(path: Path, shard_size: int = 0, compression: Optional[str] = None) -> Path:
+    """Path to hand to readers: the index for sharded output, else the single file."""
+    path = Path(path)
+    if shard_size:
+        return index_path(path)
+    return path.with_name(_base_name(path) + ".jsonl" + COMPRESSION_SUFFIXES.get(compression, ""))
+
+def _shard_pattern(path: Path) -> "re.Pattern[str]":
+    return re.compile(re.escape(_base_name(path)) + r"-(\d{5,})\.jsonl(\.gz|\.zst)?$")
+
+def remove_outputs(path: Path) -> None:
+    """Deletes every layout of the output at path, so a fresh run leaves no stale files."""
+    path = Path(path)
+    pattern = _shard_pattern(path)
+    base = path.parent / (_base_name(path) + ".jsonl")
+    stale = [base, index_path(path)] + [Path(str(base) + s) for s in COMPRESSION_SUFFIXES.values()]
+    if path.parent.exists():
+        stale += [p for p in path.parent.iterdir() if pattern.match(p.name)]
+    for p in stale:
+        if p.exists():
+            p.unlink()
+
+class JsonlWriter:
+    """
+    Writes JSON records to path, optionally compressed and/or split into shards.
+
+    shard_size > 0 splits the output into shards of that many records plus an
+    index file; compression is None, "gzip" or "zstd". sync() ends the current
+    gzip member / zstd frame, fsyncs, and returns a state that a later writer
+    can resume from (see checkpoint.py); the concatenated members decompress to
+    exactly the records written.
+    """
+
+    def __init__(self, path: Path, shard_size: int = 0, compression: Optional[str] = None,
+                 state: Optional[Dict[str, Any]] = None):
+        if compression not in (None, *COMPRESSION_SUFFIXES):
+            raise ValueError(f"Unknown compression {compression!r}; use one of {sorted(COMPRESSION_SUFFIXES)}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstandard is required for zstd output. Install with: pip install zstandard")
+        self.path = Path(path)
+        self.shard_size = shard_size
+        self.compression = compression
+        self.suffix = COMPRESSION_SUFFIXES.get(compression, "")
+        self.shards: List[int] = []  # record counts of completed shards
+        self.records = 0             # records in the current file
+        self._raw: Optional[io.BufferedWriter] = None
+        self._stream: Any = None
+        if state is None:
+            remove_outputs(self.path)
+        else:
+            self.shards = list(state["shards"])
+            self.records = state["records"]
+            pattern = _shard_pattern(self.path)
+            for p in self.path.parent.iterdir():
+                m = pattern.match(p.name)
+                if m and int(m.group(1)) > len(self.shards):
+                    p.unlink()
+            if self._file_path().exists():
+                os.truncate(self._file_path(), state["offset"])
+                self._raw = self._file_path().open('ab')
+        if self._raw is None and not self.shard_size:
+            self._raw = self._file_path().open('wb')
+
+    @property
+    def output_path(self) -> Path:
+        return output_path(self.path, self.shard_size, self.compression)
+
+    def _file_path(self) -> Path:
+        if self.shard_size:
+            name = f"{_base_name(self.path)}-{len(self.shards):05d}.jsonl{self.suffix}"
+        else:
+            name = f"{_base_name(self.path)}.jsonl{self.suffix}"
+        return self.path.with_name(name)
+
+    def _open_stream(self) -> None:
+        if self._raw is None:
+            self._raw = self._file_path().open('wb')
+        if self.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode='wb', compresslevel=6, mtime=0)
+        elif self.compression == "zstd":
+            self._stream = zstandard.ZstdCompressor(level=3).stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+
+    def _end_stream(self) -> None:
+        """Ends the current gzip member / zstd frame, leaving the file open."""
+        if self._stream is not None and self._stream is not self._raw:
+            self._stream.close()
+        self._stream = None
+
+    def write(self, obj: Dict[str, Any]) -> None:
+        self.write_line(json.dumps(obj, ensure_ascii=False))
+
+    def write_line(self, line: str) -> None:
+        """Writes one already-serialised record (without the trailing newline)."""
+        if self._stream is None:
+            self._open_stream()
+        self._stream.write((line + "\n").encode("utf-8"))
+        self.records += 1
+        if self.shard_size and self.records >= self.shard_size:
+            self._end_stream()
+            self._raw.close()
+            self._raw = None
+            self.shards.append(self.records)
+            self.records = 0
+
+    def sync(self) -> Dict[str, Any]:
+        """Makes everything written so far durable and returns the resume state."""
+        self._end_stream()
+        offset = 0
+        if self._raw is not None:
+            self._raw.flush()
+            os.fsync(self._raw.fileno())
+            offset = self._raw.tell()
+        return {"shards": list(self.shards), "records": self.records, "offset": offset}
+
+    def close(self) -> None:
+        self._end_stream()
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+        if self.shard_size:
+            if self.records:
+                self.shards.append(self.records)
+                self.records = 0
+            index = {
+                "version": INDEX_VERSION,
+                "compression": self.compression,
+                "shard_size": self.shard_size,
+                "records": sum(self.shards),
+                "shards": [
+                    {"file": f"{_base_name(self.path)}-{i:05d}.jsonl{self.suffix}", "records": n}
+                    for i, n in enumerate(self.shards)
+                ],
+            }
+            with index_path(self.path).open('w', encoding='utf-8') as f:
+                json.dump(index, f, indent=2)
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+def resolve_shards(path: Path) -> List[Path]:
+    """
+    Returns the files making up the output at path, in record order.
+
+    path may be the logical .jsonl path, an index file, or a single (possibly
+    compressed) JSONL file. Raises FileNotFoundError if none exists.
+    """
+    path = Path(path)
+    if path.name.endswith(".index.json") or (not path.exists() and index_path(path).exists()):
+        idx = index_path(path)
+        with idx.open('r', encoding='utf-8') as f:
+            index = json.load(f)
+        return [idx.parent / shard["file"] for shard in index["shards"]]
+    if path.exists():
+        return [path]
+    for suffix in COMPRESSION_SUFFIXES.values():
+        candidate = Path(str(path) + suffix)
+        if candidate.exists():
+            return [candidate]
+    raise FileNotFoundError(f"No JSONL output at {path}")
+
+def jsonl_exists(path: Path) -> bool:
+    """True if any layout of the output at path exists."""
+    try:
+        resolve_shards(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+def open_text(path: Path) -> TextIO:
+    """Opens one JSONL file for reading, decompressing by suffix."""
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise ImportError("zstandard is required to read .zst files. Install with: pip install zstandard")
+        reader = zstandard.ZstdDecompressor().stream_reader(path.open('rb'), read_across_frames=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return path.open('r', encoding='utf-8')
+
+def iter_shard(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yields the records of one file, skipping blank and malformed lines."""
+    with open_text(path) as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logging.warning(f"Skipping invalid JSON at {path}:{line_num}: {e}")
+
+def read_shard(path: Path) -> List[Dict[str, Any]]:
+    return list(iter_shard(path))
+
+def map_shards(path: Path, func: Callable[[Path], T], workers: Optional[int] = None) -> Iterator[T]:
+    """
+    Applies func to every shard of the output at path and yields the results in
+    shard order. With more than one worker and shard, func runs in a process
+    pool (so it must be picklable) with at most 2 * workers shards in flight.
+    """
+    shards = resolve_shards(path)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(shards) < 2:
+        for shard in shards:
+            yield func(shard)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+        pending: Deque[Any] = deque()
+        for shard in shards:
+            pending.append(pool.submit(func, shard))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def iter_records(path: Path, workers: int = 1) -> Iterator[Dict[str, Any]]:
+    """Yields all records of the output at path in order, decoding shards in `workers` processes."""
+    if workers == 1:
+        for shard in resolve_shards(path):
+            yield from iter_shard(shard)
+        return
+    for records in map_shards(path, read_shard, workers):
+        yield from records
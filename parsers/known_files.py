@@ -0,0 +1,202 @@
+"""
+known_files.py — Known-file (NSRL-style) SHA256 reference set
+
+A reference list of digests for OS and app boilerplate (icons, stock
+ringtones, emoji sheets, ...) is compiled once into a single file holding:
+
+    - a Bloom filter, checked first: most blobs are not known, and a miss
+      costs k bit tests in ~1.8 bytes per entry (at a 0.1% false-positive rate)
+    - the exact digests, sorted, with a prefix bucket index, so a Bloom hit is
+      confirmed with a short binary search inside one bucket
+
+The file is memory-mapped, so opening a multi-million-entry set is instant
+and only the pages that lookups touch are read into RAM.
+
+Reference files are text with one SHA256 per line; CSV exports work too (the
+first 64-hex-digit field on each line is used, other lines are skipped).
+
+Usage:
+    python parsers/known_files.py build <reference.txt> <known.kfs> [--fp-rate 0.001]
+    python parsers/known_files.py check <known.kfs> <sha256> [...]
+"""
+import argparse
+import json
+import math
+import mmap
+import re
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, List, Union
+
+MAGIC = b"FQKFS001"
+# magic, entries, Bloom bits, Bloom hashes, bucket prefix bits
+HEADER = struct.Struct("<8sQQII")
+DIGEST_SIZE = 32
+DEFAULT_FP_RATE = 0.001
+_SHA256_RE = re.compile(rb"(?<![0-9A-Fa-f])[0-9A-Fa-f]{64}(?![0-9A-Fa-f])")
+
+def iter_reference_digests(path: Path) -> Iterator[bytes]:
+    """Yields the raw digest of each line in a reference file that contains a SHA256."""
+    with Path(path).open('rb') as f:
+        for line in f:
+            match = _SHA256_RE.search(line)
+            if match:
+                yield bytes.fromhex(match.group().decode('ascii'))
+
+def _bloom_positions(digest: bytes, bits: int, hashes: int) -> Iterator[int]:
+    # The digest is already uniformly distributed: derive k positions by double hashing its words
+    h1 = int.from_bytes(digest[8:16], 'little')
+    h2 = int.from_bytes(digest[16:24], 'little') | 1
+    for i in range(hashes):
+        yield (h1 + i * h2) % bits
+
+def _prefix_bits(entries: int) -> int:
+    """Bucket index size: about 16 entries per bucket, between 2^8 and 2^24 buckets."""
+    return max(8, min(24, math.ceil(math.log2(max(entries, 16) / 16))))
+
+def build_known_set(digests: Iterable[bytes], out_path: Path, fp_rate: float = DEFAULT_FP_RATE) -> int:
+    """
+    Compiles raw SHA256 digests into a known-file set at out_path.
+    Duplicates are dropped. Returns the number of distinct entries.
+    """
+    table = sorted(set(digests))
+    entries = len(table)
+    bits = max(64, math.ceil(-entries * math.log(fp_rate) / (math.log(2) ** 2)))
+    bits = (bits + 63) // 64 * 64
+    hashes = max(1, round(bits / max(entries, 1) * math.log(2)))
+    bloom = bytearray(bits // 8)
+    for digest in table:
+        for pos in _bloom_positions(digest, bits, hashes):
+            bloom[pos >> 3] |= 1 << (pos & 7)
+    prefix_bits = _prefix_bits(entries)
+    # starts[b] = index of the first entry whose prefix is >= b; starts[-1] = entries
+    starts = [0] * ((1 << prefix_bits) + 1)
+    for digest in table:
+        starts[(int.from_bytes(digest[:4], 'big') >> (32 - prefix_bits)) + 1] += 1
+    for b in range(1, len(starts)):
+        starts[b] += starts[b - 1]
+    out_path = Path(out_path)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with tmp_path.open('wb') as f:
+        f.write(HEADER.pack(MAGIC, entries, bits, hashes, prefix_bits))
+        f.write(bloom)
+        f.write(struct.pack(f"<{len(starts)}Q", *starts))
+        for digest in table:
+            f.write(digest)
+    tmp_path.replace(out_path)
+    return entries
+
+class KnownFileSet:
+    """
+    Read-only, memory-mapped known-file set built by build_known_set.
+
+    `sha in known` takes a hex digest. Safe to share between threads.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = self.path.open('rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.entries, self.bits, self.hashes, self.prefix_bits = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a known-file set")
+        self._bloom = HEADER.size
+        self._starts = self._bloom + self.bits // 8
+        self._table = self._starts + ((1 << self.prefix_bits) + 1) * 8
+        self.bloom_rejects = 0
+        self.false_positives = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.entries
+
+    def might_contain(self, digest: bytes) -> bool:
+        """Bloom filter test on a raw digest: False means certainly not known."""
+        mm = self._mm
+        base = self._bloom
+        for pos in _bloom_positions(digest, self.bits, self.hashes):
+            if not mm[base + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def _in_table(self, digest: bytes) -> bool:
+        bucket = int.from_bytes(digest[:4], 'big') >> (32 - self.prefix_bits)
+        lo, hi = struct.unpack_from("<2Q", self._mm, self._starts + bucket * 8)
+        mm = self._mm
+        base = self._table
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = mm[base + mid * DIGEST_SIZE:base + (mid + 1) * DIGEST_SIZE]
+            if probe < digest:
+                lo = mid + 1
+            elif probe > digest:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def contains_digest(self, digest: bytes) -> bool:
+        if not self.might_contain(digest):
+            with self._lock:
+                self.bloom_rejects += 1
+            return False
+        found = self._in_table(digest)
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.false_positives += 1
+        return found
+
+    def __contains__(self, sha: object) -> bool:
+        if not isinstance(sha, str) or len(sha) != 2 * DIGEST_SIZE:
+            return False
+        try:
+            digest = bytes.fromhex(sha)
+        except ValueError:
+            return False
+        return self.contains_digest(digest)
+
+    def stats(self) -> dict:
+        return {
+            "entries": self.entries,
+            "hits": self.hits,
+            "bloom_rejects": self.bloom_rejects,
+            "false_positives": self.false_positives,
+        }
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query a known-file SHA256 set")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Compile a reference hash list")
+    build.add_argument("reference", help="Text/CSV file with one SHA256 per line")
+    build.add_argument("out", help="Output set file (e.g. known.kfs)")
+    build.add_argument("--fp-rate", type=float, default=DEFAULT_FP_RATE, help=f"Bloom false-positive rate (default: {DEFAULT_FP_RATE})")
+    check = sub.add_parser("check", help="Look up digests")
+    check.add_argument("set", help="Known-file set")
+    check.add_argument("sha256", nargs="+")
+    args = parser.parse_args()
+    if args.command == "build":
+        entries = build_known_set(iter_reference_digests(Path(args.reference)), Path(args.out), args.fp_rate)
+        known = KnownFileSet(args.out)
+        print(json.dumps({"entries": entries, "bloom_bits": known.bits, "bloom_hashes": known.hashes,
+                          "bytes": Path(args.out).stat().st_size}, indent=2))
+        known.close()
+        sys.exit(0)
+    known = KnownFileSet(args.set)
+    found: List[bool] = [sha.lower() in known for sha in args.sha256]
+    for sha, hit in zip(args.sha256, found):
+        print(f"{sha}\t{'known' if hit else 'unknown'}")
+    known.close()
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -11,13 +11,44 @@ import json
 import logging
 import os
 import shutil
+import posixpath
 import sys
+import tempfile
+import threading
+import time
 import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 from xml.etree import ElementTree as ET
 from datetime import datetime, timezone
 
+try:
+    from .blob_store import LINK_MODES, BlobStore
+    from .checkpoint import DEFAULT_CHECKPOINT_EVERY, Checkpointer
+    from .export_parquet import export_parsed_dir, require_pyarrow
+    from .hash_cache import HashCache
+    from .jsonl_io import COMPRESSION_SUFFIXES, JsonlWriter, output_path
+    from .known_files import KnownFileSet
+except ImportError:  # run as a script: python parsers/ufdr_parser.py
+    from blob_store import LINK_MODES, BlobStore
+    from checkpoint import DEFAULT_CHECKPOINT_EVERY, Checkpointer
+    from export_parquet import export_parsed_dir, require_pyarrow
+    from hash_cache import HashCache
+    from jsonl_io import COMPRESSION_SUFFIXES, JsonlWriter, output_path
+    from known_files import KnownFileSet
+
+try:
+    from nlp.entity_engine import EntityEngine, EntityPattern
+    from nlp.watchlist import Watchlist
+except ImportError:  # run as a script: python parsers/ufdr_parser.py
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from nlp.entity_engine import EntityEngine, EntityPattern
+    from nlp.watchlist import Watchlist
+
 # Optional: tqdm for progress bars (install via pip if desired)
 try:
     from tqdm import tqdm
@@ -43,6 +74,12 @@ def strip_ns(tag: str) -> str:
         return tag.split('}', 1)[1].lower()
     return tag.lower()
 
+def strip_record_ns(node: ET.Element) -> None:
+    """Drops namespaces from a record subtree in place, so builders can find("body") under a default xmlns."""
+    for elem in node.iter():
+        if '}' in elem.tag:
+            elem.tag = elem.tag.split('}', 1)[1]
+
 def find_main_xml(root: Path) -> Path:
     """Locates main XML report file (report.xml or first .xml)."""
     report = root / "report.xml"
@@ -69,9 +106,19 @@ def unpack_ufdr(input_path: Path, outdir: Path, case_id: str) -> Path:
         return raw_dir
     # Zip file
     with zipfile.ZipFile(input_path, 'r') as z:
-        z.extractall(raw_dir)
+        for info in z.infolist():
+            # extract() sanitises absolute and ".." member names and returns where it wrote
+            path = z.extract(info, raw_dir)
+            if not info.is_dir():
+                # Keep the archived timestamps so unchanged files hit the hash cache on re-runs
+                ts = zip_mtime(info)
+                os.utime(path, (ts, ts))
     return raw_dir
 
+def zip_mtime(info: zipfile.ZipInfo) -> float:
+    """Returns a zip member's recorded modification time as an epoch timestamp."""
+    return time.mktime(info.date_time + (0, 0, -1))
+
 def parse_timestamp(ts: str) -> str:
     """Converts timestamp to ISO8601 UTC if possible."""
     try:
@@ -104,220 +151,862 @@ def sha256_file(path: Path, chunk_size: int = 65536) -> Tuple[str, int]:
             size += len(chunk)
     return h.hexdigest(), size
 
-def copy_blob(src: Path, dest_dir: Path, sha: str, orig_ext: str) -> Path:
-    """Copies blob to dest_dir/<sha256><orig_ext> if not exists."""
-    dest = dest_dir / f"{sha}{orig_ext}"
-    if not dest.exists():
-        with src.open('rb') as fsrc, dest.open('wb') as fdst:
+def sha256_stream(fsrc: BinaryIO, chunk_size: int = 65536) -> Tuple[str, int]:
+    """Computes SHA256 and size of a stream without writing it anywhere."""
+    h = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: fsrc.read(chunk_size), b''):
+        h.update(chunk)
+        size += len(chunk)
+    return h.hexdigest(), size
+
+def hash_and_store(fsrc: BinaryIO, dest_dir: Path, orig_ext: str, chunk_size: int = 65536) -> Tuple[str, int, Path]:
+    """
+    Hashes a stream while writing it into dest_dir in a single pass.
+
+    The bytes land in a temporary file that is renamed to <sha256><orig_ext>,
+    or discarded if that blob is already stored. Returns (sha256, size, dest).
+    """
+    h = hashlib.sha256()
+    size = 0
+    fd, tmp_name = tempfile.mkstemp(dir=dest_dir, prefix=".incoming-")
+    try:
+        with os.fdopen(fd, 'wb') as fdst:
             while True:
-                chunk = fsrc.read(65536)
+                chunk = fsrc.read(chunk_size)
                 if not chunk:
                     break
+                h.update(chunk)
                 fdst.write(chunk)
-    return dest
-
-def find_media_files(root: Path) -> List[Path]:
-    """Finds files in common media folders."""
-    media_dirs = ["attachments", "media", "files", "images", "videos"]
-    found = []
-    for d in media_dirs:
-        dirpath = root / d
-        if dirpath.exists() and dirpath.is_dir():
-            found.extend(dirpath.rglob("*"))
-    return [f for f in found if f.is_file()]
+                size += len(chunk)
+        sha = h.hexdigest()
+        dest = dest_dir / f"{sha}{orig_ext}"
+        if dest.exists():
+            os.unlink(tmp_name)
+        else:
+            os.chmod(tmp_name, 0o644)
+            os.replace(tmp_name, dest)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return sha, size, dest
+
+MEDIA_DIRS = ["attachments", "media", "files", "images", "videos"]
+
+def normalize_rel_path(rel_path: str) -> str:
+    """Normalises an extraction-relative path: '/' separators, no '.' segments or leading '/'."""
+    norm = posixpath.normpath(rel_path.replace('\\', '/')).lstrip('/')
+    return "" if norm == "." else norm
+
+class PathIndex:
+    """
+    One-time scandir walk of an extraction directory.
+
+    Maps each file's root-relative path to its stat result (size, mtime, inode),
+    plus a case-folded view, so attachment lookups need no filesystem probing.
+    Files are kept in the same order Path.rglob would list them.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.files: Dict[str, os.stat_result] = {}
+        self.folded: Dict[str, str] = {}
+        self._walk()
+
+    def _walk(self) -> None:
+        stack = [(str(self.root), "")]
+        while stack:
+            dirpath, prefix = stack.pop()
+            subdirs = []
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        # Like rglob, do not descend into symlinked directories
+                        if not entry.is_symlink():
+                            subdirs.append((entry.path, prefix + entry.name + "/"))
+                    elif entry.is_file():
+                        rel_path = prefix + entry.name
+                        self.files[rel_path] = entry.stat()
+                        self.folded.setdefault(rel_path.casefold(), rel_path)
+            stack.extend(reversed(subdirs))
+
+    def lookup(self, rel_path: str) -> Optional[str]:
+        """Returns the indexed path for rel_path, matching case-insensitively if needed."""
+        norm = normalize_rel_path(rel_path)
+        if norm in self.files:
+            return norm
+        return self.folded.get(norm.casefold())
+
+    def under(self, dirname: str) -> List[str]:
+        """Indexed files below a top-level directory, in walk order."""
+        prefix = dirname + "/"
+        return [rel_path for rel_path in self.files if rel_path.startswith(prefix)]
+
+@dataclass
+class SourceFile:
+    """A file inside the extraction: on-disk path or zip member, plus manifest metadata."""
+    rel_path: str
+    suffix: str
+    mtime_utc: str
+    handle: Any
+    key: str
+    size: int
+    mtime_ns: int
+
+class DirSource:
+    """
+    Reads an extraction that is on disk (the unpacked raw/ dir or an input folder).
+
+    The directory is indexed once (PathIndex); attachment lookups and the media
+    folder scan are answered from the index. Paths are matched after
+    normalising Windows separators, falling back to a case-insensitive match.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.index = PathIndex(root)
+
+    def open_report(self) -> Path:
+        return find_main_xml(self.root)
+
+    def _file(self, indexed_path: str, rel_path: str) -> SourceFile:
+        st = self.index.files[indexed_path]
+        path = self.root / indexed_path
+        mtime = datetime.utcfromtimestamp(st.st_mtime).isoformat().replace('+00:00', 'Z')
+        # Keyed by location relative to the extraction root, so it survives moving the case
+        return SourceFile(rel_path.replace('\\', '/'), path.suffix, mtime, path, indexed_path, st.st_size, st.st_mtime_ns)
+
+    def find(self, rel_path: str) -> Optional[SourceFile]:
+        indexed_path = self.index.lookup(rel_path)
+        if indexed_path is None:
+            return None
+        return self._file(indexed_path, rel_path)
+
+    def media_files(self) -> List[SourceFile]:
+        found = []
+        for d in MEDIA_DIRS:
+            found.extend(self._file(p, p) for p in self.index.under(d))
+        return found
+
+    def open(self, f: SourceFile) -> BinaryIO:
+        return f.handle.open('rb')
+
+    def store(self, f: SourceFile, blobs_dir: Path) -> Tuple[str, int, Path]:
+        with self.open(f) as fsrc:
+            return hash_and_store(fsrc, blobs_dir, f.suffix)
+
+    def close(self) -> None:
+        pass
+
+class ZipSource:
+    """
+    Reads a UFDR archive in place, without extracting it to raw/.
+
+    The report is parsed from the member stream and each blob is read once,
+    hashed and written straight into the blob store (see hash_and_store).
+    """
+
+    def __init__(self, path: Path):
+        self.zf = zipfile.ZipFile(path, 'r')
+        self.members: Dict[str, zipfile.ZipInfo] = {
+            info.filename: info for info in self.zf.infolist() if not info.is_dir()
+        }
+        self.folded: Dict[str, str] = {}
+        for name in self.members:
+            self.folded.setdefault(name.casefold(), name)
+
+    def open_report(self) -> BinaryIO:
+        top_level = [name for name in self.members if '/' not in name]
+        if "report.xml" in top_level:
+            return self.zf.open("report.xml")
+        xmls = [name for name in top_level if name.lower().endswith(".xml")]
+        if xmls:
+            logging.warning(f"report.xml not found, using {xmls[0]}")
+            return self.zf.open(xmls[0])
+        raise FileNotFoundError("No XML report found in UFDR root.")
+
+    def _file(self, info: zipfile.ZipInfo) -> SourceFile:
+        ts = zip_mtime(info)
+        mtime = datetime.utcfromtimestamp(ts).isoformat()
+        return SourceFile(
+            info.filename, posixpath.splitext(info.filename)[1], mtime, info, info.filename,
+            info.file_size, int(ts * 1_000_000_000),
+        )
+
+    def find(self, rel_path: str) -> Optional[SourceFile]:
+        name = normalize_rel_path(rel_path)
+        info = self.members.get(name) or self.members.get(self.folded.get(name.casefold(), ""))
+        return self._file(info) if info else None
+
+    def media_files(self) -> List[SourceFile]:
+        found = []
+        for d in MEDIA_DIRS:
+            prefix = d + "/"
+            found.extend(self._file(info) for name, info in self.members.items() if name.startswith(prefix))
+        return found
+
+    def open(self, f: SourceFile) -> BinaryIO:
+        return self.zf.open(f.handle)
+
+    def store(self, f: SourceFile, blobs_dir: Path) -> Tuple[str, int, Path]:
+        with self.open(f) as fsrc:
+            return hash_and_store(fsrc, blobs_dir, f.suffix)
+
+    def close(self) -> None:
+        self.zf.close()
+
+DEFAULT_BLOB_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+
+class BlobPipeline:
+    """
+    Bounded worker pool that hashes and stores blobs while parsing continues.
+
+    Each job reads its source file once (hash_and_store). Jobs are keyed by
+    source file, so an attachment shared by many messages is stored once, and
+    at most max_pending jobs are in flight at a time. With a HashCache, files
+    unchanged since a previous run whose blob is already stored are not read.
+
+    With a BlobStore, content goes into the cross-case store and blobs/ gets a
+    link to it. Files are hashed before anything is written, so content the
+    store already holds (from this or another case) is never written again;
+    new content is read a second time to copy it in.
+
+    With a KnownFileSet, jobs submitted with skip_known=True are hashed first
+    and not stored at all if the reference set lists them.
+    """
+
+    def __init__(self, source: Union["DirSource", "ZipSource"], blobs_dir: Path,
+                 workers: int = DEFAULT_BLOB_WORKERS, max_pending: Optional[int] = None,
+                 cache: Optional[HashCache] = None, store: Optional[BlobStore] = None,
+                 known: Optional[KnownFileSet] = None):
+        self.source = source
+        self.blobs_dir = blobs_dir
+        self.cache = cache
+        self.store = store
+        self.known = known
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="blob")
+        self.max_pending = max_pending or max(1, workers) * 4
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._jobs: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+        self.elapsed = 0.0
+        self.bytes_stored = 0
+        self.files_stored = 0
+
+    def submit(self, f: SourceFile, skip_known: bool = False) -> Future:
+        """
+        Queues a blob for hashing/storing; returns a future of (sha256, size, blob_path).
+        With skip_known, a known file is hashed but not stored and blob_path is None.
+        """
+        job = self._jobs.get(f.key)
+        if job is None:
+            self._slots.acquire()
+            if self._started is None:
+                self._started = time.perf_counter()
+            job = self.executor.submit(self._store, f, skip_known)
+            job.add_done_callback(lambda _: self._slots.release())
+            self._jobs[f.key] = job
+        return job
+
+    def _store(self, f: SourceFile, skip_known: bool = False) -> Tuple[str, int, Optional[Path]]:
+        sha = self.cache.get(f.key, f.size, f.mtime_ns) if self.cache is not None else None
+        if sha and (self.blobs_dir / f"{sha}{f.suffix}").exists():
+            return sha, f.size, self.blobs_dir / f"{sha}{f.suffix}"
+        if skip_known and self.known is not None:
+            if sha is None:
+                sha = self._hash(f)
+            if sha in self.known:
+                return sha, f.size, None
+        if self.store is not None:
+            return self._store_shared(f, sha)
+        sha, size, dest = self.source.store(f, self.blobs_dir)
+        if self.cache is not None:
+            self.cache.put(f.key, f.size, f.mtime_ns, sha)
+        with self._lock:
+            self.bytes_stored += size
+            self.files_stored += 1
+        return sha, size, dest
+
+    def _hash(self, f: SourceFile) -> str:
+        """Hashes a source file without storing it, recording the digest in the cache."""
+        with self.source.open(f) as fsrc:
+            sha, _ = sha256_stream(fsrc)
+        if self.cache is not None:
+            self.cache.put(f.key, f.size, f.mtime_ns, sha)
+        return sha
+
+    def _store_shared(self, f: SourceFile, sha: Optional[str]) -> Tuple[str, int, Path]:
+        size = f.size
+        if sha is None:
+            sha = self._hash(f)
+        if self.store.has(sha):
+            self.store.mark_reused()
+        else:
+            with self.source.open(f) as fsrc:
+                _, size = self.store.ingest(fsrc, expected_sha=sha)
+            with self._lock:
+                self.bytes_stored += size
+                self.files_stored += 1
+        return sha, size, self.store.link(sha, f.suffix, self.blobs_dir)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        if self._started is not None:
+            self.elapsed = time.perf_counter() - self._started
+
+    def throughput_mb_s(self) -> float:
+        """MB/s over the wall time from the first submitted job until close()."""
+        if not self.elapsed:
+            return 0.0
+        return self.bytes_stored / (1024 * 1024) / self.elapsed
+
+class PendingRecord:
+    """A record whose blob-dependent fields are filled in by finish() once its blob jobs are done."""
+
+    def __init__(self, obj: Dict[str, Any], jobs: List[Future],
+                 finish: Optional[Callable[[Dict[str, Any], List[Tuple[str, int, Path]]], None]] = None):
+        self.obj = obj
+        self.jobs = jobs
+        self.finish = finish
+
+    def done(self) -> bool:
+        return all(job.done() for job in self.jobs)
+
+    def result(self) -> Dict[str, Any]:
+        if self.finish is not None:
+            self.finish(self.obj, [job.result() for job in self.jobs])
+        return self.obj
+
+# Entities recorded on each message: one scan per body, keys in output order
+MESSAGE_ENTITIES = EntityEngine(
+    {
+        "url": EntityPattern(r"https?://\S+", "h", requires="://"),
+        "crypto": EntityPattern(r"0x[a-fA-F0-9]{6,}", "0", independent=True),
+        "phone": EntityPattern(r"\+?\d{10,15}", r"+\d", independent=True),
+    },
+    {"phone_numbers": ("phone",), "crypto_addresses": ("crypto",), "urls": ("url",)},
+    dedupe=False,
+)
 
 def extract_entities(text: str) -> Dict[str, List[str]]:
     """Extracts phone numbers, crypto addresses, and URLs from text."""
-    import re
-    phones = re.findall(r"\+?\d{10,15}", text)
-    cryptos = re.findall(r"0x[a-fA-F0-9]{6,}", text)
-    urls = re.findall(r"https?://\S+", text)
-    return {
-        "phone_numbers": phones,
-        "crypto_addresses": cryptos,
-        "urls": urls,
+    return MESSAGE_ENTITIES.extract(text)
+
+@dataclass
+class ParseContext:
+    """Per-run state shared by record handlers."""
+    case_id: str
+    device_id: str
+    source: Union[DirSource, ZipSource]
+    blobs_dir: Path
+    pipeline: BlobPipeline
+    manifest_entries: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    checkpoint: Optional[Checkpointer] = None
+    known: Optional[KnownFileSet] = None
+    skip_known: bool = False
+    known_skipped: int = 0
+    watchlist: Optional[Watchlist] = None
+
+    def tag_known(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Adds "known" (listed in the reference set) to a manifest entry when a set is loaded."""
+        if self.known is not None:
+            entry["known"] = entry["sha256"] in self.known
+        return entry
+
+    def set_manifest_entry(self, sha: str, entry: Dict[str, Any]) -> None:
+        """Sets a manifest entry, journaling it when checkpointing is enabled."""
+        self.manifest_entries[sha] = self.tag_known(entry)
+        if self.checkpoint is not None:
+            self.checkpoint.journal_manifest_entry(sha, entry)
+
+@dataclass(frozen=True)
+class RecordHandler:
+    """
+    Routes one kind of XML record to its builder and JSONL output file.
+
+    A record is any direct child whose tag contains one of record_tags, under a
+    parent whose tag contains one of container_tags (namespaces stripped).
+    """
+    kind: str
+    filename: str
+    container_tags: Tuple[str, ...]
+    record_tags: Tuple[str, ...]
+    build: Callable[[ET.Element, str, int, str, ParseContext], Union[Dict[str, Any], PendingRecord]]
+
+RECORD_HANDLERS: Dict[str, RecordHandler] = {}
+
+def register_handler(handler: RecordHandler) -> RecordHandler:
+    """Registers a record handler, replacing any existing handler of the same kind."""
+    RECORD_HANDLERS[handler.kind] = handler
+    return handler
+
+def build_message(node: ET.Element, ntag: str, index: int, root_tag: str, ctx: ParseContext) -> Union[Dict[str, Any], PendingRecord]:
+    """
+    Builds a message record from its XML node.
+
+    Attachments are handed to the blob pipeline; if there are any, a PendingRecord
+    is returned that fills in attachments and manifest entries once they are stored.
+    """
+    case_id, blobs_dir = ctx.case_id, ctx.blobs_dir
+    # Defensive: extract fields
+    msg_id = node.attrib.get("id") or f"msg-{index+1:04d}"
+    ts = safe_text(node.find("timestamp")) or safe_text(node.find("time"))
+    ts_iso = parse_timestamp(ts) if ts else ""
+    sender = safe_text(node.find("sender")) or safe_text(node.find("from"))
+    recipient = safe_text(node.find("recipient")) or safe_text(node.find("to"))
+    body = safe_text(node.find("body")) or safe_text(node.find("text"))
+    direction = "inbound" if sender and not recipient else "outbound"
+    participants = [p for p in [sender, recipient] if p]
+    # Find attachments
+    found: List[Tuple[str, SourceFile]] = []
+    jobs: List[Future] = []
+    for att in node.findall("attachment"):
+        att_path = safe_text(att)
+        if att_path:
+            src_file = ctx.source.find(att_path)
+            if src_file is not None:
+                found.append((att_path, src_file))
+                jobs.append(ctx.pipeline.submit(src_file))
+            else:
+                logging.warning(f"Attachment {att_path} not found for message {msg_id}")
+    # Message hash
+    msg_hash = hashlib.sha256(body.encode('utf-8')).hexdigest() if body else ""
+    # Entities
+    entities = extract_entities(body)
+    msg_obj = {
+        "id": msg_id,
+        "case_id": case_id,
+        "device_id": ctx.device_id,
+        "timestamp_utc": ts_iso,
+        "direction": direction,
+        "participants": participants,
+        "body": body,
+        "attachments": [],
+        "entities": entities,
+        "raw_source": f"{root_tag}:{ntag}[{index}]",
+        "hash": f"sha256:{msg_hash}",
     }
+    if ctx.watchlist is not None:
+        msg_obj["watchlist"] = [hit.to_dict() for hit in ctx.watchlist.scan(body)]
+    if not jobs:
+        return msg_obj
 
-def parse_messages(
-    xml_root: ET.Element,
-    case_id: str,
-    device_id: str,
-    raw_dir: Path,
-    blobs_dir: Path,
-    messages_path: Path,
-    blobs_manifest_path: Path,
-) -> Tuple[int, int]:
-    """Parses messages, copies blobs, writes JSONL. Returns (msg_count, blob_count)."""
-    msg_count = 0
-    blob_count = 0
-    manifest_entries: Dict[str, Dict[str, Any]] = {}
-    with messages_path.open('w', encoding='utf-8') as msg_out, blobs_manifest_path.open('w', encoding='utf-8') as manifest_out:
-        # Find message nodes
-        for parent in xml_root.iter():
-            tag = strip_ns(parent.tag)
-            if any(x in tag for x in ["messages", "msgs", "sms", "chats"]):
-                for node in parent:
-                    ntag = strip_ns(node.tag)
-                    if any(x in ntag for x in ["message", "msg", "sms", "chat"]):
-                        # Defensive: extract fields
-                        msg_id = node.attrib.get("id") or f"msg-{msg_count+1:04d}"
-                        ts = safe_text(node.find("timestamp")) or safe_text(node.find("time"))
-                        ts_iso = parse_timestamp(ts) if ts else ""
-                        sender = safe_text(node.find("sender")) or safe_text(node.find("from"))
-                        recipient = safe_text(node.find("recipient")) or safe_text(node.find("to"))
-                        body = safe_text(node.find("body")) or safe_text(node.find("text"))
-                        direction = "inbound" if sender and not recipient else "outbound"
-                        participants = [p for p in [sender, recipient] if p]
-                        attachments = []
-                        related_blob_ids = []
-                        # Find attachments
-                        for att in node.findall("attachment"):
-                            att_path = safe_text(att)
-                            if att_path:
-                                abs_path = (raw_dir / att_path).resolve()
-                                if abs_path.exists():
-                                    sha, size = sha256_file(abs_path)
-                                    ext = abs_path.suffix
-                                    blob_file = copy_blob(abs_path, blobs_dir, sha, ext)
-                                    attachments.append(f"{sha}{ext}")
-                                    related_blob_ids.append(sha)
-                                    mtime = datetime.utcfromtimestamp(abs_path.stat().st_mtime).isoformat().replace('+00:00', 'Z')
-                                    # Manifest entry
-                                    manifest_entries[sha] = {
-                                        "blob_id": sha,
-                                        "case_id": case_id,
-                                        "orig_path": att_path.replace('\\', '/'),
-                                        "blob_path": str(blob_file.relative_to(blobs_dir.parent)),
-                                        "sha256": sha,
-                                        "size_bytes": size,
-                                        "mtime_utc": mtime,
-                                        "related_message_ids": [msg_id],
-                                    }
-                                else:
-                                    logging.warning(f"Attachment {att_path} not found for message {msg_id}")
-                        # Message hash
-                        msg_hash = hashlib.sha256(body.encode('utf-8')).hexdigest() if body else ""
-                        # Entities
-                        entities = extract_entities(body)
-                        # Raw source
-                        raw_source = f"{xml_root.tag}:{ntag}[{msg_count}]"
-                        msg_obj = {
-                            "id": msg_id,
-                            "case_id": case_id,
-                            "device_id": device_id,
-                            "timestamp_utc": ts_iso,
-                            "direction": direction,
-                            "participants": participants,
-                            "body": body,
-                            "attachments": attachments,
-                            "entities": entities,
-                            "raw_source": raw_source,
-                            "hash": f"sha256:{msg_hash}",
-                        }
-                        msg_out.write(json.dumps(msg_obj, ensure_ascii=False) + "\n")
-                        msg_count += 1
-        # Also scan media folders for orphan blobs
-        media_files = find_media_files(raw_dir)
-        for mf in media_files:
-            sha, size = sha256_file(mf)
-            ext = mf.suffix
-            blob_file = copy_blob(mf, blobs_dir, sha, ext)
-            mtime = datetime.utcfromtimestamp(mf.stat().st_mtime).isoformat().replace('+00:00', 'Z')
-            manifest_entries.setdefault(sha, {
+    def finish(obj: Dict[str, Any], stored: List[Tuple[str, int, Path]]) -> None:
+        for (att_path, src_file), (sha, size, blob_file) in zip(found, stored):
+            obj["attachments"].append(f"{sha}{src_file.suffix}")
+            # Manifest entry
+            ctx.set_manifest_entry(sha, {
                 "blob_id": sha,
                 "case_id": case_id,
-                "orig_path": str(mf.relative_to(raw_dir)).replace('\\', '/'),
+                "orig_path": att_path.replace('\\', '/'),
                 "blob_path": str(blob_file.relative_to(blobs_dir.parent)),
                 "sha256": sha,
                 "size_bytes": size,
-                "mtime_utc": mtime,
-                "related_message_ids": [],
+                "mtime_utc": src_file.mtime_utc,
+                "related_message_ids": [msg_id],
             })
-        # Write manifest
-        for entry in manifest_entries.values():
-            manifest_out.write(json.dumps(entry, ensure_ascii=False) + "\n")
-            blob_count += 1
-    return msg_count, blob_count
-
-def parse_contacts(xml_root: ET.Element, case_id: str, contacts_path: Path) -> int:
-    """Parses contacts and writes JSONL. Returns count."""
-    count = 0
-    with contacts_path.open('w', encoding='utf-8') as out:
-        for parent in xml_root.iter():
-            tag = strip_ns(parent.tag)
-            if "contacts" in tag:
-                for node in parent:
-                    ntag = strip_ns(node.tag)
-                    if "contact" in ntag:
-                        name = safe_text(node.find("name"))
-                        phone = safe_text(node.find("phone"))
-                        contact_obj = {
-                            "id": f"contact-{count+1:04d}",
-                            "case_id": case_id,
-                            "name": name,
-                            "phone": phone,
-                            "raw_source": f"{xml_root.tag}:{ntag}[{count}]",
-                        }
-                        out.write(json.dumps(contact_obj, ensure_ascii=False) + "\n")
-                        count += 1
-    return count
-
-def parse_calls(xml_root: ET.Element, case_id: str, calls_path: Path) -> int:
-    """Parses calls and writes JSONL. Returns count."""
-    count = 0
-    with calls_path.open('w', encoding='utf-8') as out:
-        for parent in xml_root.iter():
-            tag = strip_ns(parent.tag)
-            if "calls" in tag:
-                for node in parent:
-                    ntag = strip_ns(node.tag)
-                    if "call" in ntag:
-                        ts = safe_text(node.find("timestamp"))
-                        ts_iso = parse_timestamp(ts) if ts else ""
-                        caller = safe_text(node.find("caller"))
-                        callee = safe_text(node.find("callee"))
-                        duration = safe_text(node.find("duration"))
-                        call_obj = {
-                            "id": f"call-{count+1:04d}",
-                            "case_id": case_id,
-                            "timestamp_utc": ts_iso,
-                            "caller": caller,
-                            "callee": callee,
-                            "duration": duration,
-                            "raw_source": f"{xml_root.tag}:{ntag}[{count}]",
-                        }
-                        out.write(json.dumps(call_obj, ensure_ascii=False) + "\n")
-                        count += 1
-    return count
-
-def run_parser(input_path: Union[str, Path], outdir: Union[str, Path], case_id: str) -> Dict[str, Any]:
-    """Main entry: runs UFDR parser and returns summary dict."""
+
+    return PendingRecord(msg_obj, jobs, finish)
+
+def build_contact(node: ET.Element, ntag: str, index: int, root_tag: str, ctx: ParseContext) -> Dict[str, Any]:
+    """Builds a contact record from its XML node."""
+    return {
+        "id": f"contact-{index+1:04d}",
+        "case_id": ctx.case_id,
+        "name": safe_text(node.find("name")),
+        "phone": safe_text(node.find("phone")),
+        "raw_source": f"{root_tag}:{ntag}[{index}]",
+    }
+
+def build_call(node: ET.Element, ntag: str, index: int, root_tag: str, ctx: ParseContext) -> Dict[str, Any]:
+    """Builds a call record from its XML node."""
+    ts = safe_text(node.find("timestamp"))
+    return {
+        "id": f"call-{index+1:04d}",
+        "case_id": ctx.case_id,
+        "timestamp_utc": parse_timestamp(ts) if ts else "",
+        "caller": safe_text(node.find("caller")),
+        "callee": safe_text(node.find("callee")),
+        "duration": safe_text(node.find("duration")),
+        "raw_source": f"{root_tag}:{ntag}[{index}]",
+    }
+
+def add_orphan_media(ctx: ParseContext) -> None:
+    """
+    Scans media folders and adds blobs not referenced by any message to the manifest.
+    With ctx.skip_known, orphans listed in the known-file set are left out entirely.
+    """
+    blobs_dir = ctx.blobs_dir
+    jobs = [(mf, ctx.pipeline.submit(mf, skip_known=ctx.skip_known)) for mf in ctx.source.media_files()]
+    for mf, job in jobs:
+        sha, size, blob_file = job.result()
+        if blob_file is None:
+            ctx.known_skipped += 1
+            continue
+        if sha in ctx.manifest_entries:
+            continue
+        ctx.manifest_entries[sha] = ctx.tag_known({
+            "blob_id": sha,
+            "case_id": ctx.case_id,
+            "orig_path": mf.rel_path,
+            "blob_path": str(blob_file.relative_to(blobs_dir.parent)),
+            "sha256": sha,
+            "size_bytes": size,
+            "mtime_utc": mf.mtime_utc,
+            "related_message_ids": [],
+        })
+
+def write_manifest(manifest_entries: Dict[str, Dict[str, Any]], manifest_out) -> int:
+    """Writes manifest entries as JSONL. Returns blob count."""
+    blob_count = 0
+    for entry in manifest_entries.values():
+        manifest_out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        blob_count += 1
+    return blob_count
+
+register_handler(RecordHandler("messages", "messages.jsonl", ("messages", "msgs", "sms", "chats"), ("message", "msg", "sms", "chat"), build_message))
+register_handler(RecordHandler("contacts", "contacts.jsonl", ("contacts",), ("contact",), build_contact))
+register_handler(RecordHandler("calls", "calls.jsonl", ("calls",), ("call",), build_call))
+
+def container_kinds(tag: str, handlers: Dict[str, RecordHandler]) -> Tuple[str, ...]:
+    """Returns the record kinds for which a (namespace-stripped) tag is a container."""
+    return tuple(
+        kind for kind, handler in handlers.items()
+        if any(x in tag for x in handler.container_tags)
+    )
+
+def record_kinds(ntag: str, parent_kinds: Tuple[str, ...], handlers: Dict[str, RecordHandler]) -> Tuple[str, ...]:
+    """Returns the kinds for which a child tag is a record, given its parent's container kinds."""
+    return tuple(
+        kind for kind in parent_kinds
+        if any(x in ntag for x in handlers[kind].record_tags)
+    )
+
+def iter_tree_records(
+    xml_root: ET.Element,
+    handlers: Dict[str, RecordHandler],
+) -> Iterator[Tuple[str, str, str, ET.Element]]:
+    """
+    Yields (kind, root_tag, ntag, node) for every record in an in-memory tree.
+
+    One traversal serves all handlers; each tag is namespace-stripped once.
+    Records come out in document (start-tag) order, so a record nested inside
+    another follows it, as in iterparse_records.
+    """
+    # Preorder walk; each entry: (element, container kinds of its parent)
+    stack: List[Tuple[ET.Element, Tuple[str, ...]]] = [(xml_root, ())]
+    while stack:
+        node, parent_kinds = stack.pop()
+        ntag = strip_ns(node.tag)
+        matched = record_kinds(ntag, parent_kinds, handlers)
+        if matched:
+            strip_record_ns(node)
+        for kind in matched:
+            yield kind, xml_root.tag, ntag, node
+        kinds = container_kinds(ntag, handlers)
+        stack.extend((child, kinds) for child in reversed(node))
+
+def iterparse_records(
+    source: Union[Path, BinaryIO],
+    handlers: Dict[str, RecordHandler],
+) -> Iterator[Tuple[str, str, str, ET.Element]]:
+    """
+    Streams (kind, root_tag, ntag, node) tuples from the report as record elements close.
+
+    Uses incremental parsing: an element is matched against the container/record
+    keywords of its parent, and once no enclosing record still needs it, it is
+    cleared and detached from its parent. Peak memory is bounded by the largest
+    single record instead of the whole report.
+
+    Records nested inside another record close first; they are held until the
+    outermost one closes and then yielded in start-tag order, the order of
+    iter_tree_records.
+    """
+    # Each stack entry: (element, container kinds, record kinds, record start number)
+    stack: List[Tuple[ET.Element, Tuple[str, ...], Tuple[str, ...], int]] = []
+    # Closed records still inside an open one: (start number, kinds, ntag, element)
+    held: List[Tuple[int, Tuple[str, ...], str, ET.Element]] = []
+    open_records = 0
+    started = 0
+    root_tag = ""
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            tag = strip_ns(elem.tag)
+            if not stack:
+                root_tag = elem.tag
+            parent_kinds = stack[-1][1] if stack else ()
+            kinds = record_kinds(tag, parent_kinds, handlers)
+            stack.append((elem, container_kinds(tag, handlers), kinds, started))
+            if kinds:
+                open_records += 1
+                started += 1
+            continue
+        _, _, kinds, number = stack.pop()
+        if kinds:
+            strip_record_ns(elem)
+            held.append((number, kinds, strip_ns(elem.tag), elem))
+            open_records -= 1
+            if not open_records:
+                held.sort(key=lambda record: record[0])
+                for _, matched, ntag, node in held:
+                    for kind in matched:
+                        yield kind, root_tag, ntag, node
+                held.clear()
+        if not open_records and stack:
+            # Nothing above still needs this subtree: release it
+            elem.clear()
+            stack[-1][0].remove(elem)
+
+def parse_records(
+    records: Iterable[Tuple[str, str, str, ET.Element]],
+    handlers: Dict[str, RecordHandler],
+    ctx: ParseContext,
+    parsed_dir: Path,
+    resume_state: Optional[Dict[str, Any]] = None,
+    shard_size: int = 0,
+    compression: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    Dispatches records to their handlers and writes all JSONL outputs together. Returns per-kind counts.
+
+    Records waiting on blob jobs are queued per kind and written in document
+    order as their jobs complete; at most `window` records are held back per kind.
+    With ctx.checkpoint set, progress is checkpointed every `checkpoint.every`
+    records; resume_state continues from such a checkpoint by truncating the
+    outputs to its offsets and skipping the records it had already written.
+    shard_size and compression select the output layout (see jsonl_io.JsonlWriter).
+    """
+    counts = {kind: 0 for kind in handlers}
+    queues: Dict[str, Deque[PendingRecord]] = {kind: deque() for kind in handlers}
+    window = ctx.pipeline.max_pending
+    skip = resume_state["counts"] if resume_state else {}
+    offsets = resume_state["offsets"] if resume_state else {}
+
+    def drain(kind: str, block: bool) -> None:
+        queue = queues[kind]
+        while queue and (block or len(queue) > window or queue[0].done()):
+            obj = queue.popleft().result()
+            outputs[kind].write(obj)
+
+    def save_checkpoint() -> None:
+        for kind in handlers:
+            drain(kind, block=True)
+        offsets = {kind: out.sync() for kind, out in outputs.items()}
+        if ctx.pipeline.cache is not None:
+            ctx.pipeline.cache.commit()
+        ctx.checkpoint.save(dict(counts), offsets)
+
+    with ExitStack() as stack:
+        outputs = {}
+        for kind, handler in handlers.items():
+            writer = JsonlWriter(parsed_dir / handler.filename, shard_size, compression, state=offsets.get(kind))
+            outputs[kind] = stack.enter_context(writer)
+        if ctx.checkpoint is not None and resume_state is None:
+            save_checkpoint()
+        since_checkpoint = 0
+        for kind, root_tag, ntag, node in records:
+            if counts[kind] < skip.get(kind, 0):
+                # Already written before the checkpoint
+                counts[kind] += 1
+                continue
+            result = handlers[kind].build(node, ntag, counts[kind], root_tag, ctx)
+            counts[kind] += 1
+            if isinstance(result, PendingRecord):
+                queues[kind].append(result)
+            elif queues[kind]:
+                # Keep document order behind records still waiting on blobs
+                queues[kind].append(PendingRecord(result, []))
+            else:
+                outputs[kind].write(result)
+            if queues[kind]:
+                drain(kind, block=False)
+            since_checkpoint += 1
+            if ctx.checkpoint is not None and since_checkpoint >= ctx.checkpoint.every:
+                save_checkpoint()
+                since_checkpoint = 0
+        for kind in handlers:
+            drain(kind, block=True)
+        if ctx.checkpoint is not None:
+            save_checkpoint()
+    return counts
+
+def run_parser(
+    input_path: Union[str, Path],
+    outdir: Union[str, Path],
+    case_id: str,
+    streaming: bool = False,
+    extract: bool = True,
+    blob_workers: int = DEFAULT_BLOB_WORKERS,
+    use_hash_cache: bool = True,
+    reverify: bool = False,
+    resume: bool = False,
+    checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+    device_id: Optional[str] = None,
+    shard_size: int = 0,
+    compression: Optional[str] = None,
+    parquet: bool = False,
+    blob_store: Optional[Union[str, Path]] = None,
+    link_mode: str = "auto",
+    known_files: Optional[Union[str, Path]] = None,
+    skip_known: bool = False,
+    watchlist: Optional[Union[str, Path]] = None,
+    watchlist_country: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Main entry: runs UFDR parser and returns summary dict.
+
+    With streaming=True the report is read incrementally (see iterparse_records)
+    instead of being loaded into memory, for multi-GB report.xml files.
+    With extract=False the input zip or folder is read in place and no raw/
+    copy is written; each blob is written once, into blobs/.
+    Blobs are hashed and stored by a pool of blob_workers threads. Digests are
+    cached in <case>/hash_cache.sqlite so re-runs skip unchanged files;
+    reverify=True ignores the cache and hashes every file again.
+    Progress is checkpointed every checkpoint_every records (0 disables it);
+    resume=True continues an interrupted run from its last checkpoint and
+    produces the same output an uninterrupted run would.
+    With a device_id, per-device files (raw/, parsed/, hash cache) go under
+    <case>/devices/<device_id>/ while blobs/ stays shared by the whole case.
+    The summary's "timings" gives the wall time of each phase in seconds.
+    compression ("gzip" or "zstd") compresses the record outputs and shard_size > 0
+    splits them into shards of that many records with an index file; read them
+    back with jsonl_io.iter_records.
+    parquet=True also exports all outputs to parsed/parquet/ (requires pyarrow).
+    With blob_store, blob content is kept once in that cross-case store and
+    blobs/ holds reflinks, hardlinks or copies of it (link_mode: "auto",
+    "reflink", "hardlink" or "copy"); the case's references are recorded when
+    the manifest is written.
+    known_files is a set built by known_files.py: manifest entries get a
+    "known" flag, and with skip_known=True known media that no message
+    references is neither stored nor listed.
+    watchlist is a kind,value[,label] CSV (see nlp/watchlist.py): each message
+    gets a "watchlist" list of the entries its body mentions. Phone entries
+    and numbers without a country code are read as watchlist_country.
+    """
+    if parquet:
+        require_pyarrow()
+    if skip_known and not known_files:
+        raise ValueError("skip_known requires a known_files set")
     input_path = Path(input_path)
     outdir = Path(outdir)
-    parsed_dir = outdir / case_id / "parsed"
-    blobs_dir = outdir / case_id / "blobs"
+    case_dir = outdir / case_id
+    work_dir = case_dir / "devices" / device_id if device_id else case_dir
+    parsed_dir = work_dir / "parsed"
+    blobs_dir = case_dir / "blobs"
     parsed_dir.mkdir(parents=True, exist_ok=True)
     blobs_dir.mkdir(parents=True, exist_ok=True)
-    raw_dir = unpack_ufdr(input_path, outdir, case_id)
-    xml_path = find_main_xml(raw_dir)
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-    device_id = "device-unknown"
-    # Output files
-    messages_path = parsed_dir / "messages.jsonl"
-    contacts_path = parsed_dir / "contacts.jsonl"
-    calls_path = parsed_dir / "calls.jsonl"
+    checkpoint = None
+    resume_state = None
+    if checkpoint_every > 0:
+        identity = {
+            "case_id": case_id,
+            "device_id": device_id,
+            "input": str(input_path.resolve()),
+            "extract": extract,
+            "shard_size": shard_size,
+            "compression": compression,
+            "known_files": str(Path(known_files).resolve()) if known_files else None,
+            "skip_known": skip_known,
+            "watchlist": str(Path(watchlist).resolve()) if watchlist else None,
+            "watchlist_country": watchlist_country,
+        }
+        checkpoint = Checkpointer(parsed_dir, identity, every=checkpoint_every)
+        if resume:
+            resume_state = checkpoint.load()
+            if resume_state is None:
+                logging.info("No checkpoint found, starting from the beginning")
+    elif resume:
+        raise ValueError("resume requires checkpointing (checkpoint_every > 0)")
+    # Wall time per phase, reported in the summary
+    timings: Dict[str, float] = {}
+    mark = time.perf_counter()
+
+    def phase_done(name: str) -> None:
+        nonlocal mark
+        now = time.perf_counter()
+        timings[name] = round(now - mark, 3)
+        mark = now
+
+    if extract and resume_state is not None:
+        # raw/ was fully unpacked before the first checkpoint was written
+        source = DirSource(work_dir / "raw")
+    elif extract:
+        source = DirSource(unpack_ufdr(input_path, work_dir.parent, work_dir.name))
+    elif input_path.is_dir():
+        source = DirSource(input_path)
+    else:
+        source = ZipSource(input_path)
+    device_id = device_id or "device-unknown"
+    handlers = dict(RECORD_HANDLERS)
+    cache = HashCache(work_dir / "hash_cache.sqlite", reverify=reverify) if use_hash_cache else None
+    store = BlobStore(Path(blob_store), link_mode=link_mode) if blob_store else None
+    known = KnownFileSet(known_files) if known_files else None
+    pipeline = BlobPipeline(source, blobs_dir, workers=blob_workers, cache=cache, store=store, known=known)
+    watch = Watchlist.from_file(watchlist, watchlist_country) if watchlist else None
+    ctx = ParseContext(case_id, device_id, source, blobs_dir, pipeline, checkpoint=checkpoint,
+                       known=known, skip_known=skip_known, watchlist=watch)
+    if checkpoint is not None:
+        ctx.manifest_entries = checkpoint.start(resume_state)
+    phase_done("open")
+    try:
+        report = source.open_report()
+        try:
+            if streaming:
+                records = iterparse_records(report, handlers)
+            else:
+                records = iter_tree_records(ET.parse(report).getroot(), handlers)
+            counts = parse_records(records, handlers, ctx, parsed_dir, resume_state, shard_size, compression)
+            phase_done("parse")
+        finally:
+            if hasattr(report, "close"):
+                report.close()
+        # Also scan media folders for orphan blobs
+        add_orphan_media(ctx)
+        if store is not None:
+            store.add_refs(case_id, ctx.manifest_entries)
+    finally:
+        pipeline.close()
+        source.close()
+        if checkpoint is not None:
+            checkpoint.close()
+        if cache is not None:
+            cache.close()
+            logging.info(f"Hash cache: {cache.hits} hits, {cache.misses} misses")
+        if store is not None:
+            store.close()
+        if known is not None:
+            known.close()
+    phase_done("media")
+    logging.info(
+        f"Stored {pipeline.files_stored} blobs "
+        f"({pipeline.bytes_stored / (1024 * 1024):.1f} MB) at {pipeline.throughput_mb_s():.1f} MB/s"
+    )
     blobs_manifest_path = parsed_dir / "blobs_manifest.jsonl"
-    msg_count, blob_count = parse_messages(root, case_id, device_id, raw_dir, blobs_dir, messages_path, blobs_manifest_path)
-    contact_count = parse_contacts(root, case_id, contacts_path)
-    call_count = parse_calls(root, case_id, calls_path)
-    summary = {
-        "case_id": case_id,
-        "messages": {"count": msg_count, "path": str(messages_path)},
-        "contacts": {"count": contact_count, "path": str(contacts_path)},
-        "calls": {"count": call_count, "path": str(calls_path)},
-        "blobs": {"count": blob_count, "path": str(blobs_manifest_path)},
+    with blobs_manifest_path.open('w', encoding='utf-8') as manifest_out:
+        blob_count = write_manifest(ctx.manifest_entries, manifest_out)
+    if checkpoint is not None:
+        checkpoint.clear()
+    phase_done("manifest")
+    summary: Dict[str, Any] = {"case_id": case_id, "device_id": device_id}
+    for kind, handler in handlers.items():
+        summary[kind] = {"count": counts[kind], "path": str(output_path(parsed_dir / handler.filename, shard_size, compression))}
+    summary["blobs"] = {
+        "count": blob_count,
+        "path": str(blobs_manifest_path),
+        "throughput_mb_s": round(pipeline.throughput_mb_s(), 2),
     }
+    if store is not None:
+        summary["blobs"]["store"] = store.session_stats()
+    if known is not None:
+        summary["blobs"]["known"] = sum(1 for entry in ctx.manifest_entries.values() if entry["known"])
+        summary["blobs"]["known_skipped"] = ctx.known_skipped
+    if watch is not None:
+        summary["watchlist"] = watch.stats()
+    if parquet:
+        summary["parquet"] = export_parsed_dir(parsed_dir)
+        phase_done("parquet")
+    summary["timings"] = timings
     logging.info(f"UFDR parsing complete: {json.dumps(summary, indent=2)}")
     return summary
 
@@ -326,9 +1015,35 @@ def main():
     parser.add_argument("input", help="Path to .ufdr file or unpacked folder")
     parser.add_argument("outdir", help="Output directory")
     parser.add_argument("case_id", help="Case ID")
+    parser.add_argument("--stream", action="store_true", help="Stream report.xml incrementally (for very large reports)")
+    parser.add_argument("--no-extract", action="store_true", help="Read the UFDR zip/folder in place instead of unpacking it to raw/")
+    parser.add_argument("--blob-workers", type=int, default=DEFAULT_BLOB_WORKERS, help=f"Threads hashing and storing blobs (default: {DEFAULT_BLOB_WORKERS})")
+    parser.add_argument("--no-hash-cache", action="store_true", help="Do not read or write the per-case hash cache")
+    parser.add_argument("--reverify", action="store_true", help="Re-hash every blob even if the hash cache has it (evidentiary runs)")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from its last checkpoint")
+    parser.add_argument("--device-id", default=None, help="Device ID; per-device output goes under <case>/devices/<device_id>/")
+    parser.add_argument("--shard-size", type=int, default=0, help="Split record outputs into shards of N records with an index file (default: one file)")
+    parser.add_argument("--compress", choices=sorted(COMPRESSION_SUFFIXES), default=None, help="Compress record outputs with gzip or zstd")
+    parser.add_argument("--parquet", action="store_true", help="Also export outputs to Parquet under parsed/parquet/ (requires pyarrow)")
+    parser.add_argument("--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_EVERY, help=f"Records between checkpoints, 0 to disable (default: {DEFAULT_CHECKPOINT_EVERY})")
+    parser.add_argument("--blob-store", default=None, help="Cross-case content-addressed store; blobs/ then links into it")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="auto", help="How blobs/ references the store (default: reflink, else hardlink, else copy)")
+    parser.add_argument("--known-files", default=None, help="Known-file set built with known_files.py; tags manifest entries as known")
+    parser.add_argument("--skip-known", action="store_true", help="Do not store or list known media that no message references")
+    parser.add_argument("--watchlist", default=None, help="Watchlist CSV (kind,value[,label]); matching entries are listed on each message")
+    parser.add_argument("--watchlist-country", default=None, help="Default region for watchlist phone numbers (e.g. IN)")
     args = parser.parse_args()
     try:
-        summary = run_parser(args.input, args.outdir, args.case_id)
+        summary = run_parser(
+            args.input, args.outdir, args.case_id,
+            streaming=args.stream, extract=not args.no_extract, blob_workers=args.blob_workers,
+            use_hash_cache=not args.no_hash_cache, reverify=args.reverify,
+            resume=args.resume, checkpoint_every=args.checkpoint_every, device_id=args.device_id,
+            shard_size=args.shard_size, compression=args.compress, parquet=args.parquet,
+            blob_store=args.blob_store, link_mode=args.link_mode,
+            known_files=args.known_files, skip_known=args.skip_known,
+            watchlist=args.watchlist, watchlist_country=args.watchlist_country,
+        )
         print(json.dumps(summary, indent=2))
         sys.exit(0)
     except Exception as e:
@@ -1,35 +1,235 @@
 """
 verify_manifest.py — Helper to verify SHA256 of blobs against manifest
+
+Blobs are hashed by a pool of threads (hashlib releases the GIL, so hashing
+runs in parallel and keeps several reads in flight for NVMe arrays). Plain
+files are memory-mapped and hashed in large windows; gzip/zstd-compressed
+blobs are hashed over their decompressed content. A blob shared by several
+manifest entries (deduplicated storage) is hashed once.
+
+Every result is appended to a JSONL report as soon as it is known, so
+--resume continues an interrupted audit, and a summary is written next to it.
+
+Usage:
+    python parsers/verify_manifest.py <manifest.jsonl> <blobs_dir> [--workers N] [--sample 0.05] [--resume]
 """
-import sys
-import json
+import argparse
+import gzip
 import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from .jsonl_io import iter_records
+except ImportError:  # run as a script: python parsers/verify_manifest.py
+    from jsonl_io import iter_records
+
+DEFAULT_VERIFY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+WINDOW_BYTES = 64 * 1024 * 1024
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+def locate_blob(blobs_dir: Path, sha: str, ext: str) -> Optional[Tuple[Path, str]]:
+    """
+    Finds a blob in the flat layout (<sha><ext>) or the fan-out layout
+    (<aa>/<bb>/<sha><ext>, or <aa>/<bb>/<sha> as in a cross-case BlobStore),
+    stored as-is or gzip/zstd-compressed.
+
+    Returns (path, suffix), where suffix is the compression suffix added on top
+    of that name ("" if stored as-is). An attachment that is itself a .gz or
+    .zst file keeps it as its ext, so it is found as-is and not decompressed.
+    """
+    fanout = blobs_dir / sha[:2] / sha[2:4]
+    for base in (blobs_dir / f"{sha}{ext}", fanout / f"{sha}{ext}", fanout / sha):
+        for suffix in ("",) + COMPRESSED_SUFFIXES:
+            path = base.with_name(base.name + suffix)
+            if path.is_file():
+                return path, suffix
+    return None
 
-def verify_manifest(manifest_path: Path, blobs_dir: Path) -> None:
-    """Verifies SHA256 of all blobs listed in manifest."""
-    count = 0
-    with manifest_path.open() as f:
+def _hash_stream(f: Any, chunk_size: int) -> Tuple[str, int]:
+    h = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: f.read(chunk_size), b''):
+        h.update(chunk)
+        size += len(chunk)
+    return h.hexdigest(), size
+
+def hash_blob(path: Path, compression: str = "", window: int = WINDOW_BYTES) -> Tuple[str, int]:
+    """
+    Returns (sha256, size) of a blob's content. With compression ".gz" or
+    ".zst" (the storage suffix from locate_blob), the blob is hashed decompressed.
+    """
+    if compression == ".gz":
+        with gzip.open(path, 'rb') as f:
+            return _hash_stream(f, window)
+    if compression == ".zst":
+        if zstandard is None:
+            raise ImportError("zstandard is required to verify .zst blobs. Install with: pip install zstandard")
+        with path.open('rb') as raw, zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True) as f:
+            return _hash_stream(f, window)
+    with path.open('rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return hashlib.sha256().hexdigest(), 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            h = hashlib.sha256()
+            view = memoryview(mm)
+            try:
+                for start in range(0, size, window):
+                    h.update(view[start:start + window])
+            finally:
+                view.release()
+            return h.hexdigest(), size
+
+def sampled(sha: str, fraction: float) -> bool:
+    """Deterministic sample keyed on the digest, so a resumed run picks the same blobs."""
+    return fraction >= 1.0 or int(sha[:8], 16) / 0xFFFFFFFF < fraction
+
+def _verify_one(blobs_dir: Path, sha: str, ext: str, expected_size: Optional[int]) -> Dict[str, Any]:
+    found = locate_blob(blobs_dir, sha, ext)
+    row: Dict[str, Any] = {"sha256": sha, "blob": str(found[0]) if found else None, "expected_size": expected_size}
+    if found is None:
+        row["status"] = "missing"
+        return row
+    try:
+        actual, size = hash_blob(*found)
+    except Exception as e:
+        row.update(status="error", error=str(e))
+        return row
+    row["size"] = size
+    if actual != sha:
+        row.update(status="mismatch", actual_sha256=actual)
+    elif expected_size is not None and size != expected_size:
+        row["status"] = "size_mismatch"
+    else:
+        row["status"] = "ok"
+    return row
+
+def _load_report(report_path: Path) -> List[Dict[str, Any]]:
+    """Rows already recorded in a report; a torn last line from a crash is dropped."""
+    rows = []
+    with report_path.open('r', encoding='utf-8') as f:
         for line in f:
-            obj = json.loads(line)
-            sha = obj['sha256']
-            ext = Path(obj['blob_path']).suffix
-            blob_file = blobs_dir / f"{sha}{ext}"
-            if not blob_file.exists():
-                print(f"Missing blob: {blob_file}")
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                break
+    return rows
+
+def _manifest_blobs(manifest_path: Path) -> Iterator[Tuple[str, str, Optional[int]]]:
+    """Yields (sha, ext, size) once per distinct blob."""
+    seen: Set[str] = set()
+    for obj in iter_records(manifest_path):
+        sha = obj['sha256']
+        if sha in seen:
+            continue
+        seen.add(sha)
+        yield sha, Path(obj['blob_path']).suffix, obj.get('size_bytes')
+
+def verify_manifest(
+    manifest_path: Path,
+    blobs_dir: Path,
+    workers: int = DEFAULT_VERIFY_WORKERS,
+    sample: float = 1.0,
+    report_path: Optional[Path] = None,
+    resume: bool = False,
+) -> Dict[str, Any]:
+    """
+    Verifies SHA256 of all blobs listed in manifest (or a deterministic sample).
+
+    Per-blob results go to report_path (default: <manifest>.verify.jsonl) and the
+    totals to <report>.summary.json, which is also returned. With resume=True,
+    blobs already in the report are skipped, the report is appended to, and
+    the totals include the earlier results ("verified_bytes" and "mb_per_s"
+    cover this run only).
+    """
+    manifest_path = Path(manifest_path)
+    blobs_dir = Path(blobs_dir)
+    report_path = Path(report_path) if report_path else manifest_path.with_name(manifest_path.stem + ".verify.jsonl")
+    previous = _load_report(report_path) if resume and report_path.exists() else []
+    done = {row["sha256"] for row in previous}
+    counts = {"ok": 0, "mismatch": 0, "size_mismatch": 0, "missing": 0, "error": 0}
+    for row in previous:
+        counts[row["status"]] += 1
+    hashed_bytes = 0
+    start = time.perf_counter()
+    if previous:
+        # Rewrite without any torn line before appending
+        with report_path.open('w', encoding='utf-8') as report:
+            report.writelines(json.dumps(row) + "\n" for row in previous)
+    with report_path.open('a' if previous else 'w', encoding='utf-8') as report, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+
+        def record(row: Dict[str, Any]) -> None:
+            nonlocal hashed_bytes
+            counts[row["status"]] += 1
+            hashed_bytes += row.get("size", 0)
+            report.write(json.dumps(row) + "\n")
+            report.flush()
+            if row["status"] == "missing":
+                print(f"Missing blob: {row['sha256']}")
+            elif row["status"] == "mismatch":
+                print(f"SHA256 mismatch: {row['blob']}")
+            elif row["status"] != "ok":
+                print(f"{row['status']}: {row['blob']}")
+
+        for sha, ext, size in _manifest_blobs(manifest_path):
+            if sha in done or not sampled(sha, sample):
                 continue
-            h = hashlib.sha256()
-            with blob_file.open('rb') as bf:
-                for chunk in iter(lambda: bf.read(65536), b''):
-                    h.update(chunk)
-            if h.hexdigest() != sha:
-                print(f"SHA256 mismatch: {blob_file}")
-            else:
-                count += 1
-    print(f"Verified {count} blobs.")
+            pending.append(pool.submit(_verify_one, blobs_dir, sha, ext, size))
+            while len(pending) > 2 * workers or (pending and pending[0].done()):
+                record(pending.popleft().result())
+        while pending:
+            record(pending.popleft().result())
+    seconds = time.perf_counter() - start
+    failed = sum(n for status, n in counts.items() if status != "ok")
+    summary = {
+        "manifest": str(manifest_path),
+        "blobs_dir": str(blobs_dir),
+        "report": str(report_path),
+        "sample": sample,
+        "resumed": len(previous),
+        **counts,
+        "verified_bytes": hashed_bytes,
+        "seconds": round(seconds, 2),
+        "mb_per_s": round(hashed_bytes / (1024 * 1024) / seconds, 1) if seconds else 0.0,
+        "failed": failed,
+        "passed": failed == 0,
+    }
+    with report_path.with_name(report_path.stem + ".summary.json").open('w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    print(f"Verified {counts['ok']} blobs.")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify blob SHA256 digests against a blobs manifest")
+    parser.add_argument("manifest", help="blobs_manifest.jsonl")
+    parser.add_argument("blobs_dir", help="Blob store directory")
+    parser.add_argument("--workers", type=int, default=DEFAULT_VERIFY_WORKERS, help=f"Hashing threads (default: {DEFAULT_VERIFY_WORKERS})")
+    parser.add_argument("--sample", type=float, default=1.0, help="Verify this fraction of blobs, chosen by digest (default: all)")
+    parser.add_argument("--report", default=None, help="Per-blob JSONL report (default: <manifest>.verify.jsonl)")
+    parser.add_argument("--resume", action="store_true", help="Skip blobs already in the report and append to it")
+    args = parser.parse_args()
+    summary = verify_manifest(
+        Path(args.manifest), Path(args.blobs_dir), workers=args.workers,
+        sample=args.sample, report_path=args.report, resume=args.resume,
+    )
+    sys.exit(0 if summary["passed"] else 1)
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python verify_manifest.py <manifest.jsonl> <blobs_dir>")
-        sys.exit(1)
-    verify_manifest(Path(sys.argv[1]), Path(sys.argv[2]))
+    main()
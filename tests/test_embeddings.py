@@ -0,0 +1,352 @@
+import json
+
+import pytest
+
+def test_streaming_embeddings_resume_after_interruption(tmp_path):
+    np = pytest.importorskip("numpy")
+    from parsers.jsonl_io import JsonlWriter
+    from nlp.embeddings_worker import iter_texts, write_embeddings
+    from nlp.id_map import load_id_map
+
+    messages = tmp_path / "messages.jsonl"
+    with JsonlWriter(messages, shard_size=7) as writer:
+        for i in range(40):
+            writer.write({"id": f"m{i}", "body": f"message {i}" if i % 5 else "", "known": i == 3})
+
+    def encode(texts):
+        vectors = np.array([[len(t), sum(map(ord, t)), 1.0] for t in texts], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    class Index:
+        def __init__(self, dim):
+            self.rows = []
+        @property
+        def ntotal(self):
+            return len(self.rows)
+        def add(self, vectors):
+            self.rows.extend(map(tuple, vectors))
+
+    indexes = []
+    def index_factory(dim):
+        indexes.append(Index(dim))
+        return indexes[-1]
+
+    stats = {}
+    items = list(iter_texts(messages, "body", skip_known=True, stats=stats))
+    assert len(items) == 31 and stats["skipped"] == 1 and items[0][:2] == ("m1", "message 1")
+
+    calls = []
+    def failing_encode(texts):
+        calls.append(len(texts))
+        if len(calls) == 3:
+            raise RuntimeError("interrupted")
+        return encode(texts)
+
+    out = tmp_path / "vectors"
+    identity = {"model_name": "test", "text_field": "body"}
+    with pytest.raises(RuntimeError):
+        write_embeddings(iter(items), len(items), failing_encode, out, identity, chunk_size=10, index_factory=index_factory)
+    assert (out / ".embeddings_checkpoint.json").exists() and not (out / "embeddings.npy").exists()
+
+    calls.clear()
+    result = write_embeddings(iter(items), len(items), lambda t: calls.append(len(t)) or encode(t), out, identity,
+                              chunk_size=10, index_factory=index_factory)
+    assert result["processed"] == 31 and result["embedding_dim"] == 3 and calls == [10, 1]
+    assert result["index"] is indexes[-1]
+    embeddings = np.load(out / "embeddings.npy")
+    assert np.allclose(embeddings, encode([text for _, text, _ in items]))
+    assert np.allclose(np.array(indexes[-1].rows), embeddings)
+    metadata = json.loads((out / "metadata.json").read_text())
+    assert metadata["id_map"] == ["message_ids.bin"] and metadata["num_embeddings"] == 31
+    id_map = load_id_map(out, metadata)
+    assert list(id_map) == [message_id for message_id, _, _ in items]
+    id_map.close()
+    assert sorted(p.name for p in out.iterdir()) == ["embeddings.npy", "message_ids.bin", "metadata.json"]
+
+    with pytest.raises(ValueError):
+        write_embeddings(iter(items[:-1]), len(items), encode, tmp_path / "short", identity)
+
+def test_incremental_embeddings_reuse_cached_bodies(tmp_path, monkeypatch):
+    np = pytest.importorskip("numpy")
+    import hashlib
+    from parsers.jsonl_io import JsonlWriter
+    from nlp.embedding_cache import EmbeddingCache
+    from nlp.embeddings_worker import iter_texts, write_embeddings
+    from nlp.id_map import load_id_map
+
+    def write_messages(path, bodies):
+        with JsonlWriter(path) as writer:
+            for message_id, body in bodies:
+                writer.write({"id": message_id, "body": body, "hash": "sha256:" + hashlib.sha256(body.encode()).hexdigest()})
+
+    encoded = []
+    def encode(texts):
+        encoded.extend(texts)
+        vectors = np.array([[len(t), sum(map(ord, t)), 1.0] for t in texts], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    class Index:
+        def __init__(self, rows=()):
+            self.rows = list(rows)
+        @property
+        def ntotal(self):
+            return len(self.rows)
+        def add(self, vectors):
+            self.rows.extend(map(tuple, vectors))
+
+    out = tmp_path / "vectors"
+    cache = EmbeddingCache(tmp_path / "cache.sqlite", "test-model")
+    write_messages(tmp_path / "a.jsonl", [("a1", "Your OTP is 1234"), ("a2", "hello"), ("a3", "Your OTP is 1234")])
+    items = list(iter_texts(tmp_path / "a.jsonl", "body"))
+    assert items[0][2] == "sha256:" + hashlib.sha256(b"Your OTP is 1234").hexdigest()
+    first = write_embeddings(iter(items), 3, encode, out, {"model_name": "test-model"},
+                             index_factory=lambda dim: Index(), cache=cache)
+    assert encoded == ["Your OTP is 1234", "hello"] and first["encoded"] == 2 and first["cached"] == 0
+
+    # A second device: one forwarded body seen before, one new, one message already indexed
+    encoded.clear()
+    write_messages(tmp_path / "b.jsonl", [("a2", "hello"), ("b1", "hello"), ("b2", "new text")])
+    indexed = load_id_map(out, json.loads((out / "metadata.json").read_text()))
+    new = [item for item in iter_texts(tmp_path / "b.jsonl", "body") if item[0] not in indexed]
+    indexed.close()
+    previous_index = first["index"]
+    first_rows = np.load(out / "embeddings.npy")
+    first_map = (out / "message_ids.bin").read_bytes()
+
+    # An interrupted append leaves the earlier outputs readable as they were
+    def failing_encode(texts):
+        raise RuntimeError("interrupted")
+    with pytest.raises(RuntimeError):
+        write_embeddings(iter(new), len(new), failing_encode, out, {"model_name": "test-model"},
+                         chunk_size=1, index_factory=lambda dim: previous_index, append=True, cache=cache)
+    assert np.array_equal(np.load(out / "embeddings.npy"), first_rows)
+
+    second = write_embeddings(iter(new), len(new), encode, out, {"model_name": "test-model"},
+                              chunk_size=1, index_factory=lambda dim: previous_index, append=True, cache=cache)
+    # "hello" came from the cache before the interruption; the resumed run encodes the rest
+    assert encoded == ["new text"] and second["encoded"] == 1 and second["rows"] == 5
+    assert second["index"] is previous_index and previous_index.ntotal == 5
+    metadata = json.loads((out / "metadata.json").read_text())
+    # The earlier rows and ids were not rewritten: the new ids are a segment of their own
+    assert metadata["id_map"] == ["message_ids.bin", "message_ids.3.bin"]
+    assert (out / "message_ids.bin").read_bytes() == first_map
+    id_map = load_id_map(out, metadata)
+    assert list(id_map) == ["a1", "a2", "a3", "b1", "b2"] and id_map.row_of("b1") == 3 and id_map.get(4) == "b2"
+    assert id_map.delete(["a2", "b2"]) == 2 and id_map.get(1) is None and id_map.get(4) is None and id_map.deleted == 2
+    id_map.close()
+    embeddings = np.load(out / "embeddings.npy")
+    assert np.array_equal(embeddings[:3], first_rows)
+    assert np.allclose(embeddings[3], embeddings[1]) and np.allclose(np.array(previous_index.rows), embeddings)
+    assert cache.stats()["entries"] == 3
+
+    # A full rebuild renumbers rows: the segment and the deletions go, but only once metadata.json stops naming them
+    from nlp import embeddings_worker
+    replace_json = embeddings_worker._replace_json
+    def crash_on_metadata(path, data, indent=None):
+        if path.name == "metadata.json":
+            raise RuntimeError("interrupted")
+        replace_json(path, data, indent)
+    monkeypatch.setattr(embeddings_worker, "_replace_json", crash_on_metadata)
+    with pytest.raises(RuntimeError):
+        write_embeddings(iter(items), 3, encode, out, {"model_name": "test-model"}, resume=False, cache=cache)
+    assert all((out / name).exists() for name in metadata["id_map"])
+    monkeypatch.undo()
+    write_embeddings(iter(items), 3, encode, out, {"model_name": "test-model"}, resume=False, cache=cache)
+    metadata = json.loads((out / "metadata.json").read_text())
+    assert metadata["id_map"] == ["message_ids.bin"] and metadata["num_embeddings"] == 3
+    assert sorted(p.name for p in out.glob("message_ids*")) == ["message_ids.bin"]
+    id_map = load_id_map(out, metadata)
+    assert list(id_map) == ["a1", "a2", "a3"] and id_map.deleted == 0
+    id_map.close()
+    cache.close()
+    with pytest.raises(ValueError):
+        EmbeddingCache(tmp_path / "cache.sqlite", "other-model")
+
+def test_embeddings_default_to_parser_body_and_its_hash(tmp_path, monkeypatch):
+    np = pytest.importorskip("numpy")
+    import hashlib
+    import importlib.util
+    from parsers.jsonl_io import JsonlWriter
+    from nlp import embeddings_worker
+    from nlp.embedding_cache import EmbeddingCache
+
+    class Model:
+        def __init__(self, name):
+            pass
+        def encode(self, texts, **kwargs):
+            vectors = np.array([[len(t), sum(map(ord, t)), 1.0] for t in texts], dtype=np.float32)
+            return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name, *a: object() if name == "sentence_transformers" else find_spec(name, *a))
+    monkeypatch.setattr(embeddings_worker, "SentenceTransformer", Model)
+
+    messages = tmp_path / "messages.jsonl"
+    bodies = ["Your OTP is 1234", "hello", "Your OTP is 1234"]
+    hashes = ["sha256:" + hashlib.sha256(body.encode()).hexdigest() for body in bodies]
+    with JsonlWriter(messages) as writer:
+        for i, (body, digest) in enumerate(zip(bodies, hashes)):
+            writer.write({"id": f"m{i}", "body": body, "hash": digest})
+
+    worker = embeddings_worker.EmbeddingsWorker("test-model")
+    result = worker.process_jsonl_file(messages, tmp_path / "vectors", cache_path=tmp_path / "cache.sqlite", index_type="flat")
+    assert result["processed"] == 3 and result["encoded"] == 2
+    cache = EmbeddingCache(tmp_path / "cache.sqlite", "test-model")
+    assert sorted(cache.get_many(hashes)) == sorted(set(hashes))
+    cache.close()
+
+    # Parser output has no "content": nothing would be embedded, so the run fails
+    with pytest.raises(ValueError, match="'content'"):
+        worker.process_jsonl_file(messages, tmp_path / "other", text_field="content")
+
+def test_faiss_index_type_is_chosen_by_corpus_size():
+    np = pytest.importorskip("numpy")
+    from nlp.faiss_index import choose_index_type, index_spec, ivf_nlist, needs_training, pq_subquantizers
+    assert [choose_index_type(n) for n in (1000, 500_000, 3_000_000, 30_000_000)] == ["flat", "hnsw", "ivf-flat", "ivf-pq"]
+    assert ivf_nlist(1_000_000) == 4096 and ivf_nlist(100) == 1
+    assert pq_subquantizers(384) == 64 and pq_subquantizers(768) == 64 and pq_subquantizers(100) == 50
+
+    assert index_spec("auto", 1000, 384) == {"type": "flat", "train_size": 0, "search_params": {}, "factory": "Flat"}
+    hnsw = index_spec("auto", 500_000, 384, ef_search=128)
+    assert hnsw["factory"] == "HNSW32" and hnsw["search_params"] == {"efSearch": 128} and not needs_training(hnsw)
+    ivf = index_spec("ivf-flat", 3_000_000, 384)
+    assert ivf["factory"] == "IVF8192,Flat" and ivf["search_params"] == {"nprobe": 512} and ivf["train_size"] == 8192 * 64
+    pq = index_spec("auto", 30_000_000, 384, nlist=16384, nprobe=32)
+    assert pq["factory"] == "IVF16384,PQ64x8" and pq["search_params"] == {"nprobe": 32} and needs_training(pq)
+    with pytest.raises(ValueError):
+        index_spec("lsh", 10, 384)
+
+    from benchmarks.bench_faiss import make_queries, recall_at_k, synthetic_vectors
+    assert recall_at_k([[1, 2], [3, 4]], np.array([[1, 2], [4, 5]])) == 0.75
+
+    pytest.importorskip("faiss")
+    from nlp.faiss_index import build_index
+    vectors = synthetic_vectors(5000, 32)
+    queries = make_queries(vectors, 50)
+    _, truth = build_index(vectors, index_spec("flat", 5000, 32)).search(queries, 10)
+    for index_type in ("hnsw", "ivf-flat"):
+        _, found = build_index(vectors, index_spec(index_type, 5000, 32, nprobe=64)).search(queries, 10)
+        assert recall_at_k(found, truth) > 0.9
+
+def test_flat_index_is_searched_over_memory_mapped_embeddings(tmp_path):
+    np = pytest.importorskip("numpy")
+    from nlp.faiss_index import MappedFlatIndex, load_index
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((1000, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.save(tmp_path / "embeddings.npy", vectors)
+    queries = vectors[[3, 500, 999]] + 0.01
+
+    index = load_index(tmp_path, {"num_embeddings": 1000, "index": {"type": "flat", "search_params": {}}})
+    assert isinstance(index, MappedFlatIndex) and index.ntotal == 1000
+    assert isinstance(index.vectors, np.memmap)
+    index.block_rows = 128
+    scores, ids = index.search(queries, 5)
+    expected = np.argsort(-(queries @ vectors.T), axis=1)[:, :5]
+    assert (ids == expected).all() and ids[:, 0].tolist() == [3, 500, 999]
+    assert np.allclose(scores, np.take_along_axis(queries @ vectors.T, expected, axis=1))
+
+    np.save(tmp_path / "two.npy", vectors[:2])
+    _, ids = MappedFlatIndex(tmp_path / "two.npy").search(queries[:1], 4)
+    assert sorted(ids[0, :2].tolist()) == [0, 1] and ids[0, 2:].tolist() == [-1, -1]
+
+    with pytest.raises(FileNotFoundError):
+        load_index(tmp_path, {"num_embeddings": 999})  # stale embeddings, no faiss.index
+
+def test_id_map_maps_rows_and_ids_and_tombstones_deletions(tmp_path):
+    pytest.importorskip("numpy")
+    from nlp.id_map import IdMap, convert_metadata, load_id_map, write_id_map
+    ids = [f"msg_{i}" for i in range(1000)] + ["ünïcode-id", ""]
+    assert write_id_map(iter(ids), tmp_path / "ids.bin") == 1002
+    id_map = IdMap(tmp_path / "ids.bin")
+    assert len(id_map) == 1002 and id_map[1000] == "ünïcode-id" and list(id_map) == ids
+    assert id_map.row_of("msg_734") == 734 and id_map.row_of("") == 1001 and id_map.row_of("missing") is None
+    assert "msg_5" in id_map and "msg_1000" not in id_map
+    assert id_map.get(-1) is None and id_map.get(1002) is None and id_map.get(7) == "msg_7"
+
+    assert id_map.delete(["msg_7", "missing", "msg_999"]) == 2 and id_map.deleted == 2
+    assert id_map.get(7) is None and id_map[7] == "msg_7" and "msg_7" not in id_map
+    id_map.close()
+    reopened = IdMap(tmp_path / "ids.bin")
+    assert reopened.deleted == 2 and reopened.get(999) is None and reopened.get(998) == "msg_998"
+    reopened.close()
+
+    (tmp_path / "metadata.json").write_text(json.dumps({"num_embeddings": 3, "message_ids": ["a", "b", "c"]}))
+    legacy = load_id_map(tmp_path, json.loads((tmp_path / "metadata.json").read_text()))
+    assert legacy.get(2) == "c" and legacy.get(-1) is None and legacy.row_of("b") == 1 and legacy.deleted == 0
+    assert convert_metadata(tmp_path) == 3
+    metadata = json.loads((tmp_path / "metadata.json").read_text())
+    assert "message_ids" not in metadata and metadata["num_embeddings"] == 3
+    converted = load_id_map(tmp_path, metadata)
+    assert isinstance(converted, IdMap) and list(converted) == ["a", "b", "c"] and converted.row_of("c") == 2
+    converted.close()
+
+def test_mapped_index_survives_incremental_run(tmp_path, monkeypatch):
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("faiss")
+    import importlib.util
+    from parsers.jsonl_io import JsonlWriter
+    from nlp import embeddings_worker
+    from nlp.faiss_index import load_index
+
+    class Model:
+        def __init__(self, name):
+            pass
+        def encode(self, texts, **kwargs):
+            vectors = np.stack([np.random.default_rng(list(t.encode())).standard_normal(16) for t in texts])
+            return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name, *a: object() if name == "sentence_transformers" else find_spec(name, *a))
+    monkeypatch.setattr(embeddings_worker, "SentenceTransformer", Model)
+
+    def write_messages(path, numbers):
+        with JsonlWriter(path) as writer:
+            for i in numbers:
+                writer.write({"id": f"m{i}", "body": f"message {i}"})
+
+    out = tmp_path / "vectors"
+    worker = embeddings_worker.EmbeddingsWorker("test-model")
+    write_messages(tmp_path / "a.jsonl", range(600))
+    worker.process_jsonl_file(tmp_path / "a.jsonl", out, "body", index_type="ivf-flat", index_options={"nlist": 4, "nprobe": 4})
+    metadata = json.loads((out / "metadata.json").read_text())
+    mapped = load_index(out, metadata)
+    queries = Model(None).encode(["message 7", "message 650"])
+    before = mapped.search(queries, 5)
+
+    write_messages(tmp_path / "b.jsonl", range(700))
+    worker.process_jsonl_file(tmp_path / "b.jsonl", out, "body", incremental=True)
+    assert sorted(p.name for p in out.glob("*.tmp")) == []
+    # The index mapped before the run still reads the file it was opened on
+    after = mapped.search(queries, 5)
+    assert np.array_equal(before[1], after[1]) and np.allclose(before[0], after[0])
+    assert mapped.ntotal == 600 and before[1][0, 0] == 7
+
+    metadata = json.loads((out / "metadata.json").read_text())
+    reopened = load_index(out, metadata)
+    assert metadata["num_embeddings"] == reopened.ntotal == 700
+    assert reopened.search(queries, 1)[1][:, 0].tolist() == [7, 650]
+
+def test_search_skips_tombstoned_nearest_neighbours(tmp_path):
+    np = pytest.importorskip("numpy")
+    from nlp.faiss_index import MappedFlatIndex, search_live
+    from nlp.id_map import IdMap, write_id_map
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((200, 8)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.save(tmp_path / "embeddings.npy", vectors)
+    write_id_map((f"m{i}" for i in range(200)), tmp_path / "ids.bin")
+    index, id_map = MappedFlatIndex(tmp_path / "embeddings.npy"), IdMap(tmp_path / "ids.bin")
+    query = vectors[0]
+    ranked = np.argsort(-(vectors @ query), kind="stable")
+
+    # The 12 nearest rows are deleted: more than limit + the extra limit fetched at first
+    assert id_map.delete(f"m{row}" for row in ranked[:12]) == 12
+    hits = search_live(index, id_map, query, 5)
+    assert [row for _, row, _ in hits] == ranked[12:17].tolist()
+    assert [message_id for _, _, message_id in hits] == [f"m{row}" for row in ranked[12:17]]
+    # Fewer live rows than asked for: every live row, best first
+    id_map.delete(f"m{row}" for row in ranked[15:])
+    assert [row for _, row, _ in search_live(index, id_map, query, 5)] == ranked[12:15].tolist()
+    assert search_live(index, id_map, query, 0) == []
+    id_map.close()
@@ -0,0 +1,190 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from parsers.ufdr_parser import run_parser
+
+def _read_jsonl(path: Path):
+    return [json.loads(line) for line in path.open(encoding="utf-8")]
+
+def test_entity_engine_scans_once_with_offsets():
+    from nlp.extractors import extract_entities, scan_entities
+    from parsers.ufdr_parser import extract_entities as message_entities
+    eth = "0x" + "ab12" * 10
+    btc = eth[4:39]  # the address also contains a Bitcoin-shaped run, reported as before the engine
+    text = f"pay {eth} via https://pay.example/9876543210 or ops@example.com, call +919812345678 / +919812345678"
+    spans = scan_entities(text)
+    assert [(e.kind, e.value) for e in spans] == [
+        ("ethereum", eth), ("bitcoin", btc), ("url", "https://pay.example/9876543210"), ("phone", "9876543210"),
+        ("email", "ops@example.com"), ("phone", "+919812345678"), ("phone", "+919812345678"),
+    ]
+    assert all(text[e.start:e.end] == e.value for e in spans)
+    # Phones are scanned on their own, so digits inside a URL are reported too; values are deduplicated
+    assert extract_entities(text) == {
+        "phones": ["9876543210", "+919812345678"], "crypto_addresses": [eth, btc],
+        "emails": ["ops@example.com"], "urls": ["https://pay.example/9876543210"],
+    }
+    assert extract_entities("") == {"phones": [], "crypto_addresses": [], "emails": [], "urls": []}
+    # Message records keep every occurrence, under the parser's keys
+    assert message_entities(text) == {
+        "phone_numbers": ["9876543210", "+919812345678", "+919812345678"], "crypto_addresses": [eth],
+        "urls": ["https://pay.example/9876543210"],
+    }
+    chat = "ping https://wa.me/919812345678 or tel:+447700900123, mail 9876543210@example.com"
+    assert extract_entities(chat)["phones"] == ["919812345678", "+447700900123", "9876543210"]
+    assert message_entities(chat)["phone_numbers"] == ["919812345678", "+447700900123", "9876543210"]
+
+    # Entities nested in another kind's match are reported as each type's own scan found them
+    from benchmarks.bench_entities import corpus, legacy_nlp_extract, legacy_parser_extract
+    nested = [
+        f"https://etherscan.io/address/{eth}", "https://x.com/1BoatSLRHtKNngkdXEeobR76b53LETtpyT",
+        "1BoatSLRHtKNngkdXEeobR76b53LETtpyT@example.com", f"{eth}@example.com", "http://a.com/x@y.com",
+        "https://foo.com/0xdeadbeef12",
+    ]
+    for body in nested + corpus(2000, seed=7):
+        assert extract_entities(body) == legacy_nlp_extract(body), body
+        assert message_entities(body) == legacy_parser_extract(body), body
+    assert extract_entities(nested[0])["crypto_addresses"][0] == eth
+    assert extract_entities(nested[4])["emails"] == ["x@y.com"]
+    assert message_entities(nested[5])["crypto_addresses"] == ["0xdeadbeef12"]
+
+    # First characters are class members, not ranges: ".-0" must not admit "/"
+    from nlp.entity_engine import EntityEngine, EntityPattern
+    engine = EntityEngine({"dotted": EntityPattern(r"[./-]x", ".-"), "zero": EntityPattern(r"0y", "0")},
+                          {"dotted": ("dotted",), "zero": ("zero",)})
+    assert engine.extract("/x -x .x 0y") == {"dotted": ["-x", ".x"], "zero": ["0y"]}
+
+def test_batch_extract_sidecar_and_in_place_keep_order(tmp_path):
+    from nlp.batch_extract import extract_entities_parallel, extract_file
+    from nlp.extractors import extract_entities, extract_entities_batch
+    from parsers.jsonl_io import iter_records
+    ufdr_dir = tmp_path / "ufdr"
+    ufdr_dir.mkdir()
+    bodies = [f"msg {i} call +9198123456{i:02d}" if i % 3 else f"msg {i} see https://x.example/{i}" for i in range(25)]
+    messages = "".join(f"<message id='m{i}'><body>{b}</body></message>" for i, b in enumerate(bodies))
+    (ufdr_dir / "report.xml").write_text(f"<report><messages>{messages}</messages></report>", encoding="utf-8")
+    summary = run_parser(ufdr_dir, tmp_path / "out", "CASE-TEST", extract=False, shard_size=4, compression="gzip")
+    expected = [extract_entities(b) for b in bodies]
+    assert extract_entities_batch(bodies) == expected
+    assert extract_entities_parallel(bodies, workers=2, chunk_size=4) == expected
+
+    index = Path(summary["messages"]["path"])
+    original = list(iter_records(index))
+    sidecar = extract_file(index, workers=2, chunk_size=3)
+    assert sidecar["records"] == 25 and sidecar["output"].endswith("messages_entities.jsonl")
+    rows = _read_jsonl(Path(sidecar["output"]))
+    assert [r["id"] for r in rows] == [r["id"] for r in original]
+    assert [r["entities"] for r in rows] == expected
+
+    extract_file(index, in_place=True, workers=2, chunk_size=3)
+    updated = list(iter_records(index))
+    assert [r["nlp_entities"] for r in updated] == expected
+    assert [{k: v for k, v in r.items() if k != "nlp_entities"} for r in updated] == original
+    assert all(p.suffix == ".gz" for p in index.parent.glob("messages-*"))
+    assert not list(index.parent.glob(".entities-*"))
+
+def test_watchlist_matches_at_ingest_and_on_rescan(tmp_path):
+    import io
+    from nlp.watchlist import Watchlist, rescan_messages
+    eth = "0x" + "ab12" * 10
+    watch_csv = tmp_path / "watchlist.csv"
+    watch_csv.write_text(
+        "kind,value,label\n# suspects\nphone,+91 98123 45678,Suspect A\n"
+        f"crypto,{eth.upper().replace('X', 'x')},wallet\nemail,Ops@Example.com,\nkeyword,cash drop,\n",
+        encoding="utf-8",
+    )
+    watchlist = Watchlist.from_file(watch_csv)
+    assert len(watchlist) == 4
+    assert [h.kind for h in watchlist.scan(f"CASH DROP at 5, pay {eth} or mail ops@example.com.")] == ["keyword", "crypto", "email"]
+    assert [h.label for h in watchlist.scan("call +91 98123-45678 now, again +919812345678")] == ["Suspect A"]
+    # Whole tokens only: longer numbers, words and addresses do not hit
+    assert watchlist.scan("19812345678123 cashdrop ops@example.community") == []
+    with pytest.raises(ValueError):
+        Watchlist([("vehicle", "KA-01")])
+
+    ufdr_dir = tmp_path / "ufdr"
+    ufdr_dir.mkdir()
+    bodies = ["hello", "call me on +91 98123 45678", f"send to {eth}", "nothing here"]
+    messages = "".join(f"<message id='m{i}'><body>{b}</body></message>" for i, b in enumerate(bodies))
+    (ufdr_dir / "report.xml").write_text(f"<report><messages>{messages}</messages></report>", encoding="utf-8")
+    summary = run_parser(ufdr_dir, tmp_path / "out", "CASE-TEST", extract=False, watchlist=watch_csv)
+    parsed = _read_jsonl(Path(summary["messages"]["path"]))
+    assert [[h["label"] for h in m["watchlist"]] for m in parsed] == [[], ["Suspect A"], ["wallet"], []]
+    assert summary["watchlist"]["texts_matched"] == 2
+
+    out = io.StringIO()
+    result = rescan_messages(Watchlist.from_file(watch_csv), [summary["messages"]["path"]], out)
+    assert result["messages"] == 4 and result["matched"] == 2
+    assert [json.loads(line)["id"] for line in out.getvalue().splitlines()] == ["m1", "m2"]
+
+def test_phone_normalization_is_memoized_and_deduplicated():
+    pytest.importorskip("phonenumbers")
+    import importlib
+    np_mod = importlib.import_module("nlp.normalize_phone")  # the package re-exports the function under this name
+    np_mod.clear_phone_cache()
+    assert np_mod.normalize_phone("+91 98123 45678") == "+919812345678"
+    assert np_mod.normalize_phone("+91-98123-45678") == "+919812345678"  # same cleaned key
+    assert np_mod.normalize_phone("not a number 1") is None
+    assert np_mod.normalize_phone("not a number 1") is None  # invalid results are cached too
+    assert np_mod.phone_cache_stats() == {"hits": 2, "misses": 2, "size": 2, "maxsize": np_mod.PHONE_CACHE_SIZE}
+
+    np_mod.clear_phone_cache()
+    numbers = ["(202) 555-0143", "+44 20 7946 0958", "+91 98123 45678", "junk", ""] * 200
+    expected = {n: np_mod.normalize_phone(n) for n in numbers}
+    np_mod.clear_phone_cache()
+    assert np_mod.batch_normalize_phones(numbers, workers=2, chunk_size=1) == expected
+    assert np_mod.phone_cache_stats()["misses"] == 3  # one parse per unique number ("junk" has no digits)
+    assert np_mod.batch_normalize_phones(numbers) == expected
+    assert np_mod.phone_cache_stats()["hits"] == 3
+
+    small = np_mod.PhoneCache(maxsize=2)
+    for key in ("a", "b", "a", "c"):
+        small.put((key, "US"), key)
+    assert small.get(("b", "US")) is np_mod._MISSING and small.get(("a", "US")) == "a"
+
+def test_phone_prefix_table_matches_geocoder_without_loading_it(tmp_path):
+    pytest.importorskip("phonenumbers")
+    import subprocess
+    import sys
+    from phonenumbers import carrier, geocoder, parse
+    from nlp.normalize_phone import enrich_phones
+    from nlp.phone_table import PhonePrefixTable, build_prefix_table
+    table_path = tmp_path / "phone_prefixes.bin"
+    assert build_prefix_table(table_path) > 1000
+    table = PhonePrefixTable(table_path)
+    for number in ("+12015550123", "+442079460958", "+919812345678"):
+        info = table.lookup(number)
+        assert info.region == geocoder.description_for_number(parse(number), "en")
+        assert info.carrier == carrier.name_for_number(parse(number), "en")
+    assert table.lookup("+12015550123").timezones == ("America/New_York",)
+    assert table.lookup("+876") is None and table.country_name("JM") == "Jamaica"
+
+    enriched = enrich_phones(["+1 876 210 1465", "+1 (876) 210-1465", "+91 98123 45678", "junk"], table=table)
+    assert enriched["+1 876 210 1465"] == enriched["+1 (876) 210-1465"]
+    assert enriched["+1 876 210 1465"]["country_code"] == "JM" and enriched["+1 876 210 1465"]["region"] == "Jamaica"
+    assert enriched["+91 98123 45678"]["country_code"] == "IN" and enriched["+91 98123 45678"]["timezones"] == ["Asia/Calcutta"]
+    assert enriched["junk"]["is_valid"] is False
+    table.close()
+
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, nlp.normalize_phone; print('phonenumbers.geodata' in sys.modules)"],
+        capture_output=True, text=True, cwd=Path(__file__).resolve().parent.parent, check=True,
+    )
+    assert loaded.stdout.strip() == "False"
+
+def test_nlp_package_imports_lazily(monkeypatch):
+    import importlib.util
+    # Time budgets are checked by benchmarks/bench_imports.py --check, not here
+    monkeypatch.syspath_prepend(str(Path(__file__).resolve().parent.parent / "benchmarks"))
+    from bench_imports import measure
+    assert measure("import nlp; nlp.extract_entities", repeat=1)["heavy"] == []
+    assert measure("import nlp.watchlist; import parsers.ufdr_parser", repeat=1)["heavy"] == []
+
+    import nlp
+    assert callable(nlp.extract_entities) and "extract_entities" in dir(nlp)
+    if importlib.util.find_spec("phonenumbers") is not None:
+        importlib.import_module("nlp.normalize_phone")
+        assert callable(nlp.normalize_phone) and nlp.normalize_phone("+91 98123 45678") == "+919812345678"
+    with pytest.raises(AttributeError):
+        nlp.no_such_name
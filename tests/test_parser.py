@@ -91,3 +91,363 @@ def test_idempotency(tmp_path):
     files = list(blobs_dir.glob("*"))
     shas = set(f.stem for f in files)
     assert len(files) == len(shas), "Duplicate blobs detected"
+
+def test_unpack_keeps_unsafe_member_names_inside_raw(tmp_path):
+    ufdr_zip = build_synthetic_ufdr(tmp_path)
+    with zipfile.ZipFile(ufdr_zip, 'a') as z:
+        z.writestr("/abs/evil.txt", b"absolute")
+        z.writestr("../escape.txt", b"parent")
+    outdir = tmp_path / "output"
+    summary = run_parser(ufdr_zip, outdir, "CASE-TEST")
+    assert summary['messages']['count'] == 1
+    raw_dir = outdir / "CASE-TEST" / "raw"
+    assert (raw_dir / "abs" / "evil.txt").read_bytes() == b"absolute"
+    assert (raw_dir / "escape.txt").read_bytes() == b"parent"
+    assert not (outdir / "CASE-TEST" / "escape.txt").exists() and not (tmp_path / "escape.txt").exists()
+
+def _read_jsonl(path: Path):
+    return [json.loads(line) for line in path.open(encoding="utf-8")]
+
+def test_streaming_matches_tree(tmp_path):
+    ufdr_zip = build_synthetic_ufdr(tmp_path)
+    tree_summary = run_parser(ufdr_zip, tmp_path / "tree", "CASE-TEST")
+    stream_summary = run_parser(ufdr_zip, tmp_path / "stream", "CASE-TEST", streaming=True)
+    for kind in ("messages", "contacts", "calls"):
+        assert stream_summary[kind]['count'] == tree_summary[kind]['count']
+        tree_file = Path(tree_summary[kind]['path'])
+        stream_file = Path(stream_summary[kind]['path'])
+        assert stream_file.read_bytes() == tree_file.read_bytes()
+    # mtime_utc reflects extraction time, so compare the rest of the manifest
+    tree_manifest = _read_jsonl(Path(tree_summary['blobs']['path']))
+    stream_manifest = _read_jsonl(Path(stream_summary['blobs']['path']))
+    for entry in tree_manifest + stream_manifest:
+        entry.pop('mtime_utc')
+    assert stream_manifest == tree_manifest
+
+    # Records nested in a record follow it in both modes, so synthesized ids match
+    nested = tmp_path / "nested.ufdr"
+    with zipfile.ZipFile(nested, 'w') as z:
+        z.writestr("report.xml", "<report><messages><message><body>outer</body><messages><message><body>inner</body>"
+                   "<messages><message><body>innermost</body></message></messages></message>"
+                   "<message><body>inner2</body></message></messages></message>"
+                   "<message><body>third</body></message></messages></report>")
+    tree_file = Path(run_parser(nested, tmp_path / "nested-tree", "CASE-TEST")['messages']['path'])
+    stream_file = Path(run_parser(nested, tmp_path / "nested-stream", "CASE-TEST", streaming=True)['messages']['path'])
+    assert stream_file.read_bytes() == tree_file.read_bytes()
+    assert [(m['id'], m['body']) for m in _read_jsonl(stream_file)] == [
+        ("msg-0001", "outer"), ("msg-0002", "inner"), ("msg-0003", "innermost"), ("msg-0004", "inner2"), ("msg-0005", "third"),
+    ]
+
+    # Under a default xmlns, record fields are found once namespaces are dropped, in both modes
+    namespaced = tmp_path / "namespaced.ufdr"
+    with zipfile.ZipFile(namespaced, 'w') as z:
+        z.writestr("report.xml", "<report xmlns='http://pa.cellebrite.com/report/2.0'><messages>"
+                   "<message id='m1'><from>+15551234567</from><body>hello</body></message></messages></report>")
+    tree_file = Path(run_parser(namespaced, tmp_path / "ns-tree", "CASE-TEST")['messages']['path'])
+    stream_file = Path(run_parser(namespaced, tmp_path / "ns-stream", "CASE-TEST", streaming=True)['messages']['path'])
+    assert stream_file.read_bytes() == tree_file.read_bytes()
+    [message] = _read_jsonl(stream_file)
+    assert (message['id'], message['participants'], message['body']) == ("m1", ["+15551234567"], "hello")
+
+def test_registered_handler_gets_own_output(tmp_path, monkeypatch):
+    from parsers.ufdr_parser import RECORD_HANDLERS, RecordHandler, safe_text
+    def build_note(node, ntag, index, root_tag, ctx):
+        return {"id": f"note-{index+1:04d}", "case_id": ctx.case_id, "body": safe_text(node.find("body"))}
+    monkeypatch.setitem(RECORD_HANDLERS, "notes", RecordHandler("notes", "notes.jsonl", ("notes",), ("note",), build_note))
+    ufdr_dir = tmp_path / "ufdr"
+    ufdr_dir.mkdir()
+    (ufdr_dir / "report.xml").write_text(
+        "<report><notes><note><body>meet at 5</body></note></notes>"
+        "<messages><message id='m1'><body>hi</body></message></messages></report>",
+        encoding="utf-8",
+    )
+    for streaming in (False, True):
+        summary = run_parser(ufdr_dir, tmp_path / f"out-{streaming}", "CASE-TEST", streaming=streaming)
+        assert summary["notes"]["count"] == 1
+        assert summary["messages"]["count"] == 1
+        notes = _read_jsonl(Path(summary["notes"]["path"]))
+        assert notes == [{"id": "note-0001", "case_id": "CASE-TEST", "body": "meet at 5"}]
+
+def test_no_extract_reads_archive_in_place(tmp_path):
+    ufdr_zip = build_synthetic_ufdr(tmp_path)
+    extracted = run_parser(ufdr_zip, tmp_path / "extracted", "CASE-TEST")
+    for streaming in (False, True):
+        outdir = tmp_path / f"in-place-{streaming}"
+        summary = run_parser(ufdr_zip, outdir, "CASE-TEST", streaming=streaming, extract=False)
+        assert not (outdir / "CASE-TEST" / "raw").exists()
+        for kind in ("messages", "contacts", "calls"):
+            assert Path(summary[kind]['path']).read_bytes() == Path(extracted[kind]['path']).read_bytes()
+        manifest = _read_jsonl(Path(summary['blobs']['path']))
+        expected = _read_jsonl(Path(extracted['blobs']['path']))
+        for entry in manifest + expected:
+            entry.pop('mtime_utc')
+        assert manifest == expected
+        blobs = [f.name for f in (outdir / "CASE-TEST" / "blobs").iterdir()]
+        assert blobs == [f"{expected[0]['sha256']}.jpg"]
+
+def test_blob_workers_preserve_output_order(tmp_path):
+    ufdr_dir = tmp_path / "ufdr"
+    media_dir = ufdr_dir / "media"
+    media_dir.mkdir(parents=True)
+    messages = []
+    for i in range(40):
+        (media_dir / f"IMG_{i}.jpg").write_bytes(bytes([i]) * (1000 + i))
+        atts = "".join(f"<attachment>media/IMG_{(i + k) % 40}.jpg</attachment>" for k in range(i % 3))
+        messages.append(f"<message id='m{i}'><body>msg {i}</body>{atts}</message>")
+    (ufdr_dir / "report.xml").write_text(f"<report><messages>{''.join(messages)}</messages></report>", encoding="utf-8")
+    serial = run_parser(ufdr_dir, tmp_path / "serial", "CASE-TEST", extract=False, blob_workers=1)
+    parallel = run_parser(ufdr_dir, tmp_path / "parallel", "CASE-TEST", extract=False, blob_workers=4)
+    for kind in ("messages", "blobs"):
+        assert Path(parallel[kind]['path']).read_bytes() == Path(serial[kind]['path']).read_bytes()
+    assert parallel["blobs"]["count"] == 40
+    assert parallel["blobs"]["throughput_mb_s"] >= 0
+
+def test_hash_cache_skips_unchanged_blobs(tmp_path, monkeypatch):
+    import parsers.ufdr_parser as ufdr_parser
+    ufdr_zip = build_synthetic_ufdr(tmp_path)
+    outdir = tmp_path / "output"
+    first = run_parser(ufdr_zip, outdir, "CASE-TEST")
+    assert (outdir / "CASE-TEST" / "hash_cache.sqlite").exists()
+    def fail(*args, **kwargs):
+        raise AssertionError("blob was re-hashed")
+    monkeypatch.setattr(ufdr_parser, "hash_and_store", fail)
+    second = run_parser(ufdr_zip, outdir, "CASE-TEST")
+    assert Path(second['blobs']['path']).read_bytes() == Path(first['blobs']['path']).read_bytes()
+    with pytest.raises(AssertionError, match="re-hashed"):
+        run_parser(ufdr_zip, outdir, "CASE-TEST", reverify=True)
+
+def test_attachment_paths_are_normalised(tmp_path):
+    ufdr_dir = tmp_path / "ufdr"
+    (ufdr_dir / "Media" / "Chats").mkdir(parents=True)
+    (ufdr_dir / "Media" / "Chats" / "IMG_001.JPG").write_bytes(b"\xff\xd8\xff\xe0chat")
+    (ufdr_dir / "report.xml").write_text(
+        "<report><messages><message id='m1'><body>pic</body>"
+        "<attachment>.\\media\\chats\\img_001.jpg</attachment></message></messages></report>",
+        encoding="utf-8",
+    )
+    for extract in (True, False):
+        summary = run_parser(ufdr_dir, tmp_path / f"out-{extract}", "CASE-TEST", extract=extract)
+        msg = _read_jsonl(Path(summary['messages']['path']))[0]
+        assert len(msg['attachments']) == 1 and msg['attachments'][0].endswith(".JPG")
+        manifest = _read_jsonl(Path(summary['blobs']['path']))
+        assert manifest[0]['orig_path'] == "./media/chats/img_001.jpg"
+
+def test_resume_after_interruption_matches_clean_run(tmp_path, monkeypatch):
+    from dataclasses import replace
+    from parsers.ufdr_parser import RECORD_HANDLERS
+    ufdr_dir = tmp_path / "ufdr"
+    (ufdr_dir / "media").mkdir(parents=True)
+    messages = []
+    for i in range(30):
+        (ufdr_dir / "media" / f"IMG_{i}.jpg").write_bytes(bytes([i]) * 100)
+        messages.append(f"<message><body>msg {i}</body><attachment>media/IMG_{i % 7}.jpg</attachment></message>")
+    contacts = "".join(f"<contact><name>c{i}</name></contact>" for i in range(12))
+    (ufdr_dir / "report.xml").write_text(
+        f"<report><messages>{''.join(messages)}</messages><contacts>{contacts}</contacts></report>",
+        encoding="utf-8",
+    )
+    clean = run_parser(ufdr_dir, tmp_path / "clean", "CASE-TEST", extract=False)
+
+    build_message = RECORD_HANDLERS["messages"].build
+    def crash_at_23(node, ntag, index, root_tag, ctx):
+        if index == 23:
+            raise KeyboardInterrupt("pre-empted")
+        return build_message(node, ntag, index, root_tag, ctx)
+    monkeypatch.setitem(RECORD_HANDLERS, "messages", replace(RECORD_HANDLERS["messages"], build=crash_at_23))
+    outdir = tmp_path / "resumed"
+    with pytest.raises(KeyboardInterrupt):
+        run_parser(ufdr_dir, outdir, "CASE-TEST", extract=False, checkpoint_every=5)
+    assert (outdir / "CASE-TEST" / "parsed" / ".checkpoint.json").exists()
+    monkeypatch.setitem(RECORD_HANDLERS, "messages", replace(RECORD_HANDLERS["messages"], build=build_message))
+    resumed = run_parser(ufdr_dir, outdir, "CASE-TEST", extract=False, checkpoint_every=5, resume=True)
+    for kind in ("messages", "contacts", "calls", "blobs"):
+        assert resumed[kind]['count'] == clean[kind]['count']
+        assert Path(resumed[kind]['path']).read_bytes() == Path(clean[kind]['path']).read_bytes()
+    assert not (outdir / "CASE-TEST" / "parsed" / ".checkpoint.json").exists()
+
+def test_sharded_gzip_output_resumes_and_reads_in_parallel(tmp_path, monkeypatch):
+    from dataclasses import replace
+    from parsers.jsonl_io import iter_records
+    from parsers.ufdr_parser import RECORD_HANDLERS
+    ufdr_dir = tmp_path / "ufdr"
+    ufdr_dir.mkdir()
+    messages = "".join(f"<message><body>msg {i} é</body></message>" for i in range(25))
+    (ufdr_dir / "report.xml").write_text(f"<report><messages>{messages}</messages></report>", encoding="utf-8")
+    plain = run_parser(ufdr_dir, tmp_path / "plain", "CASE-TEST", extract=False)
+
+    build_message = RECORD_HANDLERS["messages"].build
+    def crash_at_17(node, ntag, index, root_tag, ctx):
+        if index == 17:
+            raise KeyboardInterrupt("pre-empted")
+        return build_message(node, ntag, index, root_tag, ctx)
+    monkeypatch.setitem(RECORD_HANDLERS, "messages", replace(RECORD_HANDLERS["messages"], build=crash_at_17))
+    outdir = tmp_path / "sharded"
+    options = dict(extract=False, checkpoint_every=3, shard_size=4, compression="gzip")
+    with pytest.raises(KeyboardInterrupt):
+        run_parser(ufdr_dir, outdir, "CASE-TEST", **options)
+    monkeypatch.setitem(RECORD_HANDLERS, "messages", replace(RECORD_HANDLERS["messages"], build=build_message))
+    sharded = run_parser(ufdr_dir, outdir, "CASE-TEST", resume=True, **options)
+
+    index = json.loads(Path(sharded["messages"]["path"]).read_text(encoding="utf-8"))
+    assert [s["records"] for s in index["shards"]] == [4, 4, 4, 4, 4, 4, 1]
+    parsed = outdir / "CASE-TEST" / "parsed"
+    assert sorted(p.name for p in parsed.glob("messages-*")) == [s["file"] for s in index["shards"]]
+    expected = _read_jsonl(Path(plain["messages"]["path"]))
+    assert list(iter_records(parsed / "messages.jsonl")) == expected
+    assert list(iter_records(Path(sharded["messages"]["path"]), workers=2)) == expected
+
+def test_batch_ingest_shares_blob_store(tmp_path):
+    from parsers.batch_ingest import assign_device_ids, run_batch
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first = build_synthetic_ufdr(tmp_path / "a")
+    second = build_synthetic_ufdr(tmp_path / "b")
+    assert [d for d, _ in assign_device_ids([str(first), f"PIXEL-7={second}", str(first)])] == ["test", "PIXEL-7", "test-2"]
+    outdir = tmp_path / "output"
+    summary = run_batch([str(first), f"PIXEL-7={second}"], outdir, "CASE-TEST", jobs=2)
+    assert [d["device_id"] for d in summary["devices"]] == ["test", "PIXEL-7"]
+    assert all(d["status"] == "ok" and d["messages"] == 1 for d in summary["devices"])
+    assert summary["totals"]["messages"] == 2
+    # Identical media on both devices is stored once
+    assert summary["unique_blobs"] == 1
+    for device_id in ("test", "PIXEL-7"):
+        msg = _read_jsonl(outdir / "CASE-TEST" / "devices" / device_id / "parsed" / "messages.jsonl")[0]
+        assert msg["device_id"] == device_id
+
+def test_parquet_export_has_typed_columns(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    ufdr_zip = build_synthetic_ufdr(tmp_path)
+    summary = run_parser(ufdr_zip, tmp_path / "output", "CASE-TEST", parquet=True, compression="gzip")
+    assert {kind: v["count"] for kind, v in summary["parquet"].items()} == {"messages": 1, "contacts": 1, "calls": 1, "blobs": 1}
+    messages = pq.read_table(summary["parquet"]["messages"]["path"])
+    assert str(messages.schema.field("timestamp_utc").type) == "timestamp[us, tz=UTC]"
+    row = messages.to_pylist()[0]
+    assert row["timestamp_utc"].isoformat() == "2023-09-12T07:55:00+00:00"
+    assert row["timestamp_raw"] is None
+    assert row["participants"] == ["+919812345678", "+447700900000"]
+    assert row["entities_crypto_addresses"] == ["0xAbC123"]
+    assert row["entities_urls"] == []
+    calls = pq.read_table(summary["parquet"]["calls"]["path"]).to_pylist()
+    assert calls[0]["duration_s"] == 42
+    blobs = pq.read_table(summary["parquet"]["blobs"]["path"]).to_pylist()
+    assert blobs[0]["size_bytes"] > 0 and blobs[0]["related_message_ids"] == ["m1"]
+
+def test_synthetic_namespaced_ufdr_parses_fully(tmp_path):
+    from benchmarks.synth_ufdr import SynthConfig, generate_ufdr
+    cfg = SynthConfig(messages=300, contacts=20, calls=30, attachments=40, attach_rate=0.5, missing_rate=0.0)
+    ufdr_zip = tmp_path / "synthetic.ufdr"
+    generate_ufdr(ufdr_zip, cfg)
+    tree = run_parser(ufdr_zip, tmp_path / "tree", "CASE-TEST")
+    stream = run_parser(ufdr_zip, tmp_path / "stream", "CASE-TEST", streaming=True, extract=False)
+    assert (tree["messages"]["count"], tree["contacts"]["count"], tree["calls"]["count"]) == (300, 20, 30)
+    assert Path(stream["messages"]["path"]).read_bytes() == Path(tree["messages"]["path"]).read_bytes()
+    messages = _read_jsonl(Path(tree["messages"]["path"]))
+    # Fields are read despite the default xmlns, and every timestamp format normalises to UTC
+    assert all(m["body"] and len(m["participants"]) == 2 for m in messages)
+    assert all(m["timestamp_utc"].endswith("Z") for m in messages)
+    assert sum(len(m["attachments"]) for m in messages) > 0
+    assert set(tree["timings"]) == {"open", "parse", "media", "manifest"}
+
+def test_verify_manifest_layouts_sampling_and_resume(tmp_path):
+    import gzip
+    import hashlib
+    from parsers.verify_manifest import verify_manifest
+    blobs_dir = tmp_path / "blobs"
+    blobs_dir.mkdir()
+    entries = []
+    for i, layout in enumerate(("flat", "fanout-gz", "corrupt", "missing", "gz-attachment")):
+        data = bytes([i]) * (1000 + i)
+        ext = ".jpg"
+        if layout == "gz-attachment":
+            # An attachment that is itself gzipped is hashed as stored, not decompressed
+            data, ext = gzip.compress(data), ".gz"
+            (blobs_dir / f"{hashlib.sha256(data).hexdigest()}.gz").write_bytes(data)
+        sha = hashlib.sha256(data).hexdigest()
+        if layout == "flat":
+            (blobs_dir / f"{sha}.jpg").write_bytes(data)
+        elif layout == "fanout-gz":
+            (blobs_dir / sha[:2] / sha[2:4]).mkdir(parents=True)
+            (blobs_dir / sha[:2] / sha[2:4] / f"{sha}.jpg.gz").write_bytes(gzip.compress(data))
+        elif layout == "corrupt":
+            (blobs_dir / f"{sha}.jpg").write_bytes(data[:-1] + b"x")
+        entries.append({"sha256": sha, "blob_path": f"blobs/{sha}{ext}", "size_bytes": len(data)})
+    # A second entry for the same blob is verified once
+    entries.append(dict(entries[0]))
+    manifest = tmp_path / "blobs_manifest.jsonl"
+    manifest.write_text("".join(json.dumps(e) + "\n" for e in entries), encoding="utf-8")
+
+    summary = verify_manifest(manifest, blobs_dir, workers=3)
+    assert (summary["ok"], summary["mismatch"], summary["missing"], summary["passed"]) == (3, 1, 1, False)
+    report = tmp_path / "blobs_manifest.verify.jsonl"
+    rows = _read_jsonl(report)
+    assert len(rows) == 5
+    assert json.loads((tmp_path / "blobs_manifest.verify.summary.json").read_text()) == summary
+
+    # Interrupted after two rows, with a torn third line
+    report.write_text("".join(json.dumps(r) + "\n" for r in rows[:2]) + '{"sha256": "ab', encoding="utf-8")
+    resumed = verify_manifest(manifest, blobs_dir, workers=2, resume=True)
+    assert resumed["resumed"] == 2
+    assert {k: resumed[k] for k in ("ok", "mismatch", "missing")} == {k: summary[k] for k in ("ok", "mismatch", "missing")}
+    assert sorted(r["sha256"] for r in _read_jsonl(report)) == sorted(r["sha256"] for r in rows)
+
+    none = verify_manifest(manifest, blobs_dir, sample=0.0, report_path=tmp_path / "sample.jsonl")
+    assert none["ok"] + none["failed"] == 0
+
+def test_blob_store_links_cases_and_counts_refs(tmp_path, monkeypatch):
+    from parsers.blob_store import BlobStore
+    from parsers.verify_manifest import verify_manifest
+    ufdr_zip = build_synthetic_ufdr(tmp_path)
+    store_dir = tmp_path / "store"
+    first = run_parser(ufdr_zip, tmp_path / "output", "CASE-A", blob_store=store_dir)
+    assert first["blobs"]["store"]["ingested"] == 1
+    # Content already in the store is hashed but never copied again
+    monkeypatch.setattr(BlobStore, "ingest", lambda *a, **k: pytest.fail("blob was written twice"))
+    second = run_parser(ufdr_zip, tmp_path / "output", "CASE-B", blob_store=store_dir, link_mode="hardlink")
+    assert second["blobs"]["store"]["reused"] == 1
+    assert second["blobs"]["store"]["links"]["hardlink"] == 1
+    sha = _read_jsonl(Path(second["blobs"]["path"]))[0]["sha256"]
+    store = BlobStore(store_dir)
+    obj = store.object_path(sha)
+    assert obj == store_dir / sha[:2] / sha[2:4] / sha
+    assert obj.stat().st_nlink >= 2
+    assert (tmp_path / "output" / "CASE-B" / "blobs" / f"{sha}.jpg").samefile(obj)
+    assert store.stats()["objects"] == 1 and store.stats()["refs"] == 2
+    assert verify_manifest(Path(first["blobs"]["path"]), store_dir)["passed"]
+    # An object stays until no case references it
+    assert store.release_case("CASE-A") == 1
+    assert store.gc() == (0, 0)
+    store.release_case("CASE-B")
+    assert store.gc()[0] == 1 and not obj.exists()
+    store.close()
+
+def test_known_files_are_tagged_and_skipped(tmp_path):
+    import hashlib
+    from parsers.known_files import KnownFileSet, build_known_set, iter_reference_digests
+    ufdr_dir = tmp_path / "ufdr"
+    (ufdr_dir / "media").mkdir(parents=True)
+    (ufdr_dir / "media" / "IMG_001.jpg").write_bytes(b"\xff\xd8\xff\xe0attached")
+    (ufdr_dir / "media" / "icon.png").write_bytes(b"stock icon")
+    (ufdr_dir / "media" / "evidence.png").write_bytes(b"not boilerplate")
+    (ufdr_dir / "report.xml").write_text(
+        "<report><messages><message id='m1'><body>pic</body>"
+        "<attachment>media/IMG_001.jpg</attachment></message></messages></report>",
+        encoding="utf-8",
+    )
+    known_hashes = [hashlib.sha256(b"stock icon").hexdigest(), hashlib.sha256(b"\xff\xd8\xff\xe0attached").hexdigest()]
+    reference = tmp_path / "reference.csv"
+    reference.write_text('"SHA-256","FileName"\n' + "".join(f'"{h.upper()}","x"\n' for h in known_hashes * 2), encoding="utf-8")
+    known_set = tmp_path / "known.kfs"
+    assert build_known_set(iter_reference_digests(reference), known_set) == 2
+    known = KnownFileSet(known_set)
+    assert all(h in known for h in known_hashes)
+    assert hashlib.sha256(b"not boilerplate").hexdigest() not in known and "xyz" not in known
+    known.close()
+
+    tagged = run_parser(ufdr_dir, tmp_path / "tagged", "CASE-TEST", extract=False, known_files=known_set)
+    manifest = {Path(e["orig_path"]).name: e["known"] for e in _read_jsonl(Path(tagged["blobs"]["path"]))}
+    assert manifest == {"IMG_001.jpg": True, "icon.png": True, "evidence.png": False}
+    # Known orphans are dropped; known attachments stay, since a message references them
+    skipped = run_parser(ufdr_dir, tmp_path / "skipped", "CASE-TEST", extract=False, known_files=known_set, skip_known=True)
+    assert sorted(Path(e["orig_path"]).name for e in _read_jsonl(Path(skipped["blobs"]["path"]))) == ["IMG_001.jpg", "evidence.png"]
+    assert skipped["blobs"]["known_skipped"] == 1
+    assert len(list((tmp_path / "skipped" / "CASE-TEST" / "blobs").iterdir())) == 2